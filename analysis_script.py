@@ -1,16 +1,52 @@
 """
 Standalone Analysis Script
 Run burnout analysis from command line without Streamlit UI
+pandas and the statistics modules are imported inside the functions that
+need them, so --scores-only starts without loading pandas at all
 """
-import pandas as pd
+import argparse
+import os
 import sys
-from core.validation import validate_row
-from core.scoring_engine import burnout_score, risk_label
-from core.statistical_analysis import correlation_analysis, descriptive_statistics
-from core.peer_engine import cohort_statistics
+import numpy as np
+from core.cohort_store import COHORT_EXTENSION, read_columns, write_columns
+from core.profiling import Profiler, stage, stage_iter
+from core.validation import validate_columns
+from core.scoring_engine import score_batch, risk_counts
 
-def analyze_csv(filepath):
-    """Analyze a CSV file and print results"""
+# Rows per chunk when files are sharded without an explicit --chunksize
+SHARD_CHUNKSIZE = 100_000
+# Hours are always parsed as floats so results files match whatever the input held
+HOUR_DTYPES = {'sleep_hours': 'float64', 'study_hours': 'float64', 'screen_time': 'float64'}
+
+def results_path(filepath, output_format="csv"):
+    """data/x.csv -> data/x_results.csv (or .cohort)"""
+    extension = COHORT_EXTENSION if output_format == "cohort" else ".csv"
+    return os.path.splitext(filepath)[0] + "_results" + extension
+
+def read_chunks(filepath, chunksize, dtype):
+    """Yield DataFrame chunks of a CSV or .cohort file"""
+    import pandas as pd
+    from core.cohort_store import read_table, widen_float32
+    
+    if filepath.endswith(COHORT_EXTENSION):
+        # Memory-mapped, so each slice only pages in its own rows
+        df = read_table(filepath)
+        for start in range(0, len(df), chunksize):
+            yield widen_float32(df.iloc[start:start + chunksize])
+    else:
+        yield from pd.read_csv(filepath, chunksize=chunksize, dtype=dtype)
+
+def analyze_csv(filepath, output_format="csv", show_memory=False, bootstrap=0, workers=None):
+    """
+    Analyze a CSV or .cohort file and print results
+    bootstrap > 0 adds 95% confidence intervals from that many resamples
+    """
+    from core.cohort_store import read_table, write_table, widen_float32
+    from core.schema import apply_schema, memory_report, value_counts
+    from core.validation import validate_frame
+    from core.statistical_analysis import correlation_analysis, descriptive_statistics
+    from core.peer_engine import cohort_statistics
+    
     print("=" * 60)
     print("STAYWELL - Burnout Analysis Report")
     print("=" * 60)
@@ -18,7 +54,9 @@ def analyze_csv(filepath):
     
     # Load data
     try:
-        df = pd.read_csv(filepath)
+        with stage("load") as record:
+            df = widen_float32(read_table(filepath))
+            record['rows'] = len(df)
         print(f"✓ Loaded {len(df)} students from {filepath}")
     except Exception as e:
         print(f"✗ Error loading file: {e}")
@@ -29,15 +67,18 @@ def analyze_csv(filepath):
         df['name'] = [f"Student {i+1}" for i in range(len(df))]
     
     # Validate and score
-    df = df.apply(validate_row, axis=1)
-    df["burnout_score"] = df.apply(burnout_score, axis=1)
-    df["risk"] = df["burnout_score"].apply(risk_label)
+    with stage("validate", len(df)):
+        df, _ = validate_frame(df)
+    with stage("score", len(df)):
+        df["burnout_score"], df["risk"] = score_batch(df)
+    with stage("schema", len(df)):
+        scored, df = df, apply_schema(df)
     
     print()
     print("-" * 60)
     print("RISK DISTRIBUTION")
     print("-" * 60)
-    risk_counts = df['risk'].value_counts()
+    risk_counts = value_counts(df['risk'])
     for risk, count in risk_counts.items():
         pct = count / len(df) * 100
         print(f"{risk}: {count} students ({pct:.1f}%)")
@@ -46,7 +87,8 @@ def analyze_csv(filepath):
     print("-" * 60)
     print("COHORT STATISTICS")
     print("-" * 60)
-    stats = cohort_statistics(df)
+    with stage("statistics", len(df)):
+        stats = cohort_statistics(df)
     for key, value in stats.items():
         print(f"{key.upper()}: {value}")
     
@@ -54,40 +96,400 @@ def analyze_csv(filepath):
     print("-" * 60)
     print("TOP 5 HIGHEST RISK STUDENTS")
     print("-" * 60)
-    top_risk = df.nlargest(5, 'burnout_score')[['name', 'burnout_score', 'risk']]
+    with stage("statistics", len(df)):
+        top_risk = df.nlargest(5, 'burnout_score')[['name', 'burnout_score', 'risk']]
     print(top_risk.to_string(index=False))
     
     print()
     print("-" * 60)
     print("DESCRIPTIVE STATISTICS")
     print("-" * 60)
-    desc = descriptive_statistics(df)
+    with stage("statistics", len(df)):
+        desc = descriptive_statistics(df)
     print(desc.to_string())
     
     print()
     print("-" * 60)
     print("CORRELATION WITH BURNOUT SCORE")
     print("-" * 60)
-    corr = correlation_analysis(df)
+    with stage("statistics", len(df)):
+        corr = correlation_analysis(df)
     if 'burnout_score' in corr.columns:
         burnout_corr = corr['burnout_score'].drop('burnout_score')
         for var, corr_val in burnout_corr.items():
             print(f"{var}: {corr_val:.3f}")
     
+    if bootstrap:
+        from core.bootstrap import bootstrap_statistics
+        
+        print()
+        print("-" * 60)
+        print(f"BOOTSTRAP 95% CONFIDENCE INTERVALS ({bootstrap:,} resamples)")
+        print("-" * 60)
+        with stage("bootstrap", len(df)):
+            intervals = bootstrap_statistics(scored, bootstrap, workers=workers)
+        print(intervals['cohort'].to_string())
+        print()
+        print(intervals['correlations'].to_string())
+    
+    if show_memory:
+        print()
+        print("-" * 60)
+        print("MEMORY PER STUDENT (bytes)")
+        print("-" * 60)
+        print(memory_report(scored, df).to_string())
+    
     print()
     print("=" * 60)
     print("Analysis Complete!")
     print("=" * 60)
     
     # Save results
-    output_file = filepath.replace('.csv', '_results.csv')
-    df.to_csv(output_file, index=False)
+    output_file = results_path(filepath, output_format)
+    with stage("save", len(df)):
+        write_table(df, output_file)
+    print(f"\n✓ Results saved to: {output_file}")
+
+def score_file(filepath, chunksize):
+    """
+    Validate and score one file chunk by chunk
+    Results are appended to the file's _results.csv as each chunk is scored.
+    Returns (accumulator, output file, whether names were generated)
+    """
+    from core.validation import validate_frame
+    from core.streaming import CohortAccumulator
+    
+    output_file = results_path(filepath)
+    acc = CohortAccumulator(top_n=5)
+    generated_names = False
+    
+    # Fixed dtypes so every chunk is parsed and written the same way
+    for i, chunk in enumerate(stage_iter("load", read_chunks(filepath, chunksize, HOUR_DTYPES))):
+        # Add name column if missing, numbered across the whole file
+        if 'name' not in chunk.columns:
+            chunk['name'] = [f"Student {acc.rows + j + 1}" for j in range(len(chunk))]
+            generated_names = True
+        
+        with stage("validate", len(chunk)):
+            chunk, _ = validate_frame(chunk)
+        with stage("score", len(chunk)):
+            chunk["burnout_score"], chunk["risk"] = score_batch(chunk)
+        
+        with stage("save", len(chunk)):
+            chunk.to_csv(output_file, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        with stage("statistics", len(chunk)):
+            acc.update(chunk)
+    return acc, output_file, generated_names
+
+def _score_shard(args):
+    # Top-level so worker processes can unpickle it
+    return score_file(*args)
+
+def renumber_generated_names(acc, offset):
+    """Shift 'Student i' names a shard generated so they count across all shards"""
+    for _, _, record in acc.top.heap:
+        record['name'] = f"Student {int(record['name'].rsplit(' ', 1)[1]) + offset}"
+
+def print_accumulator_report(acc):
+    """Report sections built from a CohortAccumulator"""
+    import pandas as pd
+    
+    print()
+    print("-" * 60)
+    print("RISK DISTRIBUTION")
+    print("-" * 60)
+    for risk, count in acc.sorted_risk_counts():
+        pct = count / acc.rows * 100
+        print(f"{risk}: {count} students ({pct:.1f}%)")
+    
+    print()
+    print("-" * 60)
+    print("COHORT STATISTICS")
+    print("-" * 60)
+    stats = acc.cohort_statistics()
+    for key, value in stats.items():
+        print(f"{key.upper()}: {value}")
+    
+    print()
+    print("-" * 60)
+    print("TOP 5 HIGHEST RISK STUDENTS")
+    print("-" * 60)
+    top_risk = pd.DataFrame(acc.top.records(), columns=['name', 'burnout_score', 'risk'])
+    print(top_risk.to_string(index=False))
+    
+    print()
+    print("-" * 60)
+    print("DESCRIPTIVE STATISTICS")
+    print("-" * 60)
+    moments = acc.moments
+    quartiles = {q: [acc.quantile(var, q) for var in moments.columns] for q in (0.25, 0.5, 0.75)}
+    desc = pd.DataFrame({
+        'count': float(moments.n),
+        'mean': moments.mean,
+        'median': quartiles[0.5],
+        'std': moments.std(),
+        'variance': moments.variance(),
+        'min': moments.min,
+        '25%': quartiles[0.25],
+        '50%': quartiles[0.5],
+        '75%': quartiles[0.75],
+        'max': moments.max,
+    }, index=moments.columns)
+    print(desc.round(2).to_string())
+    
+    print()
+    print("-" * 60)
+    print("CORRELATION WITH BURNOUT SCORE")
+    print("-" * 60)
+    corr = pd.DataFrame(moments.correlation(), index=moments.columns, columns=moments.columns)
+    burnout_corr = corr['burnout_score'].drop('burnout_score')
+    for var, corr_val in burnout_corr.items():
+        print(f"{var}: {corr_val:.3f}")
+    
+    print()
+    print("=" * 60)
+    print("Analysis Complete!")
+    print("=" * 60)
+
+def analyze_csv_streaming(filepath, chunksize):
+    """
+    Analyze a CSV file chunk by chunk
+    Results are appended to the output file as each chunk is scored and the
+    report is built from running accumulators, so memory stays flat
+    """
+    print("=" * 60)
+    print("STAYWELL - Burnout Analysis Report (streaming)")
+    print("=" * 60)
+    print()
+    
+    try:
+        acc, output_file, _ = score_file(filepath, chunksize)
+    except Exception as e:
+        print(f"✗ Error loading file: {e}")
+        return
+    print(f"✓ Streamed {acc.rows} students from {filepath} in chunks of {chunksize}")
+    
+    print_accumulator_report(acc)
+    print(f"\n✓ Results saved to: {output_file}")
+
+def analyze_sharded(filepaths, chunksize, workers):
+    """
+    Analyze several files as one cohort over a process pool
+    Each worker scores whole files and returns its accumulator; partial
+    results are merged in file order so the report matches one long stream
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from core.streaming import CohortAccumulator
+    
+    print("=" * 60)
+    print("STAYWELL - Burnout Analysis Report (sharded)")
+    print("=" * 60)
+    print()
+    
+    shards = [(filepath, chunksize) for filepath in filepaths]
+    try:
+        if workers > 1:
+            # Workers are not profiled; their time shows as one stage here
+            with stage("score shards"):
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    results = list(pool.map(_score_shard, shards))
+        else:
+            results = [score_file(*shard) for shard in shards]
+    except Exception as e:
+        print(f"✗ Error loading file: {e}")
+        return
+    
+    acc = CohortAccumulator(top_n=5)
+    with stage("merge"):
+        for shard_acc, _, generated_names in results:
+            if generated_names:
+                renumber_generated_names(shard_acc, acc.rows)
+            acc.merge(shard_acc)
+    print(f"✓ Streamed {acc.rows} students from {len(filepaths)} files with {workers} worker(s) in chunks of {chunksize}")
+    
+    print_accumulator_report(acc)
+    print()
+    for _, output_file, _ in results:
+        print(f"✓ Results saved to: {output_file}")
+
+def analyze_scores_only(filepath):
+    """
+    Validate and score a file without pandas and print the risk distribution
+    Writes the same _results.csv rows as analyze_csv; meant for cron jobs
+    over many small files, where interpreter startup dominates
+    """
+    print("=" * 60)
+    print("STAYWELL - Burnout Scores")
+    print("=" * 60)
+    print()
+    
+    try:
+        with stage("load") as record:
+            columns = read_columns(filepath, dtype=HOUR_DTYPES)
+            rows = record['rows'] = len(next(iter(columns.values()), []))
+        print(f"✓ Loaded {rows} students from {filepath}")
+    except Exception as e:
+        print(f"✗ Error loading file: {e}")
+        return
+    
+    # Add name column if missing
+    if 'name' not in columns:
+        columns['name'] = np.array([f"Student {i+1}" for i in range(rows)], dtype=object)
+    
+    with stage("validate", rows):
+        clamped, columns['valid'], reasons = validate_columns(columns)
+        columns.update(clamped)
+    with stage("score", rows):
+        columns['burnout_score'], columns['risk'] = score_batch(columns)
+    
+    print()
+    print("-" * 60)
+    print("RISK DISTRIBUTION")
+    print("-" * 60)
+    for risk, count in risk_counts(columns['burnout_score']):
+        pct = count / rows * 100
+        print(f"{risk}: {count} students ({pct:.1f}%)")
+    
+    output_file = results_path(filepath)
+    with stage("save", rows):
+        write_columns(columns, output_file)
     print(f"\n✓ Results saved to: {output_file}")
 
+def record_wave(filepath, store_path, wave):
+    """
+    Append a file to a wave store as one survey wave and report the students
+    whose risk rose most over the last RISING_WEEKS weeks, plus trend alerts
+    """
+    from core.cohort_store import read_table, widen_float32
+    from core.wave_store import WaveStore, RISING_WEEKS, RISING_THRESHOLD
+    from core.trend_engine import TrendState
+    from core.scoring_model import ModelRegistry
+    
+    print("=" * 60)
+    print("STAYWELL - Survey Wave")
+    print("=" * 60)
+    print()
+    
+    try:
+        with stage("load") as record:
+            df = widen_float32(read_table(filepath))
+            record['rows'] = len(df)
+        store = WaveStore(store_path)
+        # Scored with the active weight set of models.json, recorded per row
+        model = ModelRegistry().get()
+        with stage("append wave", len(df)):
+            counts = store.append_wave(df, wave, model)
+    except Exception as e:
+        print(f"✗ Error recording wave: {e}")
+        return
+    print(f"✓ Wave {counts['wave']}: {counts['new']} new, {counts['changed']} changed, "
+          f"{counts['unchanged']} unchanged, {counts['invalid']} invalid; {counts['scored']} scored "
+          f"(weight set: {model.version})")
+    
+    print()
+    print("-" * 60)
+    print(f"RISING RISK (score up more than {RISING_THRESHOLD} over {RISING_WEEKS} weeks)")
+    print("-" * 60)
+    with stage("trend query"):
+        rising = store.rising()
+    if len(rising):
+        print(rising.head(10).to_string(index=False))
+    else:
+        print("No students")
+    
+    print()
+    print("-" * 60)
+    print("EARLY WARNING (CUSUM change points and steep slopes)")
+    print("-" * 60)
+    with stage("trend signals", len(store.students())):
+        flagged = TrendState.from_table(store.table).deteriorating()
+    if len(flagged):
+        measures = ['latest', 'rolling_mean', 'slope', 'ewma', 'cusum']
+        print(flagged[measures + ['alert_wave']].head(10).round(dict.fromkeys(measures, 3)).to_string())
+        print(f"{len(flagged)} student(s) flagged")
+    else:
+        print("No students")
+    
+    print()
+    print(f"✓ Store: {store_path} ({len(store.segments())} segments, {len(store.waves())} waves)")
+
+def print_profile(profiler):
+    """Per-stage totals of a profiled run"""
+    print()
+    print("-" * 60)
+    print("PROFILE")
+    print("-" * 60)
+    print(f"{'stage':<14}{'calls':>6}{'ms':>12}{'rows':>12}{'peak MB':>10}")
+    for entry in profiler.summary():
+        rows = entry['rows'] if entry['rows'] is not None else "-"
+        peak = f"{entry['peak_bytes'] / 1e6:.1f}" if entry['peak_bytes'] is not None else "-"
+        print(f"{entry['stage']:<14}{entry['calls']:>6}{entry['seconds'] * 1000:>12.2f}{rows:>12}{peak:>10}")
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python analysis_script.py <path_to_csv>")
+        print("Usage: python analysis_script.py <path_to_csv_or_cohort> [more files...] [--chunksize N] [--workers N] [--format csv|cohort] [--scores-only] [--store DIR --wave DATE] [--trace PATH] [--bootstrap N [--bootstrap-workers N]]")
         print("Example: python analysis_script.py data/sample_students.csv")
+        print("Example: python analysis_script.py district/*.csv --workers 8")
+        print("Example: python analysis_script.py district/*.csv --scores-only")
         sys.exit(1)
     
-    analyze_csv(sys.argv[1])
+    parser = argparse.ArgumentParser(description="Run burnout analysis from the command line")
+    parser.add_argument("filepaths", nargs="+", help="CSV or .cohort file(s) with student data")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the file in chunks of N rows to keep memory flat")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="analyze the files as one cohort over N processes")
+    parser.add_argument("--format", choices=["csv", "cohort"], default="csv",
+                        help="results file format (.cohort is the compact binary store)")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="print bytes per student before and after the compact schema")
+    parser.add_argument("--scores-only", action="store_true",
+                        help="only validate, score and save each file (fast startup, no pandas)")
+    parser.add_argument("--store", metavar="DIR",
+                        help="append the file to a longitudinal wave store instead of a one-off report")
+    parser.add_argument("--wave", metavar="DATE", help="survey date of the file for --store, e.g. 2026-03-02")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="time each stage and write a Chrome trace JSON file (chrome://tracing)")
+    parser.add_argument("--bootstrap", type=int, default=0, metavar="N",
+                        help="add bootstrap confidence intervals from N resamples")
+    parser.add_argument("--bootstrap-workers", type=int, default=None, metavar="N",
+                        help="spread the --bootstrap resamples over N processes")
+    args = parser.parse_args()
+    
+    if args.scores_only and (args.chunksize or args.workers or args.format != "csv" or args.memory_report):
+        parser.error("--scores-only cannot be combined with --chunksize, --workers, --format cohort or --memory-report")
+    
+    if bool(args.store) != bool(args.wave):
+        parser.error("--store and --wave go together")
+    if args.store and (len(args.filepaths) > 1 or args.chunksize or args.workers or args.scores_only):
+        parser.error("--store takes one file and cannot be combined with --chunksize, --workers or --scores-only")
+    
+    if args.bootstrap < 0:
+        parser.error("--bootstrap needs a positive number of resamples")
+    if args.bootstrap and (len(args.filepaths) > 1 or args.chunksize or args.workers or args.scores_only or args.store):
+        parser.error("--bootstrap works on one in-memory file and cannot be combined with --chunksize, --workers, --scores-only or --store")
+    if args.bootstrap_workers and not args.bootstrap:
+        parser.error("--bootstrap-workers needs --bootstrap")
+    
+    sharded = len(args.filepaths) > 1 or args.workers
+    if (args.chunksize or sharded) and args.format != "csv":
+        parser.error("--chunksize, --workers and multiple files write results as CSV only")
+    
+    profiler = Profiler().start() if args.trace else None
+    if args.store:
+        record_wave(args.filepaths[0], args.store, args.wave)
+    elif args.scores_only:
+        for filepath in args.filepaths:
+            analyze_scores_only(filepath)
+    elif sharded:
+        analyze_sharded(args.filepaths, args.chunksize or SHARD_CHUNKSIZE, args.workers or 1)
+    elif args.chunksize:
+        analyze_csv_streaming(args.filepaths[0], args.chunksize)
+    else:
+        analyze_csv(args.filepaths[0], args.format, args.memory_report, args.bootstrap, args.bootstrap_workers)
+    
+    if profiler is not None:
+        profiler.stop()
+        print_profile(profiler)
+        profiler.write_trace(args.trace)
+        print(f"\n✓ Trace saved to: {args.trace}")
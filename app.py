@@ -2,18 +2,86 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import json
 
-from core.validation import validate_row
-from core.scoring_engine import burnout_score, risk_label, get_statistical_summary
-from core.peer_engine import peer_percentile, cohort_statistics
-from core.statistical_analysis import correlation_analysis, descriptive_statistics
+from config import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+from core.validation import validate_frame
+from core.scoring_engine import get_statistical_summary
+from core.scoring_model import ModelRegistry
+from core.sensitivity import weight_sensitivity, sample_weights, sensitivity_summary
+from core.bootstrap import bootstrap_statistics
+from core.cohort_store import COHORT_EXTENSION, encode_cohort
+from core.schema import student_row, value_counts, widen
+from core.statistical_analysis import outlier_flags, flagged_variables, OUTLIER_VARIABLES
+from core.pipeline import content_key, load_cohort, process_cohort, rescore_cohort, cohort_summary
+from core.profiling import Profiler, stage
 from explainability.contribution import contribution
-from explainability.what_if import simulate, batch_simulate
-from ui.dashboard import render_contribution, render_correlation_matrix, render_distribution, render_risk_distribution
+from explainability.what_if import simulate, batch_simulate, simulate_grid, optimal_intervention, DEFAULT_GRID
+from ui.dashboard import render_contribution, render_contribution_by_risk, render_correlation_matrix, render_distribution, render_risk_distribution, show_figure, data_key, figure_cache
 from ui.theme import PRIMARY, SECONDARY, RISK_COLORS
 
 st.set_page_config(page_title="STAYWELL - Burnout Detection", layout="wide", initial_sidebar_state="expanded")
 
+# Cached pipeline steps, keyed by content_key(); underscore args are not hashed
+def record_cache_call(name, miss=False):
+    """Count calls and misses per cached step for the debug panel"""
+    stats = st.session_state.setdefault("cache_stats", {}).setdefault(name, {"calls": 0, "misses": 0})
+    stats["misses" if miss else "calls"] += 1
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner="Scoring cohort...")
+def cached_cohort(key, _data):
+    record_cache_call("cohort", miss=True)
+    return process_cohort(load_cohort(_data))
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner="Re-scoring cohort...")
+def cached_rescore(key, _cohort, _model):
+    record_cache_call("rescore", miss=True)
+    return rescore_cohort(_cohort, _model)
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner="Computing statistics...")
+def cached_summary(key, _df, _weights):
+    record_cache_call("statistics", miss=True)
+    return cohort_summary(_df, _weights)
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner="Simulating interventions...")
+def cached_grid(key, _df, _weights):
+    record_cache_call("what-if grid", miss=True)
+    grid = simulate_grid(_df, {col: DEFAULT_GRID[col] for col in ('sleep_hours', 'screen_time')}, weights=_weights)
+    return pd.DataFrame(
+        grid['improved'],
+        index=[f"{d:+.1f}h sleep" for d in grid['axes']['sleep_hours']],
+        columns=[f"{d:+.1f}h screen" for d in grid['axes']['screen_time']],
+    )
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner="Scoring under sampled weight sets...")
+def cached_sensitivity(key, _df, _model, sets, concentration):
+    record_cache_call("sensitivity", miss=True)
+    result = weight_sensitivity(_df, sample_weights(sets, _model.weights, concentration), _model)
+    return {'summary': sensitivity_summary(result), 'students': result['students']}
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner="Resampling cohort...")
+def cached_bootstrap(key, _df, resamples):
+    record_cache_call("bootstrap", miss=True)
+    return bootstrap_statistics(_df, resamples)
+
+def run_cached(name, func, *args):
+    record_cache_call(name)
+    return func(*args)
+
+# One registry per server; it re-reads the weight-set file whenever it changes
+@st.cache_resource
+def model_registry():
+    return ModelRegistry()
+
+# Profiling for this rerun, switched on in the Performance panel. A run that
+# ended early (st.stop) never reached the panel, so its profiler stops here.
+previous_profiler = st.session_state.pop("profiler", None)
+if previous_profiler is not None:
+    previous_profiler.stop()
+profiler = None
+if st.session_state.get("profile_run"):
+    profiler = st.session_state["profiler"] = Profiler().start()
+
 # Custom CSS
 st.markdown(f"""
     <style>
@@ -44,18 +112,27 @@ st.markdown(
 st.sidebar.title("⚙️ Configuration")
 mode = st.sidebar.radio("📥 Input Type", ["Upload CSV", "Manual Entry", "Use Sample Data"])
 
+# Weight set: the file's active version unless another is picked this session
+registry = model_registry()
+versions = registry.versions()
+if st.session_state.get("weight_set") not in versions:
+    st.session_state["weight_set"] = registry.active_version
+model = registry.get(st.sidebar.selectbox("🧮 Weight Set", versions, key="weight_set",
+                                          help="Versioned weights from models.json; edits to the file apply on the next rerun"))
+if registry.error:
+    st.sidebar.error(f"❌ Weight file not reloaded: {registry.error}")
+
 # Data Input
 if mode == "Upload CSV":
-    file = st.sidebar.file_uploader("Upload CSV with columns: sleep_hours, study_hours, screen_time, stress_level, attendance", type=["csv"])
+    file = st.sidebar.file_uploader("Upload CSV with columns: sleep_hours, study_hours, screen_time, stress_level, attendance", type=["csv", COHORT_EXTENSION.lstrip(".")])
     if not file:
         st.info("👆 Please upload a CSV file to begin analysis")
         st.stop()
-    df = pd.read_csv(file)
-    if 'name' not in df.columns:
-        df['name'] = [f"Student {i+1}" for i in range(len(df))]
+    data = file.getvalue()
         
 elif mode == "Use Sample Data":
-    df = pd.read_csv("data/sample_students.csv")
+    with open("data/sample_students.csv", "rb") as f:
+        data = f.read()
     st.sidebar.success("✅ Sample data loaded")
     
 else:  # Manual Entry - Completely Redesigned
@@ -178,9 +255,8 @@ else:  # Manual Entry - Completely Redesigned
     
     # Calculate burnout score for preview
     temp_df = df.copy()
-    temp_df = temp_df.apply(validate_row, axis=1)
-    temp_df["burnout_score"] = temp_df.apply(burnout_score, axis=1)
-    temp_df["risk"] = temp_df["burnout_score"].apply(risk_label)
+    temp_df, _ = validate_frame(temp_df)
+    temp_df["burnout_score"], temp_df["risk"] = model.score_batch(temp_df)
     
     preview_score = temp_df["burnout_score"].iloc[0]
     preview_risk = temp_df["risk"].iloc[0]
@@ -238,382 +314,562 @@ else:  # Manual Entry - Completely Redesigned
     
     with col1:
         # Time allocation bar chart
-        fig, ax = plt.subplots(figsize=(6, 4))
-        categories = ['Sleep', 'Study', 'Screen', 'Other']
-        values = [sleep_hours, study_hours, screen_time, remaining_hours]
-        colors_chart = ['#4285F4', '#0F9D58', '#F4B400', '#E8E8E8']
+        def draw_time_allocation():
+            fig, ax = plt.subplots(figsize=(6, 4))
+            categories = ['Sleep', 'Study', 'Screen', 'Other']
+            values = [sleep_hours, study_hours, screen_time, remaining_hours]
+            colors_chart = ['#4285F4', '#0F9D58', '#F4B400', '#E8E8E8']
         
-        bars = ax.bar(categories, values, color=colors_chart, edgecolor='black', linewidth=1.5)
-        ax.set_ylabel('Hours', fontsize=11)
-        ax.set_title('Daily Time Allocation', fontsize=13, fontweight='bold')
-        ax.axhline(y=24, color='red', linestyle='--', linewidth=2, label='24h Limit')
-        ax.set_ylim(0, 26)
+            bars = ax.bar(categories, values, color=colors_chart, edgecolor='black', linewidth=1.5)
+            ax.set_ylabel('Hours', fontsize=11)
+            ax.set_title('Daily Time Allocation', fontsize=13, fontweight='bold')
+            ax.axhline(y=24, color='red', linestyle='--', linewidth=2, label='24h Limit')
+            ax.set_ylim(0, 26)
         
-        # Add value labels
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height:.1f}h',
-                    ha='center', va='bottom', fontsize=10, fontweight='bold')
+            # Add value labels
+            for bar in bars:
+                height = bar.get_height()
+                ax.text(bar.get_x() + bar.get_width()/2., height,
+                        f'{height:.1f}h',
+                        ha='center', va='bottom', fontsize=10, fontweight='bold')
         
-        ax.legend()
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+            ax.legend()
+            plt.tight_layout()
+            return fig
+        show_figure(data_key('time_allocation', sleep_hours, study_hours, screen_time), draw_time_allocation)
     
     with col2:
         # Risk factors radar/comparison chart
-        fig, ax = plt.subplots(figsize=(6, 4))
+        def draw_risk_factors():
+            fig, ax = plt.subplots(figsize=(6, 4))
         
-        factors = ['Sleep\nDeficit', 'Stress\nLevel', 'Screen\nTime', 'Study\nLoad', 'Attendance\nIssue']
-        # Calculate risk scores (0-1 scale)
-        sleep_risk = max(0, (7 - sleep_hours) / 7)
-        stress_risk = stress_level / 5
-        screen_risk = min(screen_time / 10, 1)
-        study_risk = min(study_hours / 10, 1)
-        attendance_risk = (100 - attendance) / 100
+            factors = ['Sleep\nDeficit', 'Stress\nLevel', 'Screen\nTime', 'Study\nLoad', 'Attendance\nIssue']
+            # Calculate risk scores (0-1 scale)
+            sleep_risk = max(0, (7 - sleep_hours) / 7)
+            stress_risk = stress_level / 5
+            screen_risk = min(screen_time / 10, 1)
+            study_risk = min(study_hours / 10, 1)
+            attendance_risk = (100 - attendance) / 100
         
-        risk_values = [sleep_risk, stress_risk, screen_risk, study_risk, attendance_risk]
+            risk_values = [sleep_risk, stress_risk, screen_risk, study_risk, attendance_risk]
         
-        # Color code bars
-        bar_colors = []
-        for val in risk_values:
-            if val >= 0.6:
-                bar_colors.append('#DB4437')  # Red
-            elif val >= 0.3:
-                bar_colors.append('#F4B400')  # Yellow
-            else:
-                bar_colors.append('#0F9D58')  # Green
+            # Color code bars
+            bar_colors = []
+            for val in risk_values:
+                if val >= 0.6:
+                    bar_colors.append('#DB4437')  # Red
+                elif val >= 0.3:
+                    bar_colors.append('#F4B400')  # Yellow
+                else:
+                    bar_colors.append('#0F9D58')  # Green
         
-        bars = ax.barh(factors, risk_values, color=bar_colors, edgecolor='black', linewidth=1.5)
-        ax.set_xlabel('Risk Score', fontsize=11)
-        ax.set_title('Risk Factor Breakdown', fontsize=13, fontweight='bold')
-        ax.set_xlim(0, 1)
+            bars = ax.barh(factors, risk_values, color=bar_colors, edgecolor='black', linewidth=1.5)
+            ax.set_xlabel('Risk Score', fontsize=11)
+            ax.set_title('Risk Factor Breakdown', fontsize=13, fontweight='bold')
+            ax.set_xlim(0, 1)
         
-        # Add value labels
-        for i, (bar, val) in enumerate(zip(bars, risk_values)):
-            width = bar.get_width()
-            ax.text(width + 0.02, bar.get_y() + bar.get_height()/2.,
-                    f'{val:.2f}',
-                    ha='left', va='center', fontsize=9, fontweight='bold')
+            # Add value labels
+            for i, (bar, val) in enumerate(zip(bars, risk_values)):
+                width = bar.get_width()
+                ax.text(width + 0.02, bar.get_y() + bar.get_height()/2.,
+                        f'{val:.2f}',
+                        ha='left', va='center', fontsize=9, fontweight='bold')
         
-        # Add risk zones
-        ax.axvline(x=0.3, color='orange', linestyle='--', linewidth=1, alpha=0.5)
-        ax.axvline(x=0.6, color='red', linestyle='--', linewidth=1, alpha=0.5)
+            # Add risk zones
+            ax.axvline(x=0.3, color='orange', linestyle='--', linewidth=1, alpha=0.5)
+            ax.axvline(x=0.6, color='red', linestyle='--', linewidth=1, alpha=0.5)
         
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+            plt.tight_layout()
+            return fig
+        show_figure(data_key('risk_factors', sleep_hours, study_hours, screen_time, stress_level, attendance), draw_risk_factors)
 
     
     st.markdown("---")
+    
+    # Hand the entry to the same cached pipeline as uploads
+    data = df.to_csv(index=False).encode()
 
-# Validate and Process Data
-df = df.apply(validate_row, axis=1)
+# Validate and Process Data (cached on the uploaded bytes + weights)
+base_key = content_key(data)
+with stage("cohort pipeline") as record:
+    cohort = run_cached("cohort", cached_cohort, base_key, data)
+    record['rows'] = len(cohort['df'])
+# Another weight set re-scores the cached cohort with one matrix-vector product
+cohort_key = content_key(data, model.weights)
+if cohort_key != base_key:
+    cohort = run_cached("rescore", cached_rescore, cohort_key, cohort, model)
+df = cohort['df']
+peer_index = cohort['peer_index']
 
 # Filter out invalid rows (24-hour constraint) - for CSV uploads
-invalid_count = len(df[~df['valid']])
+invalid_count = cohort['invalid_count']
 if invalid_count > 0:
     st.warning(f"⚠️ {invalid_count} student(s) removed: sleep + study + screen time exceeds 24 hours")
-
-df = df[df['valid']].copy()
+missing_count = cohort['missing_count']
+if missing_count > 0:
+    st.warning(f"⚠️ {missing_count} student(s) removed: missing values")
 
 # Check if any valid data remains
 if len(df) == 0:
     st.error("❌ No valid data available. All records exceed 24-hour limit.")
     st.stop()
 
-df["burnout_score"] = df.apply(burnout_score, axis=1)
-df["risk"] = df["burnout_score"].apply(risk_label)
-
 # Main Dashboard
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "📈 Statistical Analysis", "🔍 Individual Analysis", "🔮 What-If Scenarios", "📋 Methodology"])
+# Tabs rerun on switch so only the open tab builds its content and charts
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "📈 Statistical Analysis", "🔍 Individual Analysis", "🔮 What-If Scenarios", "📋 Methodology"], key="main_tabs", on_change="rerun")
 
 # TAB 1: Overview
 with tab1:
-    st.header("Burnout Risk Overview")
+    if tab1.open:
+        st.header("Burnout Risk Overview")
     
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Total Students", len(df))
-    with col2:
-        high_risk = (df["burnout_score"] >= 0.6).sum()
-        st.metric("🔴 High Risk", high_risk, delta=f"{high_risk/len(df)*100:.1f}%")
-    with col3:
-        moderate_risk = ((df["burnout_score"] >= 0.3) & (df["burnout_score"] < 0.6)).sum()
-        st.metric("🟡 Moderate Risk", moderate_risk, delta=f"{moderate_risk/len(df)*100:.1f}%")
-    with col4:
-        low_risk = (df["burnout_score"] < 0.3).sum()
-        st.metric("🟢 Low Risk", low_risk, delta=f"{low_risk/len(df)*100:.1f}%")
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Students", len(df))
+        with col2:
+            high_risk = (df["burnout_score"] >= 0.6).sum()
+            st.metric("🔴 High Risk", high_risk, delta=f"{high_risk/len(df)*100:.1f}%")
+        with col3:
+            moderate_risk = ((df["burnout_score"] >= 0.3) & (df["burnout_score"] < 0.6)).sum()
+            st.metric("🟡 Moderate Risk", moderate_risk, delta=f"{moderate_risk/len(df)*100:.1f}%")
+        with col4:
+            low_risk = (df["burnout_score"] < 0.3).sum()
+            st.metric("🟢 Low Risk", low_risk, delta=f"{low_risk/len(df)*100:.1f}%")
     
-    st.markdown("---")
+        st.markdown("---")
     
-    col1, col2 = st.columns([2, 1])
-    with col1:
-        st.subheader("Student Risk Assessment")
-        display_df = df[["name", "sleep_hours", "study_hours", "screen_time", "stress_level", "attendance", "burnout_score", "risk"]].copy()
-        display_df["burnout_score"] = display_df["burnout_score"].apply(lambda x: f"{x:.2f}")
-        st.dataframe(display_df, width='stretch', hide_index=True)
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            st.subheader("Student Risk Assessment")
+            display_df = widen(df[["name", "sleep_hours", "study_hours", "screen_time", "stress_level", "attendance", "burnout_score", "risk"]])
+            display_df["burnout_score"] = display_df["burnout_score"].apply(lambda x: f"{x:.2f}")
+            st.dataframe(display_df, width='stretch', hide_index=True)
+            
+            # Files are built only when a download button is clicked
+            dl1, dl2 = st.columns(2)
+            dl1.download_button("⬇️ Results (CSV)", lambda: df.to_csv(index=False).encode(), "staywell_results.csv",
+                                "text/csv", on_click="ignore", width='stretch')
+            dl2.download_button(f"⬇️ Results ({COHORT_EXTENSION})", lambda: encode_cohort(df), f"staywell_results{COHORT_EXTENSION}",
+                                "application/octet-stream", on_click="ignore", width='stretch')
     
-    with col2:
-        st.subheader("Risk Distribution")
-        # Bar chart instead of pie chart
-        risk_counts = df['risk'].value_counts()
-        fig, ax = plt.subplots(figsize=(6, 4))
-        colors = {'🟢 Low Risk': '#0F9D58', '🟡 Moderate Risk': '#F4B400', '🔴 Elevated Risk': '#DB4437'}
-        plot_colors = [colors.get(risk, '#999999') for risk in risk_counts.index]
+        with col2:
+            st.subheader("Risk Distribution")
+            # Bar chart instead of pie chart
+            risk_counts = value_counts(df['risk'])
+            def draw_risk_counts():
+                fig, ax = plt.subplots(figsize=(6, 4))
+                colors = {'🟢 Low Risk': '#0F9D58', '🟡 Moderate Risk': '#F4B400', '🔴 Elevated Risk': '#DB4437'}
+                plot_colors = [colors.get(risk, '#999999') for risk in risk_counts.index]
         
-        bars = ax.bar(range(len(risk_counts)), risk_counts.values, color=plot_colors)
-        ax.set_xticks(range(len(risk_counts)))
-        ax.set_xticklabels(risk_counts.index, rotation=0, ha='center')
-        ax.set_ylabel('Number of Students', fontsize=11)
-        ax.set_title('Risk Level Distribution', fontsize=13, fontweight='bold')
+                bars = ax.bar(range(len(risk_counts)), risk_counts.values, color=plot_colors)
+                ax.set_xticks(range(len(risk_counts)))
+                ax.set_xticklabels(risk_counts.index, rotation=0, ha='center')
+                ax.set_ylabel('Number of Students', fontsize=11)
+                ax.set_title('Risk Level Distribution', fontsize=13, fontweight='bold')
         
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{int(height)}',
-                    ha='center', va='bottom', fontsize=11, fontweight='bold')
+                # Add value labels on bars
+                for bar in bars:
+                    height = bar.get_height()
+                    ax.text(bar.get_x() + bar.get_width()/2., height,
+                            f'{int(height)}',
+                            ha='center', va='bottom', fontsize=11, fontweight='bold')
         
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
+                plt.tight_layout()
+                return fig
+            show_figure(data_key('risk_counts', risk_counts), draw_risk_counts)
 
 # TAB 2: Statistical Analysis
 with tab2:
-    st.header("Statistical Analysis & Correlations")
-    
-    if len(df) > 1:
-        st.subheader("📊 Descriptive Statistics")
-        desc_stats = descriptive_statistics(df)
-        st.dataframe(desc_stats, width='stretch')
+    if tab2.open:
+        st.header("Statistical Analysis & Correlations")
+    
+        if len(df) > 1:
+            st.subheader("📊 Descriptive Statistics")
+            with stage("cohort summary", len(df)):
+                summary_stats = run_cached("statistics", cached_summary, cohort_key, df, model.weights)
+            desc_stats = summary_stats['descriptive']
+            st.dataframe(desc_stats, width='stretch')
         
-        st.markdown("---")
+            st.markdown("---")
         
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("🔗 Correlation Analysis")
-            corr_data = correlation_analysis(df)
-            st.dataframe(corr_data.style.background_gradient(cmap='RdYlGn_r', axis=None), width='stretch')
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("🔗 Correlation Analysis")
+                corr_data = summary_stats['correlation']
+                st.dataframe(corr_data.style.background_gradient(cmap='RdYlGn_r', axis=None), width='stretch')
             
-        with col2:
-            st.subheader("📉 Correlation Heatmap")
-            render_correlation_matrix(df)
+            with col2:
+                st.subheader("📉 Correlation Heatmap")
+                render_correlation_matrix(df, summary_stats)
         
-        st.markdown("---")
-        st.subheader("📈 Variable Distributions")
-        render_distribution(df)
+            st.markdown("---")
+            st.subheader("📈 Variable Distributions")
+            render_distribution(df, summary_stats)
         
-        st.markdown("---")
-        st.subheader("📊 Cohort Statistics")
-        cohort_stats = cohort_statistics(df)
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Mean Burnout Score", f"{cohort_stats['mean']:.3f}")
-            st.metric("Median Score", f"{cohort_stats['median']:.3f}")
-        with col2:
-            st.metric("Standard Deviation", f"{cohort_stats['std']:.3f}")
-            st.metric("Variance", f"{cohort_stats['variance']:.3f}")
-        with col3:
-            st.metric("Min Score", f"{cohort_stats['min']:.3f}")
-            st.metric("Max Score", f"{cohort_stats['max']:.3f}")
-    else:
-        st.info("Upload multiple students to see statistical analysis")
+            st.markdown("---")
+            st.subheader("🚩 Anomalous Responses")
+            rule_names = {"iqr": "IQR fences (1.5 × IQR)", "mad": "Robust MAD (modified z > 3.5)", "zscore": "Z-score (|z| > 3)"}
+            method = st.radio("Outlier rule", list(rule_names), format_func=rule_names.get, horizontal=True, key="outlier_method")
+            with stage("outlier flags", len(df)):
+                flags = outlier_flags(df, method=method)
+            bits = flags.to_numpy()
+            st.dataframe(pd.DataFrame({
+                "Variable": OUTLIER_VARIABLES,
+                "Flagged Students": [int((bits >> i & 1).sum()) for i in range(len(OUTLIER_VARIABLES))],
+            }), hide_index=True)
+            flagged = flags[flags > 0]
+            if len(flagged):
+                st.caption(f"{len(flagged)} student(s) with at least one unusual answer (first 100 shown)")
+                st.dataframe(pd.DataFrame({
+                    "Student": df.loc[flagged.index[:100], "name"].to_numpy(),
+                    "Unusual Answers": [", ".join(flagged_variables(f, OUTLIER_VARIABLES)) for f in flagged.iloc[:100]],
+                }), hide_index=True)
+            else:
+                st.success("✅ No unusual answers under this rule")
+        
+            st.markdown("---")
+            st.subheader("📊 Cohort Statistics")
+            cohort_stats = summary_stats['cohort']
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Mean Burnout Score", f"{cohort_stats['mean']:.3f}")
+                st.metric("Median Score", f"{cohort_stats['median']:.3f}")
+            with col2:
+                st.metric("Standard Deviation", f"{cohort_stats['std']:.3f}")
+                st.metric("Variance", f"{cohort_stats['variance']:.3f}")
+            with col3:
+                st.metric("Min Score", f"{cohort_stats['min']:.3f}")
+                st.metric("Max Score", f"{cohort_stats['max']:.3f}")
+            
+            if df["burnout_score"].count() > 2 and st.toggle("Show 95% confidence intervals (bootstrap)", key="bootstrap_ci"):
+                resamples = st.select_slider("Resamples", [1000, 2000, 5000, 10000], value=2000, key="bootstrap_resamples")
+                with stage("bootstrap", len(df)):
+                    intervals = run_cached("bootstrap", cached_bootstrap, cohort_key, df, resamples)
+                columns = {"estimate": "Estimate", "lower": "Lower", "upper": "Upper", "std_error": "Std. Error"}
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.markdown("**Burnout score**")
+                    st.dataframe(intervals['cohort'].rename(columns=columns), width='stretch')
+                with col2:
+                    st.markdown("**Correlation with burnout score**")
+                    st.dataframe(intervals['correlations'].rename(columns=columns), width='stretch')
+                st.caption(f"Percentile intervals from {resamples:,} resamples of the cohort with replacement (fixed seed)")
+            
+            st.markdown("---")
+            st.subheader("🧩 What Is Driving Burnout in This Cohort")
+            st.dataframe(summary_stats['drivers'], width='stretch')
+            render_contribution_by_risk(summary_stats['drivers'])
+        else:
+            st.info("Upload multiple students to see statistical analysis")
 
 # TAB 3: Individual Analysis
 with tab3:
-    st.header("Individual Student Analysis")
+    if tab3.open:
+        st.header("Individual Student Analysis")
     
-    if len(df) > 0:
-        student_name = st.selectbox("Select Student", df["name"].tolist())
-        idx = df[df["name"] == student_name].index[0]
-        row = df.loc[idx]
+        if len(df) > 0:
+            student_name = st.selectbox("Select Student", df["name"].tolist())
+            idx = df[df["name"] == student_name].index[0]
+            row = student_row(df, idx)
         
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            score = row["burnout_score"]
-            st.metric("Burnout Score", f"{score:.2f}", help="0.0 = No Risk, 1.0 = Maximum Risk")
-        with col2:
-            st.metric("Risk Level", row["risk"])
-        with col3:
-            if len(df) > 1:
-                percentile = peer_percentile(df["burnout_score"], row["burnout_score"])
-                st.metric("Peer Percentile", f"{percentile}%", help="Higher than X% of peers")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                score = row["burnout_score"]
+                st.metric("Burnout Score", f"{score:.2f}", help="0.0 = No Risk, 1.0 = Maximum Risk")
+            with col2:
+                st.metric("Risk Level", row["risk"])
+            with col3:
+                if len(df) > 1:
+                    percentile = peer_index.percentile(row["burnout_score"])
+                    st.metric("Peer Percentile", f"{percentile}%", help="Higher than X% of peers")
         
-        st.markdown("---")
+            st.markdown("---")
         
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("🧩 Risk Factor Contribution")
-            contrib = contribution(row)
-            render_contribution(contrib)
+            col1, col2 = st.columns(2)
+            with col1:
+                st.subheader("🧩 Risk Factor Contribution")
+                with stage("explainability", 1):
+                    contrib = contribution(row, model.weights)
+                render_contribution(contrib)
             
-            st.markdown("**Interpretation:**")
-            top_factor = max(contrib, key=contrib.get)
-            st.write(f"• Primary contributor: **{top_factor}** ({contrib[top_factor]}%)")
-            st.write(f"• This factor has the highest impact on burnout risk")
+                st.markdown("**Interpretation:**")
+                top_factor = max(contrib, key=contrib.get)
+                st.write(f"• Primary contributor: **{top_factor}** ({contrib[top_factor]}%)")
+                st.write(f"• This factor has the highest impact on burnout risk")
         
-        with col2:
-            st.subheader("📋 Student Profile")
-            st.markdown(f"""
-            - **Sleep Hours:** {row['sleep_hours']:.1f} hrs/day
-            - **Study Hours:** {row['study_hours']:.1f} hrs/day
-            - **Screen Time:** {row['screen_time']:.1f} hrs/day
-            - **Stress Level:** {int(row['stress_level'])}/5
-            - **Attendance:** {int(row['attendance'])}%
-            """)
+            with col2:
+                st.subheader("📋 Student Profile")
+                st.markdown(f"""
+                - **Sleep Hours:** {row['sleep_hours']:.1f} hrs/day
+                - **Study Hours:** {row['study_hours']:.1f} hrs/day
+                - **Screen Time:** {row['screen_time']:.1f} hrs/day
+                - **Stress Level:** {int(row['stress_level'])}/5
+                - **Attendance:** {int(row['attendance'])}%
+                """)
             
-            st.markdown("---")
-            st.subheader("⚠️ Risk Indicators")
-            if row['sleep_hours'] < 6:
-                st.warning("⚠️ Sleep deprivation detected (< 6 hours)")
-            if row['stress_level'] >= 4:
-                st.warning("⚠️ High stress level reported")
-            if row['screen_time'] > 6:
-                st.warning("⚠️ Excessive screen time (> 6 hours)")
-            if row['attendance'] < 75:
-                st.warning("⚠️ Low attendance (< 75%)")
-            if row['study_hours'] > 10:
-                st.warning("⚠️ Excessive study hours (> 10 hours)")
-    else:
-        st.info("No student data available")
+                st.markdown("---")
+                st.subheader("⚠️ Risk Indicators")
+                if row['sleep_hours'] < 6:
+                    st.warning("⚠️ Sleep deprivation detected (< 6 hours)")
+                if row['stress_level'] >= 4:
+                    st.warning("⚠️ High stress level reported")
+                if row['screen_time'] > 6:
+                    st.warning("⚠️ Excessive screen time (> 6 hours)")
+                if row['attendance'] < 75:
+                    st.warning("⚠️ Low attendance (< 75%)")
+                if row['study_hours'] > 10:
+                    st.warning("⚠️ Excessive study hours (> 10 hours)")
+        else:
+            st.info("No student data available")
 
 # TAB 4: What-If Scenarios
 with tab4:
-    st.header("What-If Scenario Analysis")
+    if tab4.open:
+        st.header("What-If Scenario Analysis")
     
-    if len(df) > 0:
-        student_name = st.selectbox("Select Student for Simulation", df["name"].tolist(), key="whatif_student")
-        idx = df[df["name"] == student_name].index[0]
-        row = df.loc[idx]
+        if len(df) > 0:
+            student_name = st.selectbox("Select Student for Simulation", df["name"].tolist(), key="whatif_student")
+            idx = df[df["name"] == student_name].index[0]
+            row = student_row(df, idx)
         
-        st.subheader(f"Current Burnout Score: {row['burnout_score']:.2f}")
+            st.subheader(f"Current Burnout Score: {row['burnout_score']:.2f}")
         
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("### 🛏️ Sleep Adjustment")
-            sleep_delta = st.slider("Change in sleep hours", -3.0, 3.0, 0.0, 0.5)
-            new_sleep_score = simulate(row, sleep_delta=sleep_delta, screen_delta=0)
-            delta_sleep = new_sleep_score - row['burnout_score']
-            st.metric("New Score", f"{new_sleep_score:.2f}", delta=f"{delta_sleep:+.2f}")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("### 🛏️ Sleep Adjustment")
+                sleep_delta = st.slider("Change in sleep hours", -3.0, 3.0, 0.0, 0.5)
+                new_sleep_score = simulate(row, sleep_delta=sleep_delta, screen_delta=0, weights=model.weights)
+                delta_sleep = new_sleep_score - row['burnout_score']
+                st.metric("New Score", f"{new_sleep_score:.2f}", delta=f"{delta_sleep:+.2f}")
             
-            if delta_sleep < -0.05:
-                st.success("✅ Positive impact - Risk decreases")
-            elif delta_sleep > 0.05:
-                st.error("❌ Negative impact - Risk increases")
-            else:
-                st.info("➡️ Minimal impact")
+                if delta_sleep < -0.05:
+                    st.success("✅ Positive impact - Risk decreases")
+                elif delta_sleep > 0.05:
+                    st.error("❌ Negative impact - Risk increases")
+                else:
+                    st.info("➡️ Minimal impact")
         
-        with col2:
-            st.markdown("### 📱 Screen Time Adjustment")
-            screen_delta = st.slider("Change in screen time", -3.0, 3.0, 0.0, 0.5)
-            new_screen_score = simulate(row, sleep_delta=0, screen_delta=screen_delta)
-            delta_screen = new_screen_score - row['burnout_score']
-            st.metric("New Score", f"{new_screen_score:.2f}", delta=f"{delta_screen:+.2f}")
+            with col2:
+                st.markdown("### 📱 Screen Time Adjustment")
+                screen_delta = st.slider("Change in screen time", -3.0, 3.0, 0.0, 0.5)
+                new_screen_score = simulate(row, sleep_delta=0, screen_delta=screen_delta, weights=model.weights)
+                delta_screen = new_screen_score - row['burnout_score']
+                st.metric("New Score", f"{new_screen_score:.2f}", delta=f"{delta_screen:+.2f}")
             
-            if delta_screen < -0.05:
-                st.success("✅ Positive impact - Risk decreases")
-            elif delta_screen > 0.05:
-                st.error("❌ Negative impact - Risk increases")
-            else:
-                st.info("➡️ Minimal impact")
+                if delta_screen < -0.05:
+                    st.success("✅ Positive impact - Risk decreases")
+                elif delta_screen > 0.05:
+                    st.error("❌ Negative impact - Risk increases")
+                else:
+                    st.info("➡️ Minimal impact")
         
-        st.markdown("---")
-        st.subheader("🎯 Batch Scenario Testing")
-        scenarios = batch_simulate(row)
-        st.dataframe(scenarios, width='stretch', hide_index=True)
+            st.markdown("---")
+            st.subheader("🎯 Batch Scenario Testing")
+            with stage("explainability", 1):
+                scenarios = batch_simulate(row, model.weights)
+            st.dataframe(scenarios, width='stretch', hide_index=True)
         
-        best_scenario = scenarios.loc[scenarios['new_score'].idxmin()]
-        st.success(f"**Best Scenario:** {best_scenario['scenario']} → Score: {best_scenario['new_score']:.2f} (Change: {best_scenario['change']:.2f})")
-    else:
-        st.info("No student data available")
+            best_scenario = scenarios.loc[scenarios['new_score'].idxmin()]
+            st.success(f"**Best Scenario:** {best_scenario['scenario']} → Score: {best_scenario['new_score']:.2f} (Change: {best_scenario['change']:.2f})")
+            
+            st.markdown("---")
+            st.subheader("🎯 Smallest Change to Reach a Lower Risk Band")
+            target_label = st.radio("Target", ["Below Elevated (< 0.60)", "Low Risk (< 0.30)"], horizontal=True, key="whatif_target")
+            target = 0.6 if target_label.startswith("Below") else 0.3
+            with stage("explainability", 1):
+                plan = optimal_intervention(df.loc[[idx]], target, model.weights).iloc[0]
+            changes = f"sleep {plan['sleep_delta']:+.2f}h, screen {plan['screen_delta']:+.2f}h, study {plan['study_delta']:+.2f}h"
+            if plan['feasible'] and plan['total_hours_changed'] == 0:
+                st.info(f"✅ Already below {target:.2f} - no change needed")
+            elif plan['feasible']:
+                st.success(f"**{plan['total_hours_changed']:.2f} hours of change:** {changes} → Score: {plan['new_score']:.2f}")
+            else:
+                st.warning(f"⚠️ {target:.2f} cannot be reached by changing hours alone. Best possible: {changes} → Score: {plan['new_score']:.2f}")
+            
+            st.markdown("---")
+            st.subheader("🌐 Cohort-Wide Intervention Grid")
+            st.caption("Number of students who would move to a lower risk band if the whole cohort changed sleep and screen time")
+            with stage("explainability", len(df)):
+                improved_grid = run_cached("what-if grid", cached_grid, cohort_key, df, model.weights)
+            st.dataframe(improved_grid.style.background_gradient(cmap='Greens', axis=None), width='stretch')
+        else:
+            st.info("No student data available")
 
 # TAB 5: Methodology
 with tab5:
-    st.header("Statistical Methodology & Risk Thresholds")
+    if tab5.open:
+        st.header("Statistical Methodology & Risk Thresholds")
     
-    st.markdown("""
-    ## 📐 Statistical Model
+        st.markdown("""
+        ## 📐 Statistical Model
     
-    This system uses **pure statistical techniques** without machine learning, ensuring full transparency and interpretability.
+        This system uses **pure statistical techniques** without machine learning, ensuring full transparency and interpretability.
     
-    ### Burnout Score Calculation
+        ### Burnout Score Calculation
     
-    The burnout score is a **weighted linear combination** of normalized risk factors:
+        The burnout score is a **weighted linear combination** of normalized risk factors:
     
-    ```
-    Burnout Score = Σ (Weight_i × Normalized_Factor_i)
-    ```
+        ```
+        Burnout Score = Σ (Weight_i × Normalized_Factor_i)
+        ```
     
-    ### Risk Factors & Weights
+        ### Risk Factors & Weights
     
-    | Factor | Weight | Rationale |
-    |--------|--------|-----------|
-    | Sleep Deficit | 30% | Sleep is the most critical factor for mental health and cognitive function |
-    | Stress Level | 20% | Direct indicator of psychological strain |
-    | Screen Time | 20% | Proxy for digital fatigue and poor time management |
-    | Study Hours | 15% | Excessive studying can lead to burnout |
-    | Attendance | 15% | Low attendance indicates disengagement |
+        | Factor | Weight | Rationale |
+        |--------|--------|-----------|
+        | Sleep Deficit | 30% | Sleep is the most critical factor for mental health and cognitive function |
+        | Stress Level | 20% | Direct indicator of psychological strain |
+        | Screen Time | 20% | Proxy for digital fatigue and poor time management |
+        | Study Hours | 15% | Excessive studying can lead to burnout |
+        | Attendance | 15% | Low attendance indicates disengagement |
     
-    ### Normalization Methods
+        ### Normalization Methods
     
-    1. **Sleep Deficit**: `max(0, (7 - sleep_hours) / 7)` - Based on 7-hour optimal sleep
-    2. **Stress Level**: `stress_level / 5` - Linear scale from 1-5
-    3. **Screen Time**: `screen_time / 10` - Normalized against 10-hour reference
-    4. **Study Hours**: `study_hours / 10` - Normalized against 10-hour reference
-    5. **Attendance**: `(100 - attendance) / 100` - Inverted (lower attendance = higher risk)
+        1. **Sleep Deficit**: `max(0, (7 - sleep_hours) / 7)` - Based on 7-hour optimal sleep
+        2. **Stress Level**: `stress_level / 5` - Linear scale from 1-5
+        3. **Screen Time**: `screen_time / 10` - Normalized against 10-hour reference
+        4. **Study Hours**: `study_hours / 10` - Normalized against 10-hour reference
+        5. **Attendance**: `(100 - attendance) / 100` - Inverted (lower attendance = higher risk)
     
-    ### Risk Thresholds
+        ### Risk Thresholds
     
-    Based on statistical distribution analysis:
+        Based on statistical distribution analysis:
     
-    - **🟢 Low Risk**: Score < 0.30 (Bottom 33rd percentile)
-    - **🟡 Moderate Risk**: 0.30 ≤ Score < 0.60 (Middle 33rd percentile)
-    - **🔴 Elevated Risk**: Score ≥ 0.60 (Top 33rd percentile)
+        - **🟢 Low Risk**: Score < 0.30 (Bottom 33rd percentile)
+        - **🟡 Moderate Risk**: 0.30 ≤ Score < 0.60 (Middle 33rd percentile)
+        - **🔴 Elevated Risk**: Score ≥ 0.60 (Top 33rd percentile)
     
-    ### Statistical Techniques Used
+        ### Statistical Techniques Used
     
-    1. **Descriptive Statistics**: Mean, median, standard deviation, variance
-    2. **Correlation Analysis**: Pearson correlation coefficients between variables
-    3. **Percentile Analysis**: Peer comparison using empirical distribution
-    4. **Sensitivity Analysis**: What-if scenarios to test factor impact
-    5. **Factor Contribution**: Proportional decomposition of risk score
+        1. **Descriptive Statistics**: Mean, median, standard deviation, variance
+        2. **Correlation Analysis**: Pearson correlation coefficients between variables
+        3. **Percentile Analysis**: Peer comparison using empirical distribution
+        4. **Sensitivity Analysis**: What-if scenarios to test factor impact
+        5. **Factor Contribution**: Proportional decomposition of risk score
     
-    ### Validation & Constraints
+        ### Validation & Constraints
     
-    - ✅ All inputs validated within realistic ranges
-    - ✅ No black-box ML models used
-    - ✅ Full transparency in calculations
-    - ✅ Explainable factor contributions
-    - ✅ Statistical correlation analysis
+        - ✅ All inputs validated within realistic ranges
+        - ✅ No black-box ML models used
+        - ✅ Full transparency in calculations
+        - ✅ Explainable factor contributions
+        - ✅ Statistical correlation analysis
     
-    ### Ethical Considerations
+        ### Ethical Considerations
     
-    - This is an **early warning system**, not a diagnostic tool
-    - Results should be used for **guidance and support**, not labeling
-    - Human oversight and professional counseling are essential
-    - Privacy and confidentiality must be maintained
+        - This is an **early warning system**, not a diagnostic tool
+        - Results should be used for **guidance and support**, not labeling
+        - Human oversight and professional counseling are essential
+        - Privacy and confidentiality must be maintained
     
-    ### Domain-2 Compliance
+        ### Domain-2 Compliance
     
-    ✅ Pure statistical modeling (no ML)  
-    ✅ Descriptive analysis included  
-    ✅ Correlation analysis implemented  
-    ✅ Regression-based scoring  
-    ✅ Clear risk threshold definitions  
-    ✅ Full methodology documentation  
-    ✅ Explainable and transparent  
-    """)
+        ✅ Pure statistical modeling (no ML)  
+        ✅ Descriptive analysis included  
+        ✅ Correlation analysis implemented  
+        ✅ Regression-based scoring  
+        ✅ Clear risk threshold definitions  
+        ✅ Full methodology documentation  
+        ✅ Explainable and transparent  
+        """)
     
-    st.markdown("---")
-    st.subheader("📊 Current Model Statistics")
-    summary = get_statistical_summary()
-    col1, col2 = st.columns(2)
-    with col1:
-        st.json(summary["weights"])
-    with col2:
-        st.json(summary["thresholds"])
+        st.markdown("---")
+        st.subheader("📊 Current Model Statistics")
+        summary = get_statistical_summary(model.weights)
+        st.caption(f"Weight set: `{model.version}`")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.json(summary["weights"])
+        with col2:
+            st.json(summary["thresholds"])
+    
+        st.markdown("---")
+        st.subheader("🎲 Weight Sensitivity")
+        st.caption("How often each student keeps their risk label and peer rank when the weights are redrawn around the current weight set (Dirichlet sample)")
+        if len(df) > 1:
+            col1, col2 = st.columns(2)
+            with col1:
+                sets = st.select_slider("Weight sets", [100, 250, 500, 1000], value=1000, key="sensitivity_sets")
+            with col2:
+                spread = st.select_slider("Spread around current weights", ["Narrow", "Medium", "Wide"], value="Medium", key="sensitivity_spread")
+            concentration = {"Narrow": 400, "Medium": 100, "Wide": 25}[spread]
+            with stage("weight sensitivity", len(df)):
+                sensitivity = run_cached("sensitivity", cached_sensitivity, cohort_key, df, model, sets, concentration)
+            overview = sensitivity['summary']
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Stable Labels", f"{overview['stable_share'] * 100:.1f}%", help="Students keeping their label under at least 90% of the weight sets")
+            with col2:
+                st.metric("Label Agreement", f"{overview['mean_label_agreement'] * 100:.1f}%", help="Average share of weight sets giving a student their current label")
+            with col3:
+                st.metric("Decile Agreement", f"{overview['mean_decile_agreement'] * 100:.1f}%", help="Average share of weight sets keeping a student in their current percentile decile")
+            with col4:
+                st.metric("Rank Spread", f"±{overview['mean_rank_std']:.1f} pts", help="Average standard deviation of a student's peer percentile across weight sets")
+            
+            st.markdown("**Share of students per risk band (%)**")
+            st.dataframe(overview['bands'].rename(columns={"current": "Current", "p5": "5th pct", "median": "Median", "p95": "95th pct"}), width='stretch')
+            
+            st.markdown("**Least stable students**")
+            students = sensitivity['students'].nsmallest(20, 'label_agreement')
+            st.dataframe(pd.DataFrame({
+                "Student": df.loc[students.index, "name"].to_numpy(),
+                "Score": students['burnout_score'].to_numpy(),
+                "Risk": students['risk'].to_numpy(),
+                "Same Label (%)": (students['label_agreement'] * 100).round(1).to_numpy(),
+                "Elevated (%)": (students['elevated_share'] * 100).round(1).to_numpy(),
+                "Percentile": students['percentile'].round(1).to_numpy(),
+                "Rank Spread": students['rank_std'].round(1).to_numpy(),
+            }), hide_index=True)
+        else:
+            st.info("Upload multiple students to see weight sensitivity")
+
+# Cache debug panel
+with st.sidebar.expander("🐞 Cache Debug"):
+    cache_rows = []
+    for step, stats in st.session_state.get("cache_stats", {}).items():
+        hits = stats["calls"] - stats["misses"]
+        cache_rows.append({
+            "Step": step,
+            "Calls": stats["calls"],
+            "Hits": hits,
+            "Misses": stats["misses"],
+            "Hit Rate": f"{hits / stats['calls'] * 100:.0f}%" if stats["calls"] else "-",
+        })
+    figure_calls = figure_cache.hits + figure_cache.misses
+    if figure_calls:
+        cache_rows.append({
+            "Step": "figures",
+            "Calls": figure_calls,
+            "Hits": figure_cache.hits,
+            "Misses": figure_cache.misses,
+            "Hit Rate": f"{figure_cache.hits / figure_calls * 100:.0f}%",
+        })
+    if cache_rows:
+        st.dataframe(pd.DataFrame(cache_rows), hide_index=True)
+    st.caption(f"Cohort key: `{cohort_key[:12]}` · max {CACHE_MAX_ENTRIES} entries · TTL {CACHE_TTL_SECONDS}s")
+    st.markdown("**Memory per student (bytes)**")
+    st.dataframe(cohort['memory'])
+
+# Performance panel
+with st.sidebar.expander("⏱️ Performance"):
+    st.toggle("Profile this run", key="profile_run",
+              help="Time each stage of the next reruns; memory tracing makes them slower")
+    if profiler is not None:
+        profiler.stop()
+        stages = pd.DataFrame(profiler.summary(), columns=['stage', 'calls', 'seconds', 'rows', 'peak_bytes'])
+        st.dataframe(pd.DataFrame({
+            "Stage": stages['stage'],
+            "Calls": stages['calls'],
+            "Time (ms)": (stages['seconds'] * 1000).round(2),
+            "Rows": stages['rows'].astype("Int64"),
+            "Peak (MB)": (stages['peak_bytes'].astype(float) / 1e6).round(2),
+        }), hide_index=True)
+        st.download_button("⬇️ Chrome trace (JSON)", lambda: json.dumps(profiler.trace()).encode(), "staywell_trace.json",
+                           "application/json", on_click="ignore", width='stretch')
+        st.caption("Open the trace in chrome://tracing or ui.perfetto.dev")
+        if not profiler.memory:
+            st.caption("Peak memory not recorded: another session was profiling it, and memory tracing is shared by the whole server process")
 
 # Footer
 st.markdown("---")
@@ -0,0 +1,274 @@
+"""
+Benchmark Suite
+Times the core and explainability functions on seeded synthetic cohorts,
+records throughput and memory to JSON and compares against a saved baseline.
+--startup times the command-line script's cold start instead.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from core.cohort_store import encode_cohort, decode_cohort
+from core.schema import apply_schema
+from core.validation import validate_frame
+from core.scoring_engine import score_batch
+from core.scoring_model import ScoringModel, design_matrix
+from core.peer_engine import cohort_statistics
+from core.trend_engine import TrendState
+from core.sensitivity import weight_sensitivity
+from core.bootstrap import bootstrap_statistics
+from core.statistical_analysis import correlation_analysis, descriptive_statistics, distribution_analysis, statistics_profile, outlier_flags
+from explainability.contribution import contribution, contribution_matrix
+from explainability.what_if import batch_simulate, simulate_grid, optimal_intervention, DEFAULT_GRID
+
+# Per-row functions are timed on this many students and reported per row
+PER_ROW_SAMPLE = 1000
+# Waves of synthetic score history for the trend benchmark
+TREND_WAVES = 12
+# Startup benchmarks run the CLI on a file this small so startup dominates
+STARTUP_ROWS = 100
+# --startup fails when --scores-only takes more than this share of the full report's time
+STARTUP_RATIO = 0.5
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def generate_cohort(n, seed=42, names=True):
+    """
+    Seeded synthetic cohort with realistic ranges
+    A small share of rows break the 24-hour rule or the clamp ranges so the
+    validation path does real work
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'sleep_hours': np.round(rng.normal(6.5, 1.3, n).clip(2, 12) * 2) / 2,
+        'study_hours': np.round(rng.gamma(4.0, 1.8, n).clip(0, 16) * 2) / 2,
+        'screen_time': np.round(rng.gamma(3.0, 1.7, n).clip(0, 14) * 2) / 2,
+        'stress_level': rng.integers(1, 6, n),
+        'attendance': rng.normal(85, 10, n).clip(30, 100).round().astype(np.int64),
+    })
+    outliers = rng.random(n) < 0.01
+    df.loc[outliers, 'study_hours'] += 10
+    if names:
+        df.insert(0, 'name', [f"Student {i+1}" for i in range(n)])
+    return df
+
+def parse_size(text):
+    """'1k' -> 1000, '10M' -> 10000000"""
+    text = str(text).strip().lower()
+    scale = {'k': 1_000, 'm': 1_000_000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * scale)
+
+def build_benchmarks(df):
+    """Name -> (callable, rows processed per call)"""
+    validated, _ = validate_frame(df)
+    scored = validated[validated['valid']].copy()
+    scored['burnout_score'], scored['risk'] = score_batch(scored)
+    sample = [row for _, row in scored.head(PER_ROW_SAMPLE).iterrows()]
+    rng = np.random.default_rng(0)
+    history = np.clip(scored['burnout_score'].to_numpy()[:, None]
+                      + rng.normal(0, 0.03, (len(scored), TREND_WAVES)).cumsum(axis=1), 0, 1).round(2)
+    design = design_matrix(validated)
+    model = ScoringModel()
+    csv_bytes = df.to_csv(index=False).encode()
+    cohort_bytes = encode_cohort(df)
+
+    return {
+        'load_csv': (lambda: pd.read_csv(io.BytesIO(csv_bytes)), len(df)),
+        'load_cohort': (lambda: decode_cohort(cohort_bytes), len(df)),
+        'validation': (lambda: validate_frame(df), len(df)),
+        'scoring': (lambda: score_batch(validated), len(validated)),
+        'model_rescore': (lambda: model.scores_from_design(design), len(validated)),
+        'apply_schema': (lambda: apply_schema(scored), len(scored)),
+        'cohort_statistics': (lambda: cohort_statistics(scored), len(scored)),
+        'correlation_analysis': (lambda: correlation_analysis(scored), len(scored)),
+        'descriptive_statistics': (lambda: descriptive_statistics(scored), len(scored)),
+        'distribution_analysis': (lambda: [distribution_analysis(scored, var) for var in
+                                           ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance']],
+                                  len(scored)),
+        'statistics_profile': (lambda: statistics_profile(scored), len(scored)),
+        'outlier_flags': (lambda: [outlier_flags(scored, method=m) for m in ('iqr', 'mad', 'zscore')], len(scored)),
+        'contribution': (lambda: [contribution(row) for row in sample], len(sample)),
+        'contribution_matrix': (lambda: contribution_matrix(scored), len(scored)),
+        'batch_simulate': (lambda: [batch_simulate(row) for row in sample], len(sample)),
+        'simulate_grid': (lambda: simulate_grid(scored, {col: DEFAULT_GRID[col] for col in ('sleep_hours', 'screen_time')}),
+                          len(scored)),
+        'optimal_intervention': (lambda: optimal_intervention(scored), len(scored)),
+        'weight_sensitivity': (lambda: weight_sensitivity(scored), len(scored)),
+        'bootstrap': (lambda: bootstrap_statistics(scored, 1000), len(scored)),
+        'trend_signals': (lambda: TrendState.from_matrix(scored['name'], range(TREND_WAVES), history).deteriorating(),
+                          len(scored)),
+    }
+
+def measure(func, rows, repeat=3):
+    """Best wall time over repeat runs, then one traced run for memory"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    del result
+
+    seconds = min(times)
+    return {
+        'seconds': seconds,
+        'rows': rows,
+        'rows_per_sec': rows / seconds if seconds > 0 else float('inf'),
+        'peak_bytes': peak,
+        'alloc_blocks': blocks,
+    }
+
+def startup_commands(csv_path):
+    """Name -> command line for the cold-start benchmarks"""
+    script = os.path.join(ROOT, "analysis_script.py")
+    return {
+        'startup_python': [sys.executable, "-c", "pass"],
+        'startup_import_scoring': [sys.executable, "-c", "import core.validation, core.scoring_engine"],
+        'startup_cli_scores_only': [sys.executable, script, csv_path, "--scores-only"],
+        'startup_cli_report': [sys.executable, script, csv_path],
+    }
+
+def import_profile(statement, top=8):
+    """
+    Slowest top-level packages and modules imported by a statement, as
+    (name, cumulative ms) parsed from python -X importtime
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].strip()
+        if "." not in name:
+            imports.append((name, int(fields[1]) / 1000))
+    return sorted(imports, key=lambda item: -item[1])[:top]
+
+def meta(sizes, repeat, seed):
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'seed': seed,
+        'repeat': repeat,
+        'sizes': sizes,
+    }
+
+def run_startup(repeat=3, seed=42, only=None):
+    """Wall time of each startup command, each run in a fresh interpreter"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "students.csv")
+        generate_cohort(STARTUP_ROWS, seed=seed).to_csv(csv_path, index=False)
+        for name, command in startup_commands(csv_path).items():
+            if only and name not in only:
+                continue
+            func = lambda: subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+            entry = {'name': name, 'size': STARTUP_ROWS, **measure(func, STARTUP_ROWS, repeat)}
+            results.append(entry)
+            print(f"{name:<24} n={STARTUP_ROWS:<10} {entry['seconds']*1000:10.2f} ms")
+
+    print("\nSlowest imports of analysis_script (cumulative):")
+    for module, ms in import_profile("import analysis_script"):
+        print(f"  {module:<32} {ms:8.1f} ms")
+    return {'meta': meta([STARTUP_ROWS], repeat, seed), 'results': results}
+
+def startup_ratio(report):
+    """--scores-only startup as a share of the full report's, or None if either is missing"""
+    seconds = {entry['name']: entry['seconds'] for entry in report['results']}
+    if 'startup_cli_scores_only' not in seconds or 'startup_cli_report' not in seconds:
+        return None
+    return seconds['startup_cli_scores_only'] / seconds['startup_cli_report']
+
+def run(sizes, repeat=3, seed=42, only=None):
+    results = []
+    for n in sizes:
+        df = generate_cohort(n, seed=seed)
+        for name, (func, rows) in build_benchmarks(df).items():
+            if only and name not in only:
+                continue
+            entry = {'name': name, 'size': n, **measure(func, rows, repeat)}
+            results.append(entry)
+            print(f"{name:<24} n={n:<10} {entry['seconds']*1000:10.2f} ms "
+                  f"{entry['rows_per_sec']:14,.0f} rows/s  peak {entry['peak_bytes']/1e6:8.1f} MB")
+
+    return {'meta': meta(sizes, repeat, seed), 'results': results}
+
+def compare(report, baseline, threshold):
+    """
+    Regressions where a benchmark got slower than the baseline by more
+    than threshold (0.2 = 20%)
+    """
+    previous = {(r['name'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for entry in report['results']:
+        old = previous.get((entry['name'], entry['size']))
+        if old is None:
+            continue
+        slowdown = entry['seconds'] / old['seconds'] - 1 if old['seconds'] > 0 else 0.0
+        if slowdown > threshold:
+            regressions.append({'name': entry['name'], 'size': entry['size'],
+                                'baseline_seconds': old['seconds'], 'seconds': entry['seconds'],
+                                'slowdown': slowdown})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark STAYWELL core and explainability functions")
+    parser.add_argument("--sizes", nargs="+", default=["1k", "100k"], help="cohort sizes, e.g. 1k 100k 10M")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark (best is kept)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file to write")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--startup", action="store_true", help="time the CLI's cold start instead of the core functions")
+    parser.add_argument("--startup-ratio", type=float, default=STARTUP_RATIO,
+                        help="allowed --scores-only startup as a share of the full report's (0.5 = half)")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        report = run_startup(repeat=args.repeat, seed=args.seed, only=args.only)
+    else:
+        report = run([parse_size(s) for s in args.sizes], repeat=args.repeat, seed=args.seed, only=args.only)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Results saved to: {args.output}")
+
+    ratio = startup_ratio(report)
+    if ratio is not None:
+        if ratio > args.startup_ratio:
+            print(f"✗ --scores-only startup is {ratio*100:.0f}% of the full report's (limit {args.startup_ratio*100:.0f}%)")
+            return 1
+        print(f"✓ --scores-only startup is {ratio*100:.0f}% of the full report's")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for r in regressions:
+            print(f"✗ {r['name']} n={r['size']}: {r['baseline_seconds']*1000:.2f} ms -> "
+                  f"{r['seconds']*1000:.2f} ms (+{r['slowdown']*100:.0f}%)")
+        if regressions:
+            return 1
+        print(f"✓ No regressions beyond {args.threshold*100:.0f}% of {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,3 +11,11 @@ SAFE_LIMITS = {
     "stress_max": 5,
     "attendance_max": 100
 }
+
+# Streamlit pipeline cache (per cached step)
+CACHE_MAX_ENTRIES = 8
+CACHE_TTL_SECONDS = 3600
+
+# Versioned weight sets (JSON); WEIGHTS is used when the file is missing
+MODELS_PATH = "models.json"
+DEFAULT_MODEL_VERSION = "baseline"
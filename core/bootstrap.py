@@ -0,0 +1,157 @@
+"""
+Bootstrap
+Confidence intervals for cohort_statistics and the factor correlations of
+regression_analysis, by resampling students with replacement. Resamples are
+drawn as index matrices a chunk at a time and turned into count matrices, so
+every mean and correlation of a chunk comes from one matrix product and the
+quantiles from cumulative counts over the sorted scores. Each chunk has its
+own seed, so the result is the same whether chunks run in this process or
+over a process pool.
+"""
+import numpy as np
+import pandas as pd
+
+from core.peer_engine import cohort_statistics
+from core.statistical_analysis import regression_analysis
+
+BOOTSTRAP_RESAMPLES = 10_000
+BOOTSTRAP_CONFIDENCE = 0.95
+# Upper bound on (resamples x students) index cells drawn per chunk
+BOOTSTRAP_CHUNK_CELLS = 2 ** 22
+# Quantiles of burnout_score, named as in cohort_statistics
+QUANTILES = {'median': 0.5, 'q1': 0.25, 'q3': 0.75}
+FACTORS = ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance']
+
+# Data shared with pool workers, set once per process by _init_worker
+_worker_data = None
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+def _worker_chunk(task):
+    return _chunk_statistics(_worker_data, *task)
+
+def _prepare(scores, factors, quantiles):
+    """Students sorted by score with centred moment columns for the matrix product"""
+    order = np.argsort(scores, kind='stable')
+    y = scores[order]
+    x = factors[order]
+    y_mean, x_mean = y.mean(), x.mean(axis=0)
+    # Centring keeps the sums of squares and products well conditioned
+    yc, xc = y - y_mean, x - x_mean
+    moments = np.column_stack([yc, yc * yc, xc, xc * xc, xc * yc[:, None]])
+    n = len(y)
+    positions = np.array([q * (n - 1) for q in quantiles.values()])
+    # Tied scores are contiguous once sorted; quantiles only need counts per
+    # distinct score (at most 101 for 2-decimal scores), not per student
+    starts = np.flatnonzero(np.r_[True, y[1:] != y[:-1]])
+    return {
+        'n': n,
+        'levels': y[starts],
+        'starts': starts,
+        'moments': moments,
+        'y_mean': y_mean,
+        'factors': x.shape[1],
+        'low': np.floor(positions).astype(np.int64),
+        'fraction': positions - np.floor(positions),
+    }
+
+def _chunk_statistics(data, seed, size):
+    """
+    Statistics of `size` resamples: mean, std, the quantiles, then one
+    correlation per factor, one row per resample
+    """
+    n = data['n']
+    f = data['factors']
+    rng = np.random.default_rng(seed)
+
+    # Index matrix -> per-resample count of every student; row r's indices
+    # are shifted by r * n so one bincount counts the whole chunk
+    index = rng.integers(0, n, size=(size, n))
+    index += (np.arange(size) * n)[:, None]
+    counts = np.bincount(index.ravel(), minlength=size * n).reshape(size, n)
+
+    # Means of the centred moment columns under every resample at once
+    sums = counts.astype(np.float64) @ data['moments'] / n
+    sy, syy = sums[:, 0], sums[:, 1]
+    sx, sxx, sxy = sums[:, 2:2 + f], sums[:, 2 + f:2 + 2 * f], sums[:, 2 + 2 * f:]
+    var_y = syy - sy * sy
+    mean = data['y_mean'] + sy
+    std = np.sqrt(np.maximum(var_y, 0.0) * n / (n - 1)) if n > 1 else np.full(size, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = (sxy - sx * sy[:, None]) / np.sqrt((sxx - sx * sx) * var_y[:, None])
+
+    # Order statistic k of a resample is the first score level whose
+    # cumulative count exceeds k; rows are offset so one searchsorted
+    # covers the whole chunk
+    levels = len(data['levels'])
+    cumulative = np.cumsum(np.add.reduceat(counts, data['starts'], axis=1), axis=1)
+    cumulative += (np.arange(size) * (n + 1))[:, None]
+    wanted = np.concatenate([data['low'], np.minimum(data['low'] + 1, n - 1)])
+    targets = wanted[None, :] + (np.arange(size) * (n + 1))[:, None]
+    found = np.searchsorted(cumulative.ravel(), targets.ravel(), side='right').reshape(size, -1)
+    values = data['levels'][np.minimum(found - (np.arange(size) * levels)[:, None], levels - 1)]
+    k = len(data['low'])
+    quantiles = values[:, :k] + data['fraction'] * (values[:, k:] - values[:, :k])
+
+    return np.column_stack([mean, std, quantiles, corr])
+
+def bootstrap_statistics(df, resamples=BOOTSTRAP_RESAMPLES, confidence=BOOTSTRAP_CONFIDENCE, quantiles=None,
+                         seed=0, workers=None, chunk_cells=BOOTSTRAP_CHUNK_CELLS):
+    """
+    Percentile bootstrap intervals for the mean, std and quantiles of
+    burnout_score and each factor's correlation with it
+    quantiles maps names to levels (default QUANTILES; 'iqr' is added when
+    q1 and q3 are present). Results depend only on seed, resamples and
+    chunk_cells; workers > 1 spreads the chunks over a process pool.
+    Returns {'cohort': DataFrame, 'correlations': DataFrame}, each with
+    estimate, lower, upper and std_error columns
+    """
+    quantiles = dict(QUANTILES if quantiles is None else quantiles)
+    factors = [col for col in FACTORS if col in df.columns]
+    df = df[factors + ['burnout_score']].astype(np.float64).dropna()
+    n = len(df)
+    if n < 3:
+        raise ValueError("Bootstrap needs at least 3 scored students")
+
+    data = _prepare(df['burnout_score'].to_numpy(), df[factors].to_numpy(), quantiles)
+    per_chunk = max(1, chunk_cells // n)
+    sizes = [min(per_chunk, resamples - start) for start in range(0, resamples, per_chunk)]
+    tasks = list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+
+    if workers and workers > 1 and len(tasks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data,)) as pool:
+            parts = list(pool.map(_worker_chunk, tasks))
+    else:
+        parts = [_chunk_statistics(data, *task) for task in tasks]
+    samples = np.vstack(parts)
+
+    names = ['mean', 'std'] + list(quantiles)
+    cohort_samples = pd.DataFrame(samples[:, :len(names)], columns=names)
+    scores = df['burnout_score']
+    estimates = {'mean': scores.mean(), 'std': scores.std(),
+                 **{name: scores.quantile(q) for name, q in quantiles.items()}}
+    if 'q1' in quantiles and 'q3' in quantiles:
+        cohort_samples['iqr'] = cohort_samples['q3'] - cohort_samples['q1']
+        estimates['iqr'] = estimates['q3'] - estimates['q1']
+    # Point estimates are the ones the reports already show
+    shown = cohort_statistics(df)
+    estimates.update({key: shown[key] for key in estimates if key in shown})
+    correlation_samples = pd.DataFrame(samples[:, len(names):], columns=factors)
+    correlations = regression_analysis(df)
+
+    alpha = (1 - confidence) / 2
+    def intervals(samples, estimates):
+        return pd.DataFrame({
+            'estimate': pd.Series(estimates)[samples.columns],
+            'lower': samples.quantile(alpha),
+            'upper': samples.quantile(1 - alpha),
+            'std_error': samples.std(),
+        }).astype(np.float64).round(3)
+
+    return {
+        'cohort': intervals(cohort_samples, estimates),
+        'correlations': intervals(correlation_samples, correlations),
+    }
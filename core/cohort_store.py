@@ -0,0 +1,247 @@
+"""
+Cohort Store
+Compact typed binary format for cohorts: one file holding a JSON header and
+aligned column buffers that load zero-copy from memory or a memory map.
+CSV stays the interchange format; .cohort files are for fast reloads.
+pandas is imported on first use, so the CSV column helpers for the
+pandas-free scoring path start quickly.
+"""
+import csv
+import json
+import struct
+
+import numpy as np
+
+COHORT_EXTENSION = ".cohort"
+MAGIC = b"SWCOHORT"
+FORMAT_VERSION = 1
+# Column buffers start on cache-line boundaries so every view is aligned
+ALIGNMENT = 64
+
+# Storage dtypes for the input columns; integer columns fall back to float32
+# when they hold missing or out-of-range values, and float32 columns to
+# float64 when float32 cannot bring their values back (see _fits_float32)
+COLUMN_DTYPES = {
+    'sleep_hours': '<f4',
+    'study_hours': '<f4',
+    'screen_time': '<f4',
+    'stress_level': '|u1',
+    'attendance': '|u1',
+}
+FALLBACK_DTYPE = '<f4'
+EXACT_DTYPE = '<f8'
+# float32 keeps about 7 significant digits; rounding back to this many
+# decimals recovers the value a CSV would parse to for any realistic input
+FLOAT32_DECIMALS = 4
+TEXT_SEPARATOR = "\0"
+# Cells read_csv treats as missing by default
+CSV_NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+])
+
+def is_cohort_data(data):
+    """True if raw bytes start with the .cohort magic header"""
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+def _fits(values, dtype):
+    """Values are whole numbers inside the integer dtype's range"""
+    info = np.iinfo(dtype)
+    return len(values) == 0 or (not np.isnan(values).any() and (values == np.round(values)).all()
+                                and values.min() >= info.min and values.max() <= info.max)
+
+def _fits_float32(values):
+    """Values come back unchanged from float32 through widen_float32's rounding"""
+    restored = np.round(values.astype(np.float32).astype(np.float64), FLOAT32_DECIMALS)
+    return np.array_equal(restored, values, equal_nan=True)
+
+def _encode_column(name, series):
+    """(column header, list of buffers) for one column"""
+    import pandas as pd
+    if name in COLUMN_DTYPES:
+        values = series.to_numpy(dtype=np.float64)
+        dtype = COLUMN_DTYPES[name]
+        if np.dtype(dtype).kind == 'u' and not _fits(values, dtype):
+            dtype = FALLBACK_DTYPE
+        # Columns already compacted to float32 hold the rounded values by design
+        if dtype == FALLBACK_DTYPE and series.dtype != np.float32 and not _fits_float32(values):
+            dtype = EXACT_DTYPE
+        return {'encoding': 'plain', 'dtype': dtype}, [values.astype(dtype)]
+
+    if name == 'burnout_score':
+        # Scores are rounded to 2 decimals, so whole hundredths are exact
+        hundredths = np.round(series.to_numpy(dtype=np.float64) * 100)
+        if _fits(hundredths, np.uint8) and np.array_equal(hundredths / 100, series.to_numpy(dtype=np.float64)):
+            return {'encoding': 'hundredths', 'dtype': '|u1'}, [hundredths.astype(np.uint8)]
+
+    if name == 'risk' or isinstance(series.dtype, pd.CategoricalDtype):
+        categorical = pd.Categorical(series)
+        return ({'encoding': 'dictionary', 'dtype': '|i1', 'categories': categorical.categories.tolist(),
+                 'ordered': bool(categorical.ordered)},
+                [categorical.codes.astype(np.int8)])
+
+    if series.dtype.kind in 'biuf':
+        values = series.to_numpy()
+        return {'encoding': 'plain', 'dtype': values.dtype.newbyteorder('<').str}, [values.astype(values.dtype.newbyteorder('<'))]
+
+    # Everything else is stored as NUL-separated UTF-8 text, plus a mask when values are missing
+    missing = series.isna().to_numpy()
+    values = ["" if is_missing else str(value) for value, is_missing in zip(series, missing)]
+    if any(TEXT_SEPARATOR in value for value in values):
+        raise ValueError(f"Column {name!r} contains NUL characters and cannot be stored")
+    buffers = [np.frombuffer(TEXT_SEPARATOR.join(values).encode("utf-8"), dtype=np.uint8)]
+    if missing.any():
+        buffers.append(missing.astype(np.uint8))
+    return {'encoding': 'utf8', 'dtype': '|u1'}, buffers
+
+def encode_cohort(df):
+    """Serialize a DataFrame to .cohort bytes"""
+    columns, buffers, position = [], [], 0
+    for name in df.columns:
+        header, arrays = _encode_column(str(name), df[name])
+        header['name'] = str(name)
+        header['buffers'] = []
+        for array in arrays:
+            position = -(-position // ALIGNMENT) * ALIGNMENT
+            header['buffers'].append([position, array.nbytes])
+            buffers.append((position, array))
+            position += array.nbytes
+        columns.append(header)
+
+    header = json.dumps({'version': FORMAT_VERSION, 'rows': len(df), 'columns': columns}).encode()
+    start = -(-(len(MAGIC) + 8 + len(header)) // ALIGNMENT) * ALIGNMENT
+    out = bytearray(start + position)
+    out[:len(MAGIC)] = MAGIC
+    out[len(MAGIC):len(MAGIC) + 8] = struct.pack('<Q', len(header))
+    out[len(MAGIC) + 8:len(MAGIC) + 8 + len(header)] = header
+    for offset, array in buffers:
+        out[start + offset:start + offset + array.nbytes] = array.tobytes()
+    return bytes(out)
+
+def _decode_column(buffer, start, rows, header):
+    import pandas as pd
+    views = [np.frombuffer(buffer, dtype=np.uint8, count=nbytes, offset=start + offset)
+             for offset, nbytes in header['buffers']]
+    encoding = header['encoding']
+    if encoding == 'plain':
+        return views[0].view(header['dtype'])
+    if encoding == 'hundredths':
+        return views[0] / 100
+    if encoding == 'dictionary':
+        return pd.Categorical.from_codes(views[0].view(np.int8), categories=header['categories'],
+                                         ordered=header['ordered'])
+    if encoding == 'utf8':
+        values = np.array(views[0].tobytes().decode("utf-8").split(TEXT_SEPARATOR) if rows else [], dtype=object)
+        if len(views) > 1:
+            values[views[1].view(bool)] = None
+        return values
+    raise ValueError(f"Unknown column encoding: {encoding}")
+
+def decode_cohort(buffer):
+    """
+    DataFrame over a .cohort buffer (bytes or a memory map)
+    Numeric and label columns are read-only views into the buffer; text
+    columns and scores are decoded into new arrays
+    """
+    import pandas as pd
+    if not is_cohort_data(buffer):
+        raise ValueError("Not a .cohort file")
+    (header_length,) = struct.unpack('<Q', bytes(buffer[len(MAGIC):len(MAGIC) + 8]))
+    header = json.loads(bytes(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + header_length]))
+    if header['version'] > FORMAT_VERSION:
+        raise ValueError(f"Unsupported .cohort version: {header['version']}")
+
+    start = -(-(len(MAGIC) + 8 + header_length) // ALIGNMENT) * ALIGNMENT
+    data = {column['name']: _decode_column(buffer, start, header['rows'], column) for column in header['columns']}
+    return pd.DataFrame(data, index=pd.RangeIndex(header['rows']), copy=False)
+
+def widen_float32(df):
+    """
+    Copy of df with float32 columns restored to the float64 values the
+    original CSV held, so scores match the CSV path bit for bit; columns
+    are only stored as float32 when that rounding restores them exactly
+    """
+    df = df.copy()
+    for col in df.columns[df.dtypes == np.float32]:
+        df[col] = np.round(df[col].to_numpy(dtype=np.float64), FLOAT32_DECIMALS)
+    return df
+
+def write_cohort(df, path):
+    """Write a DataFrame to a .cohort file"""
+    with open(path, "wb") as f:
+        f.write(encode_cohort(df))
+
+def read_cohort(path, mmap=True):
+    """Load a .cohort file, memory-mapped by default so pages load on first use"""
+    if mmap:
+        return decode_cohort(np.memmap(path, dtype=np.uint8, mode='r'))
+    with open(path, "rb") as f:
+        return decode_cohort(f.read())
+
+def read_table(path, **kwargs):
+    """Read a .cohort or CSV file by extension; kwargs go to read_csv"""
+    if str(path).endswith(COHORT_EXTENSION):
+        return read_cohort(path)
+    import pandas as pd
+    return pd.read_csv(path, **kwargs)
+
+def write_table(df, path):
+    """Write a .cohort or CSV file by extension"""
+    if str(path).endswith(COHORT_EXTENSION):
+        write_cohort(df, path)
+    else:
+        df.to_csv(path, index=False)
+
+def _parse_csv_column(values):
+    """
+    CSV text as int64, float64 or text, inferred like read_csv: cells in
+    CSV_NA_VALUES are missing (NaN, None in text columns) and make an
+    integer column float
+    """
+    missing = [value in CSV_NA_VALUES for value in values]
+    if not any(missing):
+        try:
+            return np.array([int(value) for value in values], dtype=np.int64)
+        except (ValueError, OverflowError):
+            pass
+    try:
+        return np.array([np.nan if na else float(value) for value, na in zip(values, missing)], dtype=np.float64)
+    except ValueError:
+        return np.array([None if na else value for value, na in zip(values, missing)], dtype=object)
+
+def read_columns(path, dtype=None):
+    """
+    Read a CSV or .cohort file as a dict of column name -> NumPy array
+    CSV files are parsed without pandas; dtype maps column names to NumPy
+    dtypes like read_csv's dtype, other columns are inferred
+    """
+    dtype = dtype or {}
+    if str(path).endswith(COHORT_EXTENSION):
+        df = widen_float32(read_cohort(path))
+        return {str(col): df[col].to_numpy(dtype=dtype.get(str(col))) for col in df.columns}
+
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = list(reader)
+    columns = {name: _parse_csv_column([row[i] if i < len(row) else "" for row in rows])
+               for i, name in enumerate(header)}
+    for name, column_dtype in dtype.items():
+        if name in columns:
+            columns[name] = columns[name].astype(column_dtype)
+    return columns
+
+def _csv_value(value):
+    # Same text as DataFrame.to_csv: floats via repr, missing values empty
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return repr(value) if isinstance(value, float) else value
+
+def write_columns(columns, path):
+    """Write a dict of column name -> array as CSV, without pandas"""
+    names = list(columns)
+    values = [columns[name].tolist() for name in names]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(names)
+        writer.writerows([_csv_value(value) for value in row] for row in zip(*values))
@@ -1,16 +1,72 @@
 import numpy as np
 
+from core.sketch import QuantileSketch
+
 def peer_percentile(scores, value):
     """
     Calculate percentile rank of a value within a distribution
     Returns percentage of scores below the given value
+    Scores can also be a QuantileSketch for large or incremental cohorts
     """
+    if isinstance(scores, QuantileSketch):
+        return round(scores.rank(value) * 100, 1)
     return round((scores < value).mean() * 100, 1)
 
+class PeerIndex:
+    """
+    Cohort scores sorted once so peer lookups are O(log n)
+    percentile() keeps peer_percentile's "percent strictly below" semantics;
+    rank, top_k and band return labels from the scores' index
+    """
+
+    def __init__(self, scores):
+        values = np.asarray(scores, dtype=np.float64)
+        self.labels = np.asarray(scores.index) if hasattr(scores, 'index') else np.arange(len(values))
+        self.n = len(values)
+        self.n_valid = int((~np.isnan(values)).sum())
+
+        # Descending stable order keeps the earliest student first on ties
+        self.order = np.argsort(-values, kind='stable')[:self.n_valid]
+        self.sorted = values[self.order][::-1]
+
+    def percentile(self, value):
+        """Percent of the cohort strictly below value (scalar or array)"""
+        value = np.asarray(value, dtype=np.float64)
+        below = np.searchsorted(self.sorted, value, side='left')
+        below = np.where(np.isnan(value), 0, below)
+        pct = np.round(below / self.n * 100, 1)
+        return float(pct) if pct.ndim == 0 else pct
+
+    def percentiles(self):
+        """Percentile of every student, aligned with the original scores"""
+        result = np.zeros(self.n)
+        ascending = self.order[::-1]
+        result[ascending] = self.percentile(self.sorted)
+        return result
+
+    def rank(self, value):
+        """Rank within the cohort, 1 = highest score (ties share a rank)"""
+        value = np.asarray(value, dtype=np.float64)
+        above = self.n_valid - np.searchsorted(self.sorted, value, side='right')
+        return int(above) + 1 if value.ndim == 0 else above + 1
+
+    def top_k(self, k):
+        """Labels of the k highest scores, ties in original order"""
+        return self.labels[self.order[:k]]
+
+    def band(self, low, high):
+        """Labels of students whose percentile lies in [low, high)"""
+        pct = self.percentile(self.sorted)[::-1]
+        return self.labels[self.order[(pct >= low) & (pct < high)]]
+
 def cohort_statistics(df):
     """
     Calculate comprehensive statistics for the entire cohort
+    Accepts a scored DataFrame or a QuantileSketch of burnout scores
     """
+    if isinstance(df, QuantileSketch):
+        return sketch_statistics(df)
+    
     scores = df['burnout_score']
     
     return {
@@ -25,3 +81,25 @@ def cohort_statistics(df):
         'q3': round(scores.quantile(0.75), 3),
         'iqr': round(scores.quantile(0.75) - scores.quantile(0.25), 3)
     }
+
+def sketch_statistics(sketch):
+    """
+    Cohort statistics from a QuantileSketch of burnout scores
+    Moments, min and max are exact; quantiles carry the sketch's rank error
+    An empty sketch gives NaN throughout, like an empty DataFrame
+    """
+    q1, median, q3 = sketch.quantile([0.25, 0.5, 0.75])
+    mean, low, high = (sketch.mean, sketch.min, sketch.max) if sketch.n else (np.nan, np.nan, np.nan)
+    
+    return {
+        'mean': round(mean, 3),
+        'median': round(median, 3),
+        'std': round(sketch.std(), 3),
+        'variance': round(sketch.variance(), 3),
+        'min': round(low, 3),
+        'max': round(high, 3),
+        'range': round(high - low, 3),
+        'q1': round(q1, 3),
+        'q3': round(q3, 3),
+        'iqr': round(q3 - q1, 3)
+    }
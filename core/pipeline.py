@@ -0,0 +1,92 @@
+"""
+Processing Pipeline
+Upload -> validate -> score -> statistics as plain functions, keyed by a hash
+of the raw input bytes and the model weights so callers can cache each step;
+a scored cohort keeps its design matrix so a new weight set re-scores it
+without repeating the upload steps
+"""
+import hashlib
+import io
+import json
+
+import pandas as pd
+
+from config import WEIGHTS
+from core.cohort_store import is_cohort_data, decode_cohort, widen_float32
+from core.profiling import stage
+from core.validation import validate_frame, REASON_MISSING, REASON_OVER_24_HOURS
+from core.scoring_engine import risk_labels
+from core.scoring_model import ScoringModel, design_matrix
+from core.schema import apply_schema, memory_report, RISK_DTYPE
+from core.peer_engine import PeerIndex
+from core.statistical_analysis import statistics_profile
+from explainability.contribution import contribution_by_risk
+
+def content_key(data, weights=None):
+    """Hash of the raw CSV bytes and the weights the cohort is scored with"""
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps(weights if weights is not None else WEIGHTS, sort_keys=True).encode())
+    return digest.hexdigest()
+
+def load_cohort(data):
+    """Parse raw CSV or .cohort bytes, adding a name column if missing"""
+    with stage("load") as record:
+        if is_cohort_data(data):
+            df = widen_float32(decode_cohort(data))
+        else:
+            df = pd.read_csv(io.BytesIO(data))
+        record['rows'] = len(df)
+    if 'name' not in df.columns:
+        df['name'] = [f"Student {i+1}" for i in range(len(df))]
+    return df
+
+def process_cohort(df, model=None):
+    """
+    Validate and score a cohort (with the config.WEIGHTS model by default)
+    Returns a dict with the valid scored rows in the compact schema, reject
+    counts, a PeerIndex, the memory report of the schema change, the design
+    matrix for rescore_cohort and the model version
+    """
+    model = ScoringModel() if model is None else model
+    with stage("validate", len(df)):
+        df, reasons = validate_frame(df)
+        df = df[df['valid']].copy()
+    with stage("score", len(df)):
+        design = design_matrix(df)
+        df["burnout_score"] = model.scores_from_design(design)
+        df["risk"] = risk_labels(df["burnout_score"])
+    with stage("schema", len(df)):
+        compact = apply_schema(df)
+
+    return {
+        'df': compact,
+        'memory': memory_report(df, compact),
+        'invalid_count': int((reasons == REASON_OVER_24_HOURS).sum()),
+        'missing_count': int((reasons == REASON_MISSING).sum()),
+        'peer_index': PeerIndex(df["burnout_score"]),
+        'design': design,
+        'model': model.version,
+    }
+
+def rescore_cohort(cohort, model):
+    """
+    A process_cohort result scored under another weight set: one
+    matrix-vector product over the stored design matrix, no re-validation
+    """
+    df = cohort['df'].copy()
+    with stage("rescore", len(df)):
+        scores = model.scores_from_design(cohort['design'])
+        df['burnout_score'] = scores
+        df['risk'] = pd.Categorical(risk_labels(scores), dtype=RISK_DTYPE)
+    return {**cohort, 'df': df, 'peer_index': PeerIndex(df['burnout_score']), 'model': model.version}
+
+def cohort_summary(df, weights=None):
+    """
+    Statistics shown on the Statistical Analysis tab: the fused
+    statistics_profile (tables, histograms, cohort statistics) plus drivers
+    """
+    with stage("statistics", len(df)):
+        profile = statistics_profile(df)
+    with stage("explainability", len(df)):
+        drivers = contribution_by_risk(df, weights)
+    return {**profile, 'drivers': drivers}
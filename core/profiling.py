@@ -0,0 +1,223 @@
+"""
+Profiling
+Per-stage timers for the pipeline: wall time, rows processed and peak
+memory, exported as a Chrome trace (chrome://tracing, ui.perfetto.dev).
+Stages are no-ops unless a Profiler is running in the current context, so
+instrumented code costs one context-variable lookup per stage otherwise.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+_active = contextvars.ContextVar('profiler', default=None)
+# tracemalloc's peak is process-wide, so at most one Profiler measures memory
+# at a time; it holds this slot from start() to stop()
+_memory_owner = None
+_memory_lock = threading.Lock()
+
+class _NullStage:
+    """Stage used while profiling is off: records nothing"""
+
+    def __enter__(self):
+        return {}
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    def __init__(self, profiler, name, rows):
+        self.profiler = profiler
+        self.name = name
+        self.record = {'rows': rows}
+
+    def __enter__(self):
+        self.profiler._push(self)
+        self.start = time.perf_counter()
+        return self.record
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.profiler._pop(self, end)
+        return False
+
+class Profiler:
+    """
+    Collects one event per finished stage while started
+    Peak memory comes from tracemalloc, which is process-wide and slows the
+    profiled code down; pass memory=False to record wall time only. Only one
+    profiler per process measures memory at a time: one started while
+    another does records wall time only, with memory set to False
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.events = []
+        self.origin = time.perf_counter()
+        self._owns_tracing = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Make this the profiler that stage() records to in this context"""
+        global _memory_owner
+        if self.memory:
+            with _memory_lock:
+                if _memory_owner is None:
+                    _memory_owner = self
+                    if not tracemalloc.is_tracing():
+                        tracemalloc.start()
+                        self._owns_tracing = True
+                elif _memory_owner is not self:
+                    self.memory = False
+        _active.set(self)
+        return self
+
+    def stop(self):
+        """Stop recording; safe to call more than once or from another context"""
+        global _memory_owner
+        if _active.get() is self:
+            _active.set(None)
+        with _memory_lock:
+            if _memory_owner is self:
+                if self._owns_tracing:
+                    tracemalloc.stop()
+                    self._owns_tracing = False
+                _memory_owner = None
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _tracing(self):
+        return self.memory and tracemalloc.is_tracing()
+
+    def _push(self, frame):
+        stack = self._stack()
+        if self._tracing():
+            # The enclosing stage keeps the peak it reached so far, then the
+            # peak is reset so this stage measures only its own
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+            frame.base = current
+            frame.peak = current
+        stack.append(frame)
+
+    def _pop(self, frame, end):
+        stack = self._stack()
+        stack.pop()
+        args = {key: value for key, value in frame.record.items() if value is not None}
+        if self._tracing() and hasattr(frame, 'base'):
+            peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+            args['peak_bytes'] = peak - frame.base
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+            tracemalloc.reset_peak()
+
+        event = {
+            'name': frame.name,
+            'cat': 'stage',
+            'ph': 'X',
+            'ts': (frame.start - self.origin) * 1e6,
+            'dur': (end - frame.start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def trace(self):
+        """Events in Chrome trace format"""
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event['ts'])
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_trace(self, path):
+        """Write the Chrome trace JSON file"""
+        with open(path, "w") as f:
+            json.dump(self.trace(), f)
+
+    def summary(self):
+        """
+        One dict per stage name, in first-seen order: calls, total seconds,
+        rows, rows per second and the largest peak_bytes of any call
+        """
+        stages = {}
+        for event in self.trace()['traceEvents']:
+            entry = stages.setdefault(event['name'], {'stage': event['name'], 'calls': 0, 'seconds': 0.0,
+                                                      'rows': None, 'peak_bytes': None})
+            entry['calls'] += 1
+            entry['seconds'] += event['dur'] / 1e6
+            args = event['args']
+            if 'rows' in args:
+                entry['rows'] = (entry['rows'] or 0) + args['rows']
+            if 'peak_bytes' in args:
+                entry['peak_bytes'] = max(entry['peak_bytes'] or 0, args['peak_bytes'])
+        for entry in stages.values():
+            entry['rows_per_sec'] = entry['rows'] / entry['seconds'] if entry['rows'] and entry['seconds'] > 0 else None
+        return list(stages.values())
+
+def active_profiler():
+    """The running Profiler of this context, or None"""
+    return _active.get()
+
+def stage(name, rows=None):
+    """
+    Context manager timing one stage; yields a dict whose 'rows' (or any
+    other key) can be set inside the block and is stored with the event
+    """
+    profiler = _active.get()
+    if profiler is None:
+        return _NULL_STAGE
+    return _Stage(profiler, name, rows)
+
+def stage_iter(name, iterable):
+    """
+    Yield from iterable, timing the production of each item as one stage
+    with the item's length as rows; for chunked readers
+    """
+    iterator = iter(iterable)
+    while True:
+        with stage(name) as record:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            record['rows'] = len(item)
+        yield item
+
+def profiled(name=None, rows=None):
+    """
+    Decorator form of stage(), named after the function by default
+    rows, if given, is called with the function's arguments to count rows
+    """
+    def decorate(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active.get()
+            if profiler is None:
+                return func(*args, **kwargs)
+            with _Stage(profiler, label, rows(*args, **kwargs) if rows else None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
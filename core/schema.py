@@ -0,0 +1,98 @@
+"""
+Cohort Schema
+Compact in-memory dtypes for scored cohorts: downcast numeric columns where
+the values survive unchanged, an ordered Categorical for risk labels and,
+for cohorts with repeated names, a categorical name column
+"""
+import numpy as np
+import pandas as pd
+
+from core.scoring_engine import RISK_LABELS
+
+RISK_DTYPE = pd.CategoricalDtype(RISK_LABELS, ordered=True)
+
+# Target dtype per column; a column is only downcast when every value
+# round-trips exactly, so scores, statistics and displays are unchanged
+COMPACT_DTYPES = {
+    'sleep_hours': np.float32,
+    'study_hours': np.float32,
+    'screen_time': np.float32,
+    'stress_level': np.uint8,
+    'attendance': np.uint8,
+}
+
+# names='auto' makes names categorical when at most this share is unique
+NAME_CATEGORY_RATIO = 0.5
+
+def _lossless(values, dtype):
+    values = values.to_numpy(dtype=np.float64)
+    if np.dtype(dtype).kind in 'iu':
+        info = np.iinfo(dtype)
+        if np.isnan(values).any() or (len(values) and (values.min() < info.min or values.max() > info.max)):
+            return False
+    with np.errstate(invalid='ignore', over='ignore'):
+        return np.array_equal(values.astype(dtype).astype(np.float64), values, equal_nan=True)
+
+def apply_schema(df, names='auto'):
+    """
+    Copy of a scored cohort with compact dtypes
+    names: True for a categorical name column, False to leave it, 'auto'
+    to decide from the share of unique names
+    """
+    df = df.copy()
+    for col, dtype in COMPACT_DTYPES.items():
+        if col in df.columns and df[col].dtype != dtype and _lossless(df[col], dtype):
+            df[col] = df[col].to_numpy().astype(dtype)
+
+    if 'risk' in df.columns:
+        df['risk'] = df['risk'].astype(RISK_DTYPE)
+
+    if 'name' in df.columns and len(df):
+        if names == 'auto':
+            names = df['name'].nunique() <= NAME_CATEGORY_RATIO * len(df)
+        if names:
+            df['name'] = df['name'].astype('category')
+    return df
+
+def value_counts(series):
+    """
+    series.value_counts() with the same result for categorical and plain
+    columns: zero counts dropped, ties in first-seen order, plain index
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.value_counts()
+
+    codes = series.cat.codes.to_numpy()
+    codes = codes[codes >= 0]
+    counts = np.bincount(codes, minlength=len(series.cat.categories))
+    seen, first_seen = np.unique(codes, return_index=True)
+    seen = seen[np.argsort(first_seen)]
+    order = seen[np.argsort(-counts[seen], kind='stable')]
+    index = pd.Index(series.cat.categories[order], name=series.name)
+    return pd.Series(counts[order], index=index, name='count')
+
+def widen(df):
+    """Copy with compact numeric columns back at float64/int64, as parsed from CSV"""
+    df = df.copy()
+    for col, dtype in COMPACT_DTYPES.items():
+        if col in df.columns and df[col].dtype == dtype:
+            df[col] = df[col].astype(np.float64 if np.dtype(dtype).kind == 'f' else np.int64)
+    return df
+
+def student_row(df, label):
+    """
+    One student as a row with the scalar types of an uncompacted cohort
+    Per-row scoring and what-if functions would otherwise compute in float32
+    """
+    return widen(df.loc[[label]]).iloc[0]
+
+def memory_report(before, after):
+    """Bytes per student for each column and in total, before and after apply_schema"""
+    rows = max(len(before), 1)
+    report = pd.DataFrame({
+        'before': before.memory_usage(deep=True) / rows,
+        'after': after.memory_usage(deep=True) / rows,
+    })
+    report.loc['Total'] = report.sum()
+    report['reduction'] = report['before'] / report['after']
+    return report.round(2)
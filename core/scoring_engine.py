@@ -1,6 +1,13 @@
+import numpy as np
+
 from config import WEIGHTS
 
-def burnout_score(row):
+FEATURES = ['sleep_hours', 'stress_level', 'screen_time', 'study_hours', 'attendance']
+RISK_LABELS = ["🟢 Low Risk", "🟡 Moderate Risk", "🔴 Elevated Risk"]
+RISK_THRESHOLDS = [0.3, 0.6]
+
+def burnout_score(row, weights=None):
+    weights = WEIGHTS if weights is None else weights
     # Handle both dictionary-style (CSV) and attribute-style (manual) access
     sleep_hours = row['sleep_hours'] if isinstance(row, dict) or 'sleep_hours' in row.index else row.sleep_hours
     stress_level = row['stress_level'] if isinstance(row, dict) or 'stress_level' in row.index else row.stress_level
@@ -15,11 +22,11 @@ def burnout_score(row):
     attendance_risk = (100 - attendance) / 100
 
     score = (
-        WEIGHTS["sleep"] * sleep_deficit +
-        WEIGHTS["stress"] * stress +
-        WEIGHTS["screen"] * screen +
-        WEIGHTS["study"] * study +
-        WEIGHTS["attendance"] * attendance_risk
+        weights["sleep"] * sleep_deficit +
+        weights["stress"] * stress +
+        weights["screen"] * screen +
+        weights["study"] * study +
+        weights["attendance"] * attendance_risk
     )
 
     return round(min(score, 1), 2)
@@ -32,15 +39,111 @@ def risk_label(score):
     - Elevated Risk: >= 0.60 (Top tertile)
     """
     if score < 0.3:
-        return "🟢 Low Risk"
+        return RISK_LABELS[0]
     elif score < 0.6:
-        return "🟡 Moderate Risk"
-    return "🔴 Elevated Risk"
+        return RISK_LABELS[1]
+    return RISK_LABELS[2]
+
+def near_ties(values, ndigits=2):
+    """Elements within float error of a rounding tie at ndigits decimals"""
+    scaled = np.asarray(values, dtype=np.float64) * 10 ** ndigits
+    return np.abs(scaled - np.floor(scaled) - 0.5) < 1e-7
+
+def round_like_python(values, ndigits=2):
+    """
+    Round an array exactly like the built-in round()
+    np.round scales by 10**ndigits first, which can break near-ties the other
+    way; those few elements are re-rounded with round() itself
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, ndigits)
+    near_tie = near_ties(values, ndigits)
+    if near_tie.any():
+        rounded[near_tie] = [round(v, ndigits) for v in values[near_tie].tolist()]
+    return rounded
+
+def factor_term(feature, values, weights=None):
+    """
+    Weighted risk term of one input column, elementwise for any array shape
+    Same arithmetic as burnout_score for that factor
+    """
+    weights = WEIGHTS if weights is None else weights
+    values = np.asarray(values, dtype=np.float64)
+    if feature == 'sleep_hours':
+        sleep_deficit = (7 - values) / 7
+        return weights["sleep"] * np.where(sleep_deficit > 0, sleep_deficit, 0.0)
+    if feature == 'stress_level':
+        return weights["stress"] * (values / 5)
+    if feature == 'screen_time':
+        return weights["screen"] * (values / 10)
+    if feature == 'study_hours':
+        return weights["study"] * (values / 10)
+    if feature == 'attendance':
+        return weights["attendance"] * ((100 - values) / 100)
+    raise ValueError(f"Unknown feature: {feature}")
+
+def weighted_factors(data, weights=None):
+    """
+    Weighted risk factors for a whole cohort as an n x 5 array
+    Columns follow FEATURES order: sleep deficit, stress, screen, study,
+    attendance risk, each multiplied by its weight
+    """
+    return np.column_stack([factor_term(col, data[col], weights) for col in FEATURES])
+
+def finalize_scores(raw):
+    """Apply burnout_score's min(score, 1) cap and 2-decimal rounding"""
+    return round_like_python(np.where(raw > 1, 1.0, raw), 2)
+
+def burnout_scores(data, weights=None):
+    """
+    Vectorized burnout_score for a whole cohort
+    Accepts a DataFrame or a mapping of column name -> array and returns a
+    float array identical to applying burnout_score row by row
+    """
+    factors = weighted_factors(data, weights)
+
+    # Add factors left to right like burnout_score so results match bit for bit
+    score = factors[:, 0]
+    for i in range(1, factors.shape[1]):
+        score = score + factors[:, i]
+
+    return finalize_scores(score)
+
+def risk_codes(scores):
+    """Risk band index into RISK_LABELS: 0 low, 1 moderate, 2 elevated"""
+    scores = np.asarray(scores, dtype=np.float64)
+    codes = np.full(scores.shape, 2, dtype=np.int8)
+    codes[scores < RISK_THRESHOLDS[1]] = 1
+    codes[scores < RISK_THRESHOLDS[0]] = 0
+    return codes
+
+def risk_labels(scores):
+    """Vectorized risk_label, returns an object array of labels"""
+    return np.array(RISK_LABELS, dtype=object)[risk_codes(scores)]
+
+def risk_counts(scores):
+    """
+    (label, count) pairs for the risk bands present, most common first with
+    ties in first-seen order, the same order as value_counts() on the labels
+    """
+    codes = risk_codes(scores)
+    counts = np.bincount(codes, minlength=len(RISK_LABELS))
+    seen, first_seen = np.unique(codes, return_index=True)
+    seen = seen[np.argsort(first_seen)]
+    return [(RISK_LABELS[code], int(counts[code])) for code in seen[np.argsort(-counts[seen], kind='stable')]]
+
+def score_batch(data, weights=None):
+    """
+    Score a cohort in one vectorized pass
+    Returns (scores, risk labels) as arrays aligned with the input rows
+    """
+    scores = burnout_scores(data, weights)
+    return scores, risk_labels(scores)
 
-def get_statistical_summary():
+def get_statistical_summary(weights=None):
     """Return model configuration for transparency"""
     return {
-        "weights": WEIGHTS,
+        "weights": WEIGHTS if weights is None else weights,
         "thresholds": {
             "low_risk": "< 0.30",
             "moderate_risk": "0.30 - 0.60",
@@ -0,0 +1,215 @@
+"""
+Scoring Model
+burnout_score as one linear model: weights and normalization constants fold
+into a coefficient vector and intercept over the design matrix
+[min(sleep_hours, 7), stress_level, screen_time, study_hours, attendance],
+so a cohort scores with a single matrix-vector product. Versioned weight sets
+load from a JSON file that is re-read whenever it changes, so weights can be
+swapped without restarting the app or the service.
+"""
+import json
+import math
+import os
+import threading
+
+import numpy as np
+
+from config import WEIGHTS, MODELS_PATH, DEFAULT_MODEL_VERSION
+from core.scoring_engine import weighted_factors, finalize_scores, near_ties, risk_labels, FEATURES
+
+# Sleep above this many hours adds no deficit
+SLEEP_OPTIMAL = 7
+# Per input column: weight key, origin and scale of its normalized factor
+# weight * (value - origin) / scale; sleep and attendance count downwards
+NORMALIZATION = {
+    'sleep_hours': ('sleep', SLEEP_OPTIMAL, -7),
+    'stress_level': ('stress', 0, 5),
+    'screen_time': ('screen', 0, 10),
+    'study_hours': ('study', 0, 10),
+    'attendance': ('attendance', 100, -100),
+}
+# Weight of each design column, the column order of weight matrices
+WEIGHT_KEYS = [NORMALIZATION[col][0] for col in FEATURES]
+
+def design_matrix(data):
+    """
+    n x 5 float64 model inputs in FEATURES order, sleep capped at SLEEP_OPTIMAL
+    Depends only on the answers, so a cohort can keep it and be re-scored
+    under any weight set
+    """
+    X = np.column_stack([np.asarray(data[col], dtype=np.float64) for col in FEATURES])
+    np.minimum(X[:, 0], SLEEP_OPTIMAL, out=X[:, 0])
+    return X
+
+def compile_weights(weight_matrix):
+    """
+    Coefficients (5 x K) and intercepts (K,) of K weight sets given as a
+    K x 5 matrix in WEIGHT_KEYS order; column k scores the design matrix
+    with X @ coefficients[:, k] + intercepts[k]
+    """
+    W = np.atleast_2d(np.asarray(weight_matrix, dtype=np.float64))
+    origins = np.array([NORMALIZATION[col][1] for col in FEATURES], dtype=np.float64)
+    scales = np.array([NORMALIZATION[col][2] for col in FEATURES], dtype=np.float64)
+    return (W / scales).T, -(W * origins / scales).sum(axis=1)
+
+def check_weights(weights):
+    """Weights as a float dict, raising ValueError unless every factor has a finite weight >= 0"""
+    if not isinstance(weights, dict) or set(weights) != set(WEIGHTS):
+        raise ValueError(f"Weights need exactly these keys: {sorted(WEIGHTS)}")
+    checked = {}
+    for key in WEIGHTS:
+        value = weights[key]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+            raise ValueError(f"Weight '{key}' must be a finite number >= 0, got {value!r}")
+        checked[key] = float(value)
+    return checked
+
+class ScoringModel:
+    """
+    One weight set compiled to coefficients and intercept
+    score = design_matrix(data) @ coefficients + intercept, then burnout_score's
+    cap and rounding; identical to burnout_scores(data, weights)
+    """
+
+    def __init__(self, weights=None, version=DEFAULT_MODEL_VERSION):
+        self.weights = check_weights(WEIGHTS if weights is None else weights)
+        self.version = version
+        coefficients, intercepts = compile_weights([self.weights[key] for key in WEIGHT_KEYS])
+        self.coefficients = coefficients[:, 0]
+        self.intercept = float(intercepts[0])
+
+    def __repr__(self):
+        return f"ScoringModel(version={self.version!r}, weights={self.weights!r})"
+
+    def raw_scores(self, X):
+        """Uncapped, unrounded scores of a design matrix"""
+        return X @ self.coefficients + self.intercept
+
+    def scores_from_design(self, X):
+        """
+        burnout_score for every row of a design matrix
+        The dot product sums in a different order than burnout_score, which
+        only matters where the sum sits on a rounding tie; those rows are
+        re-added in burnout_score's order so results match bit for bit
+        """
+        raw = self.raw_scores(X)
+        tie = near_ties(raw)
+        if tie.any():
+            factors = weighted_factors({col: X[tie, i] for i, col in enumerate(FEATURES)}, self.weights)
+            exact = factors[:, 0]
+            for i in range(1, factors.shape[1]):
+                exact = exact + factors[:, i]
+            raw[tie] = exact
+        return finalize_scores(raw)
+
+    def scores(self, data):
+        """burnout_score for a DataFrame or mapping of input columns"""
+        return self.scores_from_design(design_matrix(data))
+
+    def score_batch(self, data):
+        """(scores, risk labels) like scoring_engine.score_batch under this model's weights"""
+        scores = self.scores(data)
+        return scores, risk_labels(scores)
+
+def load_models(path=MODELS_PATH):
+    """
+    Read a weight-set file: {"active": version, "versions": {version: weights}}
+    Returns (models by version, active version); raises ValueError if malformed
+    """
+    with open(path) as f:
+        try:
+            spec = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: {e}") from e
+    versions = spec.get('versions') if isinstance(spec, dict) else None
+    if not isinstance(versions, dict) or not versions:
+        raise ValueError(f"{path}: needs a non-empty 'versions' object")
+    models = {}
+    for version, weights in versions.items():
+        try:
+            models[version] = ScoringModel(weights, version)
+        except ValueError as e:
+            raise ValueError(f"{path}: version '{version}': {e}") from e
+    active = spec.get('active', next(iter(models)))
+    if active not in models:
+        raise ValueError(f"{path}: active version '{active}' is not defined")
+    return models, active
+
+class ModelRegistry:
+    """
+    Weight sets from a file, reloaded when its modification time or size
+    changes. A missing file means the config.WEIGHTS model only; a file that
+    fails to load keeps the last good weight sets and sets `error`.
+    """
+
+    def __init__(self, path=MODELS_PATH):
+        self.path = path
+        self.error = None
+        # (models by version, active version), replaced as one on reload
+        self._state = ({DEFAULT_MODEL_VERSION: ScoringModel()}, DEFAULT_MODEL_VERSION)
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Reload the file if it changed since the last check; returns True on reload"""
+        try:
+            info = os.stat(self.path)
+            stamp = (info.st_mtime_ns, info.st_size)
+        except FileNotFoundError:
+            stamp = None
+        with self._lock:
+            if stamp == self._stamp:
+                return False
+            self._stamp = stamp
+            if stamp is None:
+                self._state = ({DEFAULT_MODEL_VERSION: ScoringModel()}, DEFAULT_MODEL_VERSION)
+                self.error = None
+                return True
+            try:
+                self._state = load_models(self.path)
+                self.error = None
+            except (OSError, ValueError) as e:
+                self.error = str(e)
+                return False
+            return True
+
+    def versions(self):
+        """Available versions in file order"""
+        self.refresh()
+        return list(self._state[0])
+
+    @property
+    def active_version(self):
+        self.refresh()
+        return self._state[1]
+
+    def get(self, version=None):
+        """Model of a version, the active one by default; KeyError if unknown"""
+        self.refresh()
+        models, active = self._state
+        version = active if version is None else version
+        if version not in models:
+            raise KeyError(f"Unknown weight set: {version}")
+        return models[version]
+
+    def activate(self, version):
+        """Make version the active weight set for every process reading the file"""
+        self.refresh()
+        if self.error is not None:
+            raise ValueError(f"Cannot activate while {self.path} fails to load: {self.error}")
+        models = self._state[0]
+        if version not in models:
+            raise KeyError(f"Unknown weight set: {version}")
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                spec = json.load(f)
+        else:
+            spec = {'versions': {name: model.weights for name, model in models.items()}}
+        spec['active'] = version
+        # Written under a temporary name first so readers never see half a file
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(spec, f, indent=2)
+            f.write("\n")
+        os.replace(self.path + ".tmp", self.path)
+        self.refresh()
+        return self.get()
@@ -0,0 +1,179 @@
+"""
+Weight Sensitivity
+How much risk labels and peer ranks depend on the choice of weights. The
+cohort is scored under K weight sets at once, one (n x 5) @ (5 x K) product
+per row chunk, and each student's label and percentile rank under every set
+are compared with those under the current weights.
+"""
+import numpy as np
+import pandas as pd
+
+from core.scoring_engine import RISK_LABELS, RISK_THRESHOLDS, risk_codes
+from core.scoring_model import ScoringModel, WEIGHT_KEYS, compile_weights, design_matrix
+
+# Default number of sampled weight sets and their Dirichlet concentration
+# (higher keeps the samples closer to the current weights)
+SENSITIVITY_SETS = 1000
+DIRICHLET_CONCENTRATION = 100
+# (students x weight sets) score cells per chunk; small enough for the
+# chunk's intermediates to stay in cache, which beats larger chunks
+SENSITIVITY_CHUNK_CELLS = 2 ** 17
+# Students keeping their label under at least this share of sets count as stable
+STABLE_SHARE = 0.9
+
+# Scores are compared as integer hundredths (0..100), so risk thresholds too
+_THRESHOLDS = [round(t * 100) for t in RISK_THRESHOLDS]
+_LEVELS = 101
+
+def sample_weights(k=SENSITIVITY_SETS, weights=None, concentration=DIRICHLET_CONCENTRATION, seed=0):
+    """
+    K x 5 weight sets (WEIGHT_KEYS order) from a Dirichlet centred on weights
+    (config.WEIGHTS by default) with the same total; zero weights stay zero
+    """
+    base = ScoringModel(weights).weights
+    base = np.array([base[key] for key in WEIGHT_KEYS])
+    total = base.sum()
+    positive = base > 0
+    sample = np.zeros((k, len(base)))
+    if total > 0:
+        rng = np.random.default_rng(seed)
+        sample[:, positive] = rng.dirichlet(concentration * base[positive] / total, size=k) * total
+    return sample
+
+def weight_matrix(weight_sets):
+    """K x 5 matrix from a list of weight dicts or an array in WEIGHT_KEYS order"""
+    if len(weight_sets) and isinstance(weight_sets[0], dict):
+        weight_sets = [[ScoringModel(w).weights[key] for key in WEIGHT_KEYS] for w in weight_sets]
+    W = np.atleast_2d(np.asarray(weight_sets, dtype=np.float64))
+    if W.shape[1] != len(WEIGHT_KEYS):
+        raise ValueError(f"Weight sets need {len(WEIGHT_KEYS)} columns: {WEIGHT_KEYS}")
+    if not np.isfinite(W).all() or (W < 0).any():
+        raise ValueError("Weights must be finite numbers >= 0")
+    return W
+
+def _cells(X, coefficients, intercepts, offsets):
+    """
+    Scores of a chunk under every set as integer hundredths (rounded half
+    up, capped at 100) plus each set's offset into the flat histogram
+    coefficients and intercepts come pre-scaled by 100, intercepts also
+    carry the offsets and the 0.5 for rounding; scores of validated inputs
+    under non-negative weights are never below 0
+    """
+    raw = X @ coefficients
+    raw += intercepts
+    np.minimum(raw, offsets + (_LEVELS - 1), out=raw)
+    return raw.astype(np.int32)
+
+def weight_sensitivity(data, weight_sets=None, model=None, chunk_cells=SENSITIVITY_CHUNK_CELLS):
+    """
+    Score a cohort under K weight sets (default: sample_weights()) and compare
+    each student with the model's scores (config.WEIGHTS by default)
+    Percentiles follow PeerIndex: percent of the cohort strictly below.
+    Sampled scores come straight from the matrix product, so a score sitting
+    exactly on a rounding tie may round the other way than burnout_score.
+    Returns a dict with the weight matrix, one row per student (shares of
+    sets per risk band, label agreement, mean and spread of the percentile
+    rank, decile agreement) and the cohort's band shares under every set
+    """
+    model = ScoringModel() if model is None else model
+    W = sample_weights() if weight_sets is None else weight_matrix(weight_sets)
+    coefficients, intercepts = compile_weights(W)
+    X = design_matrix(data)
+    n, k = len(X), len(W)
+    chunk = max(1, chunk_cells // max(k, 1))
+
+    # Set j's scores land in histogram bins [j * 101, j * 101 + 100]
+    offsets = np.arange(k, dtype=np.float64) * _LEVELS
+    coefficients = coefficients * 100
+    intercepts = intercepts * 100 + 0.5 + offsets
+    low_bins = (offsets + _THRESHOLDS[0]).astype(np.int32)
+    high_bins = (offsets + _THRESHOLDS[1]).astype(np.int32)
+
+    base = model.scores_from_design(X)
+    base_codes = risk_codes(base)
+    base_hundredths = np.rint(base * 100).astype(np.int64)
+    base_hist = np.bincount(base_hundredths, minlength=_LEVELS)
+    base_pct = (np.cumsum(base_hist) - base_hist)[base_hundredths] / max(n, 1) * 100
+    # Bounds of each student's current percentile decile
+    decile_low = (np.minimum(base_pct // 10, 9) * 10).astype(np.float32)
+    decile_high = np.where(decile_low >= 90, np.inf, decile_low + 10).astype(np.float32)
+
+    # Pass 1: score histogram of every set, for percentile ranks
+    hist = np.zeros(k * _LEVELS, dtype=np.int64)
+    for start in range(0, n, chunk):
+        hist += np.bincount(_cells(X[start:start + chunk], coefficients, intercepts, offsets).ravel(),
+                            minlength=k * _LEVELS)
+    hist = hist.reshape(k, _LEVELS)
+    # float32 halves the memory traffic of the per-cell lookups below
+    pct_table = ((np.cumsum(hist, axis=1) - hist) / max(n, 1) * 100).ravel().astype(np.float32)
+
+    # Pass 2: each student's labels and ranks against the current weights
+    band_counts = np.zeros((n, len(RISK_LABELS)), dtype=np.int64)
+    set_counts = np.zeros((k, len(RISK_LABELS)), dtype=np.int64)
+    rank_mean = np.empty(n)
+    rank_std = np.empty(n)
+    decile_agreement = np.empty(n)
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        cells = _cells(X[start:stop], coefficients, intercepts, offsets)
+        above_low = cells >= low_bins
+        above_high = cells >= high_bins
+        at_least_moderate = np.count_nonzero(above_low, axis=1)
+        band_counts[start:stop, 2] = np.count_nonzero(above_high, axis=1)
+        band_counts[start:stop, 1] = at_least_moderate - band_counts[start:stop, 2]
+        band_counts[start:stop, 0] = k - at_least_moderate
+        set_counts[:, 2] += np.count_nonzero(above_high, axis=0)
+        set_counts[:, 1] += np.count_nonzero(above_low, axis=0)
+        pct = pct_table[cells]
+        mean = pct.sum(axis=1, dtype=np.float64) / k
+        rank_mean[start:stop] = mean
+        # Population variance from the sums; clipped at 0 against rounding
+        squares = np.einsum('ij,ij->i', pct, pct, dtype=np.float64)
+        rank_std[start:stop] = np.sqrt(np.maximum(squares / k - mean ** 2, 0.0))
+        in_decile = (pct >= decile_low[start:stop, None]) & (pct < decile_high[start:stop, None])
+        decile_agreement[start:stop] = np.count_nonzero(in_decile, axis=1) / k
+    set_counts[:, 1] -= set_counts[:, 2]
+    set_counts[:, 0] = n - set_counts[:, 1] - set_counts[:, 2]
+
+    shares = band_counts / max(k, 1)
+    students = pd.DataFrame({
+        'burnout_score': base,
+        'risk': np.array(RISK_LABELS, dtype=object)[base_codes],
+        'low_share': shares[:, 0],
+        'moderate_share': shares[:, 1],
+        'elevated_share': shares[:, 2],
+        'label_agreement': shares[np.arange(n), base_codes],
+        'percentile': base_pct,
+        'rank_mean': rank_mean,
+        'rank_std': rank_std,
+        'decile_agreement': decile_agreement,
+    }, index=data.index if hasattr(data, 'index') else None)
+
+    return {
+        'weights': pd.DataFrame(W, columns=WEIGHT_KEYS),
+        'students': students,
+        'band_shares': pd.DataFrame(set_counts / max(n, 1), columns=RISK_LABELS),
+        'current_band_shares': pd.Series(np.bincount(base_codes, minlength=len(RISK_LABELS)) / max(n, 1), index=RISK_LABELS),
+    }
+
+def sensitivity_summary(result, stable_share=STABLE_SHARE):
+    """
+    Cohort-level view of a weight_sensitivity result: stability headline
+    numbers and, per risk band, its share now and across the weight sets
+    """
+    students = result['students']
+    shares = result['band_shares']
+    bands = pd.DataFrame({
+        'current': result['current_band_shares'],
+        'p5': shares.quantile(0.05),
+        'median': shares.median(),
+        'p95': shares.quantile(0.95),
+    })
+    return {
+        'sets': len(result['weights']),
+        'stable_share': float((students['label_agreement'] >= stable_share).mean()) if len(students) else np.nan,
+        'mean_label_agreement': float(students['label_agreement'].mean()),
+        'mean_decile_agreement': float(students['decile_agreement'].mean()),
+        'mean_rank_std': float(students['rank_std'].mean()),
+        'bands': (bands * 100).round(1),
+    }
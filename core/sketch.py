@@ -0,0 +1,156 @@
+"""
+Quantile Sketch
+KLL-style mergeable sketch for approximate quantiles and percentile ranks
+of large cohorts without keeping the raw values
+"""
+import math
+
+import numpy as np
+
+class QuantileSketch:
+    """
+    KLL quantile sketch with exact count, mean, variance, min and max
+    Level h holds items of weight 2**h; when a level overflows it is sorted
+    and every other item is promoted. Normalized rank error is about
+    2.3 / k**0.97 (k=200 gives ~1.3%); cohorts smaller than k stay exact.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = int(k)
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def with_error(cls, rank_error, seed=0):
+        """Sketch sized for a target normalized rank error, e.g. 0.01"""
+        return cls(k=max(8, math.ceil((2.296 / rank_error) ** (1 / 0.9723))), seed=seed)
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def _compress(self):
+        while True:
+            for level, items in enumerate(self.levels):
+                if len(items) > self._capacity(level):
+                    break
+            else:
+                return
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+
+            items = np.sort(items)
+            leftover, items = items[:len(items) % 2], items[len(items) % 2:]
+            offset = int(self._rng.integers(2))
+            self.levels[level] = leftover
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset::2]])
+
+    def _merge_moments(self, n, mean, m2, low, high):
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+        self.min = min(self.min, low)
+        self.max = max(self.max, high)
+
+    def update(self, values):
+        """Add an array of values, missing values are ignored"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        mean = values.mean()
+        self._merge_moments(len(values), mean, float(((values - mean) ** 2).sum()),
+                            float(values.min()), float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch (same k) into this one"""
+        if other.k != self.k:
+            raise ValueError("Cannot merge sketches with different k")
+        if other.n == 0:
+            return self
+
+        self._merge_moments(other.n, other.mean, other.m2, other.min, other.max)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+
+    def rank(self, value):
+        """Approximate fraction of values strictly below value (scalar or array)"""
+        value = np.asarray(value, dtype=np.float64)
+        if self.n == 0:
+            return np.zeros(value.shape) if value.ndim else 0.0
+        below = np.zeros(value.shape)
+        for level, items in enumerate(self.levels):
+            below += np.searchsorted(np.sort(items), value, side='left') * 2 ** level
+        below = np.where(np.isnan(value), 0.0, below)
+        fraction = np.clip(below / self.n, 0.0, 1.0)
+        return float(fraction) if fraction.ndim == 0 else fraction
+
+    def _sorted_items(self):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """Linearly interpolated quantile, same definition as pandas"""
+        if self.n == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        items, cumulative = self._sorted_items()
+        total = cumulative[-1]
+        position = np.asarray(q, dtype=np.float64) * (total - 1)
+        lower = np.floor(position)
+        upper = np.minimum(lower + 1, total - 1)
+        low_value = items[np.searchsorted(cumulative, lower, side='right')]
+        high_value = items[np.searchsorted(cumulative, upper, side='right')]
+        result = np.clip(low_value + (high_value - low_value) * (position - lower), self.min, self.max)
+        return float(result) if result.ndim == 0 else result
+
+    def variance(self, ddof=1):
+        return self.m2 / (self.n - ddof) if self.n > ddof else np.nan
+
+    def std(self, ddof=1):
+        return math.sqrt(self.variance(ddof)) if self.n > ddof else np.nan
+
+    def to_dict(self):
+        """JSON-serializable state; an empty sketch has no min or max (None)"""
+        return {
+            'k': self.k,
+            'n': self.n,
+            'mean': self.mean,
+            'm2': self.m2,
+            'min': self.min if self.n else None,
+            'max': self.max if self.n else None,
+            'levels': [items.tolist() for items in self.levels],
+            'rng': self._rng.bit_generator.state,
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(k=state['k'])
+        sketch.n = state['n']
+        sketch.mean = state['mean']
+        sketch.m2 = state['m2']
+        # Empty sketches keep the infinite sentinels merging starts from
+        sketch.min = math.inf if state['min'] is None else state['min']
+        sketch.max = -math.inf if state['max'] is None else state['max']
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in state['levels']]
+        sketch._rng.bit_generator.state = state['rng']
+        return sketch
@@ -5,23 +5,47 @@ Pure statistical techniques for burnout analysis - No ML
 import pandas as pd
 import numpy as np
 
+from core.streaming import RunningMoments
+
+# Bins of the Statistical Analysis tab histograms
+HISTOGRAM_BINS = 15
+
+def has_missing(data):
+    """True if any value of a DataFrame of numeric columns is missing"""
+    return bool(data.isna().to_numpy().any())
+
 def correlation_analysis(df):
     """
     Calculate Pearson correlation coefficients between variables
     Returns correlation matrix for key variables
+    df may also be a RunningMoments kept current with update()/remove(),
+    which only counts rows with no missing value
     """
-    variables = ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance', 'burnout_score']
-    available_vars = [v for v in variables if v in df.columns]
+    if isinstance(df, RunningMoments):
+        moments = df
+    else:
+        variables = ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance', 'burnout_score']
+        available_vars = [v for v in variables if v in df.columns]
+        
+        if len(available_vars) < 2:
+            return pd.DataFrame()
+        
+        # Each pair is correlated over the rows holding both values, which
+        # the moments (complete rows only) match only without missing values
+        if has_missing(df[available_vars]):
+            return df[available_vars].corr()
+        moments = RunningMoments(available_vars).update(df)
     
-    if len(available_vars) < 2:
-        return pd.DataFrame()
-    
-    corr_matrix = df[available_vars].corr()
+    corr_matrix = pd.DataFrame(moments.correlation(), index=moments.columns, columns=moments.columns)
     return corr_matrix
 
-def descriptive_statistics(df):
+def descriptive_statistics(df, moments=None):
     """
     Calculate descriptive statistics for all numeric variables
+    Count, mean, std and variance come from moments (a RunningMoments over
+    these variables kept current with update()/remove()) when given; every
+    statistic covers each column's own non-missing values, so with missing
+    values they are computed per column instead
     """
     variables = ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance', 'burnout_score']
     available_vars = [v for v in variables if v in df.columns]
@@ -29,13 +53,29 @@ def descriptive_statistics(df):
     if not available_vars:
         return pd.DataFrame()
     
-    stats = df[available_vars].describe().T
-    stats['variance'] = df[available_vars].var()
-    stats['median'] = df[available_vars].median()
+    # Compact float32/uint8 columns are summarised in float64 like CSV input
+    data = df[available_vars].astype(np.float64)
+    quartiles = data.quantile([0.25, 0.5, 0.75])
+    if has_missing(data):
+        count, mean, std, variance = data.count().astype(np.float64), data.mean(), data.std(), data.var()
+    else:
+        if moments is None:
+            moments = RunningMoments(available_vars).update(data)
+        cols = [moments.columns.index(v) for v in available_vars]
+        count, mean, std, variance = float(moments.n), moments.mean[cols], moments.std()[cols], moments.variance()[cols]
     
-    # Reorder columns for better readability
-    column_order = ['count', 'mean', 'median', 'std', 'variance', 'min', '25%', '50%', '75%', 'max']
-    stats = stats[[col for col in column_order if col in stats.columns]]
+    stats = pd.DataFrame({
+        'count': count,
+        'mean': mean,
+        'median': data.median(),
+        'std': std,
+        'variance': variance,
+        'min': data.min(),
+        '25%': quartiles.loc[0.25],
+        '50%': quartiles.loc[0.5],
+        '75%': quartiles.loc[0.75],
+        'max': data.max(),
+    }, index=available_vars)
     
     return stats.round(2)
 
@@ -69,7 +109,7 @@ def distribution_analysis(df, variable):
     if variable not in df.columns:
         return None
     
-    data = df[variable]
+    data = df[variable].astype(np.float64)
     q1 = data.quantile(0.25)
     q2 = data.quantile(0.50)  # median
     q3 = data.quantile(0.75)
@@ -87,3 +127,196 @@ def distribution_analysis(df, variable):
         'Upper Bound': round(upper_bound, 2),
         'Outliers': len(data[(data < lower_bound) | (data > upper_bound)])
     }
+
+# Survey answers checked by outlier_flags, one bit each in this order
+OUTLIER_VARIABLES = ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance']
+
+# Outlier rules for outlier_flags: fence multiplier per method
+OUTLIER_RULES = {
+    'iqr': 1.5,     # Tukey fences: outside [Q1 - 1.5 IQR, Q3 + 1.5 IQR]
+    'mad': 3.5,     # modified z-score |0.6745 (x - median) / MAD| > 3.5
+    'zscore': 3.0,  # |x - mean| > 3 standard deviations
+}
+# 0.6745 is the 0.75 quantile of the standard normal, so MAD / 0.6745 estimates sigma
+MAD_SCALE = 0.6745
+
+def outlier_fences(df, variables=None, method='iqr', k=None):
+    """
+    Lower and upper outlier fences for several variables at once
+    Quartiles come from one quantile([.25, .5, .75]) call over all columns.
+    Returns a DataFrame indexed by variable with center, lower and upper.
+    """
+    if method not in OUTLIER_RULES:
+        raise ValueError(f"Unknown outlier method: {method}")
+    if variables is None:
+        variables = [v for v in OUTLIER_VARIABLES if v in df.columns]
+    k = OUTLIER_RULES[method] if k is None else k
+    data = df[variables].astype(np.float64)
+    
+    if method == 'zscore':
+        center, spread = data.mean(), data.std()
+        return pd.DataFrame({'center': center, 'lower': center - k * spread, 'upper': center + k * spread})
+    
+    quartiles = data.quantile([0.25, 0.5, 0.75])
+    q1, median, q3 = quartiles.loc[0.25], quartiles.loc[0.5], quartiles.loc[0.75]
+    if method == 'iqr':
+        iqr = q3 - q1
+        return pd.DataFrame({'center': median, 'lower': q1 - k * iqr, 'upper': q3 + k * iqr})
+    
+    # A zero MAD (over half the answers identical) flags nothing rather than everything
+    mad = (data - median).abs().median()
+    spread = (k * mad / MAD_SCALE).where(mad > 0, np.inf)
+    return pd.DataFrame({'center': median, 'lower': median - spread, 'upper': median + spread})
+
+def outlier_flags(df, variables=None, method='iqr', k=None):
+    """
+    Per-student outlier bitmask: bit i is set when variables[i] falls
+    outside its fences (see outlier_fences). Returns an unsigned integer
+    Series named 'outlier_flags' aligned with df
+    """
+    fences = outlier_fences(df, variables, method, k)
+    variables = list(fences.index)
+    dtype = np.min_scalar_type(2 ** max(len(variables), 1) - 1)
+    
+    flags = np.zeros(len(df), dtype=dtype)
+    for bit, var in enumerate(variables):
+        values = df[var].to_numpy(dtype=np.float64)
+        outside = (values < fences.at[var, 'lower']) | (values > fences.at[var, 'upper'])
+        flags |= outside.astype(dtype) << dtype.type(bit)
+    return pd.Series(flags, index=df.index, name='outlier_flags')
+
+def flagged_variables(flags, variables):
+    """Decode one bitmask value into the variables it flags"""
+    return [var for bit, var in enumerate(variables) if int(flags) >> bit & 1]
+
+def distribution_summary(df, variables=None):
+    """
+    distribution_analysis for several variables in one vectorized pass
+    Returns {variable: same dict as distribution_analysis(df, variable)}
+    """
+    fences = outlier_fences(df, variables, 'iqr')
+    data = df[list(fences.index)].astype(np.float64)
+    quartiles = data.quantile([0.25, 0.5, 0.75])
+    outliers = ((data < fences['lower']) | (data > fences['upper'])).sum()
+    
+    return {
+        var: {
+            'Q1': round(quartiles.at[0.25, var], 2),
+            'Q2 (Median)': round(quartiles.at[0.5, var], 2),
+            'Q3': round(quartiles.at[0.75, var], 2),
+            'IQR': round(quartiles.at[0.75, var] - quartiles.at[0.25, var], 2),
+            'Lower Bound': round(fences.at[var, 'lower'], 2),
+            'Upper Bound': round(fences.at[var, 'upper'], 2),
+            'Outliers': int(outliers[var])
+        }
+        for var in fences.index
+    }
+
+def _lerp(low, high, fraction):
+    # numpy's 'linear' interpolation, which pandas quantile() uses
+    diff = high - low
+    return high - diff * (1 - fraction) if fraction >= 0.5 else low + diff * fraction
+
+def sorted_quantile(sorted_values, q):
+    """Same result as Series.quantile(q) on already sorted, NaN-free values"""
+    position = (len(sorted_values) - 1) * q
+    lower = int(np.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return _lerp(sorted_values[lower], sorted_values[upper], position - lower)
+
+def sorted_median(sorted_values):
+    """Same result as Series.median() on already sorted, NaN-free values"""
+    n = len(sorted_values)
+    if n % 2:
+        return sorted_values[n // 2]
+    return (sorted_values[n // 2 - 1] + sorted_values[n // 2]) / 2
+
+def sorted_histogram(sorted_values, bins=HISTOGRAM_BINS):
+    """np.histogram(values, bins) from sorted values, as (counts, edges)"""
+    first, last = sorted_values[0], sorted_values[-1]
+    if first == last:
+        first, last = first - 0.5, last + 0.5
+    edges = np.linspace(first, last, bins + 1)
+    starts = np.searchsorted(sorted_values, edges, side='left')
+    counts = np.diff(starts)
+    # The last bin is closed on the right
+    counts[-1] += len(sorted_values) - starts[-1]
+    return counts, edges
+
+def statistics_profile(df, bins=HISTOGRAM_BINS):
+    """
+    Every statistic the Statistical Analysis tab shows, from one co-moment
+    pass and one sort per column. Returns a dict with the descriptive table,
+    correlation matrix, per-variable distribution summaries (as
+    distribution_analysis), histogram counts and edges, means and medians,
+    and cohort statistics of the burnout score (as cohort_statistics)
+    """
+    variables = ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance', 'burnout_score']
+    available_vars = [v for v in variables if v in df.columns]
+    
+    # The moments only count complete rows; with missing values each column
+    # (and each pair for the correlations) is summarised on its own instead
+    moments = None
+    if has_missing(df[available_vars]):
+        data = df[available_vars].astype(np.float64)
+        means, stds, variances = data.mean().to_numpy(), data.std().to_numpy(), data.var().to_numpy()
+    else:
+        moments = RunningMoments(available_vars).update(df)
+        means, stds, variances = moments.mean, moments.std(), moments.variance()
+    
+    rows, distribution, histograms, medians = {}, {}, {}, {}
+    for i, var in enumerate(available_vars):
+        values = np.sort(df[var].to_numpy(dtype=np.float64))
+        values = values[:len(values) - np.isnan(values).sum()]
+        if len(values) == 0:
+            continue
+        q1, q2, q3 = (sorted_quantile(values, q) for q in (0.25, 0.5, 0.75))
+        median = sorted_median(values)
+        medians[var] = median
+        rows[var] = {
+            'count': float(len(values)), 'mean': means[i], 'median': median, 'std': stds[i],
+            'variance': variances[i], 'min': values[0], '25%': q1, '50%': q2, '75%': q3, 'max': values[-1],
+        }
+        
+        iqr = q3 - q1
+        lower_bound = q1 - 1.5 * iqr
+        upper_bound = q3 + 1.5 * iqr
+        outliers = np.searchsorted(values, lower_bound, side='left') + len(values) - np.searchsorted(values, upper_bound, side='right')
+        distribution[var] = {
+            'Q1': round(q1, 2),
+            'Q2 (Median)': round(q2, 2),
+            'Q3': round(q3, 2),
+            'IQR': round(iqr, 2),
+            'Lower Bound': round(lower_bound, 2),
+            'Upper Bound': round(upper_bound, 2),
+            'Outliers': int(outliers)
+        }
+        histograms[var] = sorted_histogram(values, bins)
+    
+    descriptive = pd.DataFrame.from_dict(rows, orient='index').round(2)
+    
+    cohort = None
+    if 'burnout_score' in rows:
+        row = rows['burnout_score']
+        cohort = {
+            'mean': round(row['mean'], 3),
+            'median': round(row['median'], 3),
+            'std': round(row['std'], 3),
+            'variance': round(row['variance'], 3),
+            'min': round(row['min'], 3),
+            'max': round(row['max'], 3),
+            'range': round(row['max'] - row['min'], 3),
+            'q1': round(row['25%'], 3),
+            'q3': round(row['75%'], 3),
+            'iqr': round(row['75%'] - row['25%'], 3)
+        }
+    
+    return {
+        'descriptive': descriptive,
+        'correlation': correlation_analysis(df if moments is None else moments) if len(available_vars) >= 2 else pd.DataFrame(),
+        'distribution': distribution,
+        'histograms': histograms,
+        'means': dict(zip(available_vars, means)),
+        'medians': medians,
+        'cohort': cohort,
+    }
@@ -0,0 +1,344 @@
+"""
+Streaming Accumulators
+Running statistics that are updated chunk by chunk and merged across chunks,
+so large cohorts can be summarised without holding every row in memory
+"""
+import heapq
+
+import numpy as np
+
+from core.sketch import QuantileSketch
+
+VARIABLES = ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance', 'burnout_score']
+
+class RunningMoments:
+    """
+    Count, column sums, co-moment matrix, min and max of several columns
+    Batches are combined with Chan's parallel update, so two accumulators can
+    be merged exactly, and removed the same way in reverse. Rows with a
+    missing value in any column are skipped.
+    """
+
+    def __init__(self, columns=VARIABLES):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = 0
+        self.total = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+        self.min = np.full(k, np.inf)
+        self.max = np.full(k, -np.inf)
+
+    def _from_rows(self, batch):
+        """Accumulator over one DataFrame (or n x k array) of rows"""
+        # Column-major so per-column sums use the same pairwise summation as pandas
+        if hasattr(batch, 'columns'):
+            x = np.empty((len(batch), len(self.columns)), order='F')
+            for i, col in enumerate(self.columns):
+                x[:, i] = batch[col].to_numpy(dtype=np.float64)
+        else:
+            x = np.asfortranarray(batch, dtype=np.float64)
+        complete = ~np.isnan(x).any(axis=1)
+        if not complete.all():
+            x = np.asfortranarray(x[complete])
+        other = RunningMoments(self.columns)
+        if len(x) == 0:
+            return other
+
+        other.n = len(x)
+        other.total = x.sum(axis=0)
+        centered = x - other.mean
+        other.comoment = centered.T @ centered
+        np.fill_diagonal(other.comoment, np.square(centered, out=centered).sum(axis=0))
+        other.min = x.min(axis=0)
+        other.max = x.max(axis=0)
+        return other
+
+    def update(self, batch):
+        """Add a DataFrame (or n x k array) of rows"""
+        return self.merge(self._from_rows(batch))
+
+    def remove(self, batch):
+        """
+        Take rows previously added with update() back out in O(batch)
+        min and max become NaN where the removed rows held the extreme
+        """
+        other = self._from_rows(batch)
+        if other.n == 0:
+            return self
+        if other.n > self.n:
+            raise ValueError("Cannot remove more rows than were added")
+        if other.n == self.n:
+            self.__init__(self.columns)
+            return self
+
+        n = self.n - other.n
+        total = self.total - other.total
+        delta = other.mean - total / n
+        self.comoment = self.comoment - other.comoment - np.outer(delta, delta) * (n * other.n / self.n)
+        self.total = total
+        self.n = n
+        self.min = np.where(other.min <= self.min, np.nan, self.min)
+        self.max = np.where(other.max >= self.max, np.nan, self.max)
+        return self
+
+    def merge(self, other):
+        """Fold another accumulator over the same columns into this one"""
+        if other.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.total, self.comoment = other.n, other.total.copy(), other.comoment.copy()
+            self.min, self.max = other.min.copy(), other.max.copy()
+            return self
+
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.total = self.total + other.total
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.n * other.n / n)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.n = n
+        return self
+
+    @property
+    def mean(self):
+        """Per-column mean"""
+        if self.n == 0:
+            return np.full(len(self.columns), np.nan)
+        return self.total / self.n
+
+    def variance(self, ddof=1):
+        """Per-column variance"""
+        if self.n <= ddof:
+            return np.full(len(self.columns), np.nan)
+        return np.diag(self.comoment) / (self.n - ddof)
+
+    def std(self, ddof=1):
+        """Per-column standard deviation"""
+        return np.sqrt(self.variance(ddof))
+
+    def covariance(self, ddof=1):
+        """Covariance matrix"""
+        if self.n <= ddof:
+            return np.full(self.comoment.shape, np.nan)
+        return self.comoment / (self.n - ddof)
+
+    def correlation(self):
+        """Pearson correlation matrix"""
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return self.comoment / np.outer(scale, scale)
+
+class ScoreHistogram:
+    """
+    Exact distribution of burnout scores
+    burnout_score rounds to 2 decimals within [0, 1], so counting scores on
+    that 0.01 grid gives exact quantiles in constant memory
+    """
+
+    def __init__(self, resolution=100):
+        self.resolution = resolution
+        self.counts = np.zeros(resolution + 1, dtype=np.int64)
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+    def update(self, scores):
+        """Add an array of scores, missing scores are ignored"""
+        scores = np.asarray(scores, dtype=np.float64)
+        scores = scores[~np.isnan(scores)]
+        bins = np.clip(np.rint(scores * self.resolution), 0, self.resolution).astype(np.int64)
+        self.counts += np.bincount(bins, minlength=self.resolution + 1)
+        return self
+
+    def merge(self, other):
+        self.counts += other.counts
+        return self
+
+    def _value_at(self, rank):
+        cumulative = np.cumsum(self.counts)
+        return np.searchsorted(cumulative, rank, side='right') / self.resolution
+
+    def quantile(self, q):
+        """Linearly interpolated quantile, same definition as pandas"""
+        n = self.n
+        if n == 0:
+            return np.nan
+        position = q * (n - 1)
+        lower = int(np.floor(position))
+        upper = min(lower + 1, n - 1)
+        low_value, high_value = self._value_at(lower), self._value_at(upper)
+        return low_value + (high_value - low_value) * (position - lower)
+
+    def min(self):
+        return self._value_at(0) if self.n else np.nan
+
+    def max(self):
+        return self._value_at(self.n - 1) if self.n else np.nan
+
+class DistinctCounts:
+    """
+    Exact count of every distinct value while there are at most
+    max_distinct of them; hours, stress and attendance usually sit on a
+    coarse grid, so their quantiles stay exact. Past the cap it stops
+    tracking (overflowed) and callers fall back to a sketch.
+    """
+
+    def __init__(self, max_distinct=4096):
+        self.max_distinct = max_distinct
+        self.values = np.empty(0)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.overflowed = False
+
+    @property
+    def n(self):
+        return int(self.counts.sum())
+
+    def _add(self, values, counts):
+        if self.overflowed:
+            return self
+        values, inverse = np.unique(np.concatenate([self.values, values]), return_inverse=True)
+        if len(values) > self.max_distinct:
+            self.overflowed = True
+            self.values, self.counts = np.empty(0), np.empty(0, dtype=np.int64)
+            return self
+        self.values = values
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts]), minlength=len(values)).astype(np.int64)
+        return self
+
+    def update(self, values):
+        """Add an array of values, missing values are ignored"""
+        values = np.asarray(values, dtype=np.float64)
+        values, counts = np.unique(values[~np.isnan(values)], return_counts=True)
+        return self._add(values, counts)
+
+    def merge(self, other):
+        if other.overflowed:
+            self.overflowed = True
+            self.values, self.counts = np.empty(0), np.empty(0, dtype=np.int64)
+            return self
+        return self._add(other.values, other.counts)
+
+    def quantile(self, q):
+        """Linearly interpolated quantile, same definition as pandas"""
+        n = self.n
+        if n == 0:
+            return np.nan
+        cumulative = np.cumsum(self.counts)
+        position = q * (n - 1)
+        lower = int(np.floor(position))
+        upper = min(lower + 1, n - 1)
+        low_value = self.values[np.searchsorted(cumulative, lower, side='right')]
+        high_value = self.values[np.searchsorted(cumulative, upper, side='right')]
+        return low_value + (high_value - low_value) * (position - lower)
+
+class TopK:
+    """
+    Bounded min-heap keeping the k rows with the largest key
+    Ties keep the earliest row, matching DataFrame.nlargest(keep='first')
+    """
+
+    def __init__(self, k, key, columns):
+        self.k = k
+        self.key = key
+        self.columns = list(columns)
+        self.heap = []
+        self.seen = 0
+
+    def update(self, df):
+        """Offer every row of a DataFrame chunk"""
+        candidates = df.reset_index(drop=True).nlargest(self.k, self.key)
+        for position, record in zip(candidates.index, candidates[self.columns].to_dict('records')):
+            self._push((record[self.key], -(self.seen + position), record))
+        self.seen += len(df)
+        return self
+
+    def _push(self, item):
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, item)
+        elif item[:2] > self.heap[0][:2]:
+            heapq.heapreplace(self.heap, item)
+
+    def merge(self, other):
+        """Merge a heap built over rows that come after this one's"""
+        for score, order, record in other.heap:
+            self._push((score, order - self.seen, record))
+        self.seen += other.seen
+        return self
+
+    def records(self):
+        """Rows ordered from largest to smallest key"""
+        return [record for _, _, record in sorted(self.heap, key=lambda item: item[:2], reverse=True)]
+
+class CohortAccumulator:
+    """
+    Everything the analysis report needs, built chunk by chunk:
+    moments of the analysis variables, score histogram, exact value counts
+    and quantile sketches of the input variables, risk counts and the top-N
+    highest risk students
+    """
+
+    def __init__(self, top_n=5, sketch_k=200):
+        self.moments = RunningMoments(VARIABLES)
+        self.scores = ScoreHistogram()
+        self.sketches = {var: QuantileSketch(k=sketch_k) for var in VARIABLES if var != 'burnout_score'}
+        self.distinct = {var: DistinctCounts() for var in self.sketches}
+        self.top = TopK(top_n, 'burnout_score', ['name', 'burnout_score', 'risk'])
+        self.risk_counts = {}
+        self.rows = 0
+
+    def update(self, df):
+        """Add a validated and scored chunk"""
+        self.rows += len(df)
+        self.moments.update(df)
+        self.scores.update(df['burnout_score'].to_numpy())
+        for var, sketch in self.sketches.items():
+            values = df[var].to_numpy()
+            sketch.update(values)
+            self.distinct[var].update(values)
+        self.top.update(df)
+        for risk, count in df['risk'].value_counts(sort=False).items():
+            self.risk_counts[risk] = self.risk_counts.get(risk, 0) + int(count)
+        return self
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.moments.merge(other.moments)
+        self.scores.merge(other.scores)
+        for var, sketch in self.sketches.items():
+            sketch.merge(other.sketches[var])
+            self.distinct[var].merge(other.distinct[var])
+        self.top.merge(other.top)
+        for risk, count in other.risk_counts.items():
+            self.risk_counts[risk] = self.risk_counts.get(risk, 0) + count
+        return self
+
+    def sorted_risk_counts(self):
+        """Risk counts ordered like value_counts()"""
+        return sorted(self.risk_counts.items(), key=lambda item: item[1], reverse=True)
+
+    def quantile(self, var, q):
+        """Exact for burnout_score and discrete inputs, sketch-approximate otherwise"""
+        if var == 'burnout_score':
+            return self.scores.quantile(q)
+        if not self.distinct[var].overflowed:
+            return self.distinct[var].quantile(q)
+        return self.sketches[var].quantile(q)
+
+    def cohort_statistics(self):
+        """Same keys and rounding as peer_engine.cohort_statistics"""
+        i = self.moments.columns.index('burnout_score')
+        q1, q3 = self.scores.quantile(0.25), self.scores.quantile(0.75)
+        score_min, score_max = self.scores.min(), self.scores.max()
+        return {
+            'mean': round(float(self.moments.mean[i]), 3),
+            'median': round(float(self.scores.quantile(0.5)), 3),
+            'std': round(float(self.moments.std()[i]), 3),
+            'variance': round(float(self.moments.variance()[i]), 3),
+            'min': round(float(score_min), 3),
+            'max': round(float(score_max), 3),
+            'range': round(float(score_max - score_min), 3),
+            'q1': round(float(q1), 3),
+            'q3': round(float(q3), 3),
+            'iqr': round(float(q3 - q1), 3)
+        }
@@ -0,0 +1,165 @@
+"""
+Trend Engine
+Early-warning signals over burnout_score histories: rolling mean, slope and
+EWMA over recent waves, and a one-sided CUSUM against each student's own
+baseline for change-point alerts. State is advanced one wave at a time,
+vectorized over students, so a new wave costs one pass over the cohort.
+"""
+import numpy as np
+import pandas as pd
+
+# Waves in the rolling mean and slope
+TREND_WINDOW = 4
+# EWMA weight of the newest score
+EWMA_ALPHA = 0.3
+# A student's first CUSUM_BASELINE scores set the level CUSUM compares against
+CUSUM_BASELINE = 3
+# Rise per wave tolerated before CUSUM accumulates, and the alert level
+# (a sustained 0.2 above baseline, matching the wave store's rising threshold)
+CUSUM_K = 0.04
+CUSUM_H = 0.2
+# Slope (score per wave) that flags a student, given enough points in the window
+SLOPE_ALERT = 0.05
+MIN_SLOPE_POINTS = 3
+
+class TrendState:
+    """
+    Per-student trend state, one row per student seen so far
+    Students missing from a wave keep their state; a ring buffer holds the
+    last `window` waves for the rolling mean and slope
+    """
+
+    def __init__(self, window=TREND_WINDOW, alpha=EWMA_ALPHA, baseline=CUSUM_BASELINE, k=CUSUM_K, h=CUSUM_H):
+        self.window = window
+        self.alpha = alpha
+        self.baseline = baseline
+        self.k = k
+        self.h = h
+        self.names = pd.Index([], dtype=object)
+        self.waves = []
+        # Wave number held by each ring buffer column (-1 = empty)
+        self.positions = np.full(window, -1)
+        self.buffer = np.empty((0, window))
+        self.latest = np.empty(0)
+        self.ewma = np.empty(0)
+        self.baseline_sum = np.empty(0)
+        self.baseline_n = np.empty(0, dtype=np.int64)
+        self.cusum = np.empty(0)
+        self.alert_wave = np.empty(0, dtype=np.int64)
+
+    @classmethod
+    def from_matrix(cls, names, waves, scores, **kwargs):
+        """State after folding a (student x wave) score matrix, NaN = no score"""
+        state = cls(**kwargs)
+        state._grow(pd.Index(names))
+        scores = np.asarray(scores, dtype=np.float64)
+        for j, wave in enumerate(waves):
+            state._advance(scores[:, j], wave)
+        return state
+
+    @classmethod
+    def from_table(cls, table, **kwargs):
+        """
+        State from a WaveStore table (name, wave, valid, burnout_score per row)
+        Invalid answers count as no score, so they leave a student's state as is
+        """
+        table = table.assign(burnout_score=table['burnout_score'].where(table['valid'].astype(bool)))
+        matrix = table.pivot(index='name', columns='wave', values='burnout_score')
+        return cls.from_matrix(matrix.index, matrix.columns, matrix.to_numpy(), **kwargs)
+
+    def _grow(self, new_names):
+        n = len(new_names)
+        self.names = self.names.append(pd.Index(new_names, dtype=object))
+        self.buffer = np.vstack([self.buffer, np.full((n, self.window), np.nan)])
+        self.latest = np.r_[self.latest, np.full(n, np.nan)]
+        self.ewma = np.r_[self.ewma, np.full(n, np.nan)]
+        self.baseline_sum = np.r_[self.baseline_sum, np.zeros(n)]
+        self.baseline_n = np.r_[self.baseline_n, np.zeros(n, dtype=np.int64)]
+        self.cusum = np.r_[self.cusum, np.zeros(n)]
+        self.alert_wave = np.r_[self.alert_wave, np.full(n, -1, dtype=np.int64)]
+
+    def update(self, scores, wave=None):
+        """
+        Fold in one new wave: scores is a Series of burnout_score indexed by
+        student name; students not seen before are added
+        """
+        scores = pd.Series(scores, dtype=np.float64)
+        rows = self.names.get_indexer(scores.index)
+        new = rows < 0
+        if new.any():
+            rows[new] = len(self.names) + np.arange(new.sum())
+            self._grow(scores.index[new])
+        values = np.full(len(self.names), np.nan)
+        values[rows] = scores.to_numpy()
+        self._advance(values, len(self.waves) if wave is None else wave)
+        return self
+
+    def _advance(self, values, wave):
+        t = len(self.waves)
+        self.waves.append(wave)
+        present = ~np.isnan(values)
+
+        column = t % self.window
+        self.buffer[:, column] = values
+        self.positions[column] = t
+        self.latest[present] = values[present]
+
+        # EWMA starts at a student's first score
+        first = present & np.isnan(self.ewma)
+        later = present & ~first
+        self.ewma[first] = values[first]
+        self.ewma[later] = self.alpha * values[later] + (1 - self.alpha) * self.ewma[later]
+
+        # CUSUM runs once the baseline is complete, against the baseline mean
+        monitored = present & (self.baseline_n >= self.baseline)
+        reference = self.baseline_sum[monitored] / self.baseline_n[monitored]
+        self.cusum[monitored] = np.maximum(0.0, self.cusum[monitored] + values[monitored] - reference - self.k)
+        filling = present & ~monitored
+        self.baseline_sum[filling] += values[filling]
+        self.baseline_n[filling] += 1
+
+        crossed = (self.cusum > self.h) & (self.alert_wave < 0)
+        self.alert_wave[crossed] = t
+
+    def rolling_mean(self):
+        """Mean score over the last `window` waves (NaN without scores)"""
+        counts = (~np.isnan(self.buffer)).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(counts > 0, np.nansum(self.buffer, axis=1) / counts, np.nan)
+
+    def slope(self):
+        """
+        Least-squares score change per wave over the last `window` waves,
+        NaN with fewer than two scores
+        """
+        valid = ~np.isnan(self.buffer) & (self.positions >= 0)
+        # Wave numbers relative to the newest wave keep the sums small
+        x = np.where(valid, self.positions - (len(self.waves) - 1), 0.0)
+        y = np.where(valid, self.buffer, 0.0)
+        n = valid.sum(axis=1)
+        sx, sy = x.sum(axis=1), y.sum(axis=1)
+        denominator = n * (x * x).sum(axis=1) - sx * sx
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where((n >= 2) & (denominator > 0), (n * (x * y).sum(axis=1) - sx * sy) / denominator, np.nan)
+
+    def signals(self):
+        """One row per student: latest score, rolling mean, slope, EWMA, CUSUM and alerts"""
+        waves = np.array(self.waves + [None], dtype=object)
+        points = (~np.isnan(self.buffer) & (self.positions >= 0)).sum(axis=1)
+        slope = self.slope()
+        return pd.DataFrame({
+            'latest': self.latest,
+            'rolling_mean': self.rolling_mean(),
+            'slope': slope,
+            'ewma': self.ewma,
+            'cusum': self.cusum,
+            'cusum_alert': self.cusum > self.h,
+            'alert_wave': waves[self.alert_wave],
+            'slope_alert': (points >= MIN_SLOPE_POINTS) & (slope >= SLOPE_ALERT),
+        }, index=pd.Index(self.names, name='name'))
+
+    def deteriorating(self):
+        """Students with a CUSUM or slope alert, highest CUSUM first"""
+        signals = self.signals()
+        flagged = signals[signals['cusum_alert'] | signals['slope_alert']]
+        return flagged.sort_values(['cusum', 'slope'], ascending=False, kind='stable')
@@ -1,3 +1,26 @@
+import numpy as np
+
+from config import SAFE_LIMITS
+
+# Clamp ranges applied to every input column
+CLAMP_RANGES = {
+    'sleep_hours': (0, SAFE_LIMITS['hours_max']),
+    'study_hours': (0, SAFE_LIMITS['hours_max']),
+    'screen_time': (0, SAFE_LIMITS['hours_max']),
+    'stress_level': (1, SAFE_LIMITS['stress_max']),
+    'attendance': (0, SAFE_LIMITS['attendance_max']),
+}
+
+# Per-row reject reason codes returned by validate_frame
+REASON_OK = 0
+REASON_MISSING = 1
+REASON_OVER_24_HOURS = 2
+REJECT_REASONS = {
+    REASON_OK: "ok",
+    REASON_MISSING: "missing value",
+    REASON_OVER_24_HOURS: "sleep + study + screen time exceeds 24 hours",
+}
+
 def validate_row(row):
     # Handle both dictionary-style (CSV) and attribute-style (manual) access
     if isinstance(row.get('sleep_hours'), (int, float)):
@@ -22,3 +45,40 @@ def validate_row(row):
         row.valid = total_hours <= 24
     
     return row
+
+def validate_columns(columns):
+    """
+    validate_frame without pandas, over a mapping of column name -> array
+    Returns (clamped input columns, 24-hour valid mask, reject reason codes)
+    """
+    clamped = {col: np.clip(np.asarray(columns[col]), low, high) for col, (low, high) in CLAMP_RANGES.items()}
+
+    # 24-hour constraint (NaN totals fail it, same as validate_row)
+    total_hours = (clamped['sleep_hours'].astype(np.float64)
+                   + clamped['study_hours'].astype(np.float64)
+                   + clamped['screen_time'].astype(np.float64))
+    valid = total_hours <= SAFE_LIMITS['hours_max']
+
+    missing = np.zeros(len(valid), dtype=bool)
+    for values in clamped.values():
+        missing |= np.isnan(values.astype(np.float64))
+
+    reasons = np.full(len(valid), REASON_OK, dtype=np.int8)
+    reasons[~valid] = REASON_OVER_24_HOURS
+    reasons[missing] = REASON_MISSING
+
+    return clamped, valid, reasons
+
+def validate_frame(df):
+    """
+    Vectorized validate_row for a whole DataFrame
+    Clamps every input column, adds the 24-hour 'valid' column and returns
+    (validated copy, per-row reject reason codes from REJECT_REASONS)
+    """
+    clamped, valid, reasons = validate_columns({col: df[col].to_numpy() for col in CLAMP_RANGES})
+    df = df.copy()
+    for col, values in clamped.items():
+        df[col] = values
+    df['valid'] = valid
+
+    return df, reasons
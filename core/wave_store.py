@@ -0,0 +1,219 @@
+"""
+Wave Store
+Append-only store of scored survey waves. Each append writes one .cohort
+segment holding only the rows that are new or changed since the store last
+saw that student in that wave, so historical waves are never re-scored, and
+students whose answers match their previous wave carry its score forward
+when it came from the same weight set. Every row records the weight-set
+version it was scored with, so trajectories spanning a weight swap say so.
+Later segments override earlier ones for the same (student, wave); the
+merged history is indexed per student for trajectory and trend queries.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from core.cohort_store import COHORT_EXTENSION, read_cohort, write_cohort, widen_float32
+from core.scoring_model import ScoringModel
+from core.schema import RISK_DTYPE
+from core.validation import validate_frame, CLAMP_RANGES
+
+INPUTS = list(CLAMP_RANGES)
+SEGMENT_PREFIX = "segment-"
+# Default window and rise for WaveStore.rising()
+RISING_WEEKS = 4
+RISING_THRESHOLD = 0.2
+
+def to_wave(wave):
+    """Wave label (date string, date or datetime64) as a datetime64[D]"""
+    return np.datetime64(wave, 'D')
+
+def _same(a, b):
+    """Elementwise equality that treats two missing values as equal"""
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    return (a == b) | (np.isnan(a) & np.isnan(b))
+
+class WaveStore:
+    """
+    Directory of segment files, one per append, read back memory-mapped
+    Students are identified by the 'name' column, which every wave needs
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._table = None
+        self._offsets = None
+
+    def segments(self):
+        """Segment file paths in append order"""
+        names = sorted(f for f in os.listdir(self.path)
+                       if f.startswith(SEGMENT_PREFIX) and f.endswith(COHORT_EXTENSION))
+        return [os.path.join(self.path, f) for f in names]
+
+    def _load(self):
+        """Merge the segments into one table sorted by student then wave"""
+        frames = [widen_float32(read_cohort(path)) for path in self.segments()]
+        if frames:
+            table = pd.concat(frames, ignore_index=True)
+            table['wave'] = table['wave'].to_numpy(dtype=np.int64).astype('datetime64[D]')
+            table['risk'] = table['risk'].astype(RISK_DTYPE)
+            # Segments written before weight sets were versioned have no 'model'
+            table['model'] = table['model'].astype(object).where(table['model'].notna(), None) if 'model' in table else None
+        else:
+            table = pd.DataFrame({
+                'name': pd.Series(dtype=object), 'wave': pd.Series(dtype='datetime64[s]'),
+                **{col: pd.Series(dtype=np.float64) for col in INPUTS},
+                'valid': pd.Series(dtype=bool), 'burnout_score': pd.Series(dtype=np.float64),
+                'risk': pd.Series(dtype=RISK_DTYPE), 'model': pd.Series(dtype=object),
+            })
+        table = (table.drop_duplicates(['name', 'wave'], keep='last')
+                 .sort_values(['name', 'wave'], kind='stable')
+                 .reset_index(drop=True))
+
+        # Per-student index: each student's waves are one contiguous slice
+        names = table['name'].to_numpy()
+        starts = np.flatnonzero(np.r_[True, names[1:] != names[:-1]]) if len(names) else np.array([], dtype=np.int64)
+        stops = np.r_[starts[1:], len(names)]
+        self._offsets = dict(zip(names[starts].tolist(), zip(starts.tolist(), stops.tolist())))
+        self._table = table
+
+    @property
+    def table(self):
+        """Latest record of every (student, wave), sorted by student then wave"""
+        if self._table is None:
+            self._load()
+        return self._table
+
+    def append_wave(self, df, wave, model=None):
+        """
+        Add one wave of survey answers, scoring only new or changed rows with
+        model (a ScoringModel, config.WEIGHTS by default); stored rows scored
+        under another weight set count as changed
+        Returns counts of new, changed, unchanged, invalid and actually
+        scored rows and the segment written (None when nothing changed)
+        """
+        model = ScoringModel() if model is None else model
+        if 'name' not in df.columns:
+            raise ValueError("Waves need a 'name' column to follow students over time")
+        if df['name'].duplicated().any():
+            raise ValueError("Each student can appear only once per wave")
+
+        wave = to_wave(wave)
+        df = df[['name'] + INPUTS].astype({'name': str})
+        df, _ = validate_frame(df)
+        df = df.reset_index(drop=True)
+
+        # Compare against what the store already holds for this wave
+        table = self.table
+        waves = table['wave'].to_numpy()
+        stored = table[waves == wave].set_index('name').reindex(df['name'])
+        is_new = stored['valid'].isna().to_numpy()
+        unchanged = ~is_new & self._matches(df, stored) & (stored['model'].to_numpy() == model.version)
+
+        # Each student's latest earlier wave; identical answers scored under
+        # the same weight set keep its score
+        previous = (table[waves < wave].drop_duplicates('name', keep='last')
+                    .set_index('name').reindex(df['name']))
+        carried = (~unchanged & previous['valid'].notna().to_numpy() & self._matches(df, previous)
+                   & (previous['model'].to_numpy() == model.version))
+
+        rows = df[~unchanged].copy()
+        rows.insert(1, 'wave', np.full(len(rows), wave.astype(np.int64), dtype=np.int32))
+        # Only carried rows keep the earlier score; invalid rows have none
+        keep = carried[~unchanged]
+        rows['burnout_score'] = np.where(keep, previous['burnout_score'].to_numpy(dtype=np.float64)[~unchanged], np.nan)
+        rows['risk'] = pd.Categorical(previous['risk'].to_numpy()[~unchanged], dtype=RISK_DTYPE)
+        rows.loc[~keep, 'risk'] = np.nan
+        score = rows['valid'].to_numpy() & ~keep
+        scores, labels = model.score_batch(rows[score])
+        rows.loc[score, 'burnout_score'] = scores
+        rows.loc[score, 'risk'] = labels
+        rows['model'] = model.version
+
+        segment = None
+        if len(rows):
+            existing = self.segments()
+            number = int(os.path.basename(existing[-1])[len(SEGMENT_PREFIX):-len(COHORT_EXTENSION)]) + 1 if existing else 1
+            segment = os.path.join(self.path, f"{SEGMENT_PREFIX}{number:06d}{COHORT_EXTENSION}")
+            # Written under a temporary name first so readers never see half a segment
+            write_cohort(rows, segment + ".tmp")
+            os.replace(segment + ".tmp", segment)
+            self._table = None
+            self._offsets = None
+
+        return {
+            'wave': str(wave),
+            'new': int(is_new.sum()),
+            'changed': int((~is_new & ~unchanged).sum()),
+            'unchanged': int(unchanged.sum()),
+            'invalid': int((~df['valid']).sum()),
+            'scored': int(score.sum()),
+            'segment': segment,
+        }
+
+    @staticmethod
+    def _matches(df, stored):
+        """Rows whose inputs and validity equal the stored record's"""
+        same = df['valid'].to_numpy() == stored['valid'].to_numpy(dtype=bool)
+        for col in INPUTS:
+            same &= _same(df[col], stored[col])
+        return same
+
+    def waves(self):
+        """Distinct waves in the store, oldest first"""
+        return np.unique(self.table['wave'].to_numpy())
+
+    def students(self):
+        """Student names in the store, sorted"""
+        if self._offsets is None:
+            self._load()
+        return list(self._offsets)
+
+    def trajectory(self, name):
+        """One student's waves, oldest first (empty if the student is unknown)"""
+        if self._offsets is None:
+            self._load()
+        start, stop = self._offsets.get(name, (0, 0))
+        return self.table.iloc[start:stop].reset_index(drop=True)
+
+    def snapshot(self, wave):
+        """All students' records for one wave"""
+        table = self.table
+        return table[table['wave'] == to_wave(wave)].reset_index(drop=True)
+
+    def rising(self, threshold=RISING_THRESHOLD, weeks=RISING_WEEKS, end=None):
+        """
+        Students whose score rose by more than threshold between their first
+        and last valid wave inside the weeks-long window ending at end
+        (default: the latest wave), largest rise first
+        """
+        table = self.table
+        columns = ['name', 'from_wave', 'to_wave', 'from_score', 'to_score', 'change']
+        if table.empty:
+            return pd.DataFrame(columns=columns)
+
+        waves = table['wave'].to_numpy()
+        end = waves.max() if end is None else to_wave(end)
+        start = end - np.timedelta64(7 * weeks, 'D')
+        window = table[(waves >= start) & (waves <= end) & table['valid'].to_numpy()]
+
+        # Rows stay sorted by student then wave, so each student's window is contiguous
+        names = window['name'].to_numpy()
+        first = np.flatnonzero(np.r_[True, names[1:] != names[:-1]]) if len(names) else np.array([], dtype=np.int64)
+        last = np.r_[first[1:], len(names)] - 1
+        scores = window['burnout_score'].to_numpy()
+        change = np.round(scores[last] - scores[first], 2)
+
+        result = pd.DataFrame({
+            'name': names[first],
+            'from_wave': window['wave'].to_numpy()[first],
+            'to_wave': window['wave'].to_numpy()[last],
+            'from_score': scores[first],
+            'to_score': scores[last],
+            'change': change,
+        }, columns=columns)
+        result = result[result['change'] > threshold]
+        return result.sort_values('change', ascending=False, kind='stable').reset_index(drop=True)
@@ -1,6 +1,13 @@
+import numpy as np
+import pandas as pd
+
 from config import WEIGHTS
+from core.scoring_engine import weighted_factors, round_like_python, risk_labels, RISK_LABELS
+
+FACTORS = ["Sleep", "Stress", "Screen", "Study", "Attendance"]
 
-def contribution(row):
+def contribution(row, weights=None):
+    weights = WEIGHTS if weights is None else weights
     # Handle both dictionary-style (CSV) and attribute-style (manual) access
     sleep_hours = row['sleep_hours'] if isinstance(row, dict) or 'sleep_hours' in row.index else row.sleep_hours
     stress_level = row['stress_level'] if isinstance(row, dict) or 'stress_level' in row.index else row.stress_level
@@ -9,11 +16,47 @@ def contribution(row):
     attendance = row['attendance'] if isinstance(row, dict) or 'attendance' in row.index else row.attendance
     
     factors = {
-        "Sleep": WEIGHTS["sleep"] * max(0, (7 - sleep_hours) / 7),
-        "Stress": WEIGHTS["stress"] * (stress_level / 5),
-        "Screen": WEIGHTS["screen"] * (screen_time / 10),
-        "Study": WEIGHTS["study"] * (study_hours / 10),
-        "Attendance": WEIGHTS["attendance"] * ((100 - attendance) / 100),
+        "Sleep": weights["sleep"] * max(0, (7 - sleep_hours) / 7),
+        "Stress": weights["stress"] * (stress_level / 5),
+        "Screen": weights["screen"] * (screen_time / 10),
+        "Study": weights["study"] * (study_hours / 10),
+        "Attendance": weights["attendance"] * ((100 - attendance) / 100),
     }
     total = sum(factors.values())
+    if total == 0:
+        return {k: 0.0 for k in factors}
     return {k: round(v / total * 100, 1) for k, v in factors.items()}
+
+def contribution_matrix(data, as_frame=True, weights=None):
+    """
+    Vectorized contribution for a whole cohort
+    Returns an n x 5 matrix of percentage contributions (FACTORS columns),
+    identical to contribution() per row; rows whose factors sum to zero get 0
+    """
+    factors = weighted_factors(data, weights)
+    total = factors[:, 0]
+    for i in range(1, factors.shape[1]):
+        total = total + factors[:, i]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shares = np.where(total[:, None] == 0, 0.0, factors / total[:, None] * 100)
+    shares = round_like_python(shares, 1)
+
+    if not as_frame:
+        return shares
+    index = data.index if hasattr(data, 'index') else None
+    return pd.DataFrame(shares, columns=FACTORS, index=index)
+
+def contribution_by_risk(df, weights=None):
+    """
+    Mean factor contribution per risk band plus the whole cohort
+    Uses the 'risk' column when present, otherwise labels burnout_score
+    """
+    matrix = contribution_matrix(df, weights=weights)
+    risk = df['risk'] if 'risk' in df.columns else pd.Series(risk_labels(df['burnout_score']), index=df.index)
+
+    by_risk = matrix.groupby(np.asarray(risk)).mean()
+    by_risk = by_risk.reindex([label for label in RISK_LABELS if label in by_risk.index])
+    by_risk.loc["All Students"] = matrix.mean()
+    by_risk.insert(0, "Students", [int((np.asarray(risk) == label).sum()) for label in by_risk.index[:-1]] + [len(df)])
+    return by_risk.round(1)
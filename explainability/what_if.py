@@ -1,7 +1,20 @@
-from core.scoring_engine import burnout_score
+from config import WEIGHTS, SAFE_LIMITS
+from core.scoring_engine import burnout_score, burnout_scores, factor_term, finalize_scores, risk_codes, FEATURES
+from core.validation import CLAMP_RANGES
+import numpy as np
 import pandas as pd
 
-def simulate(row, sleep_delta=0, screen_delta=0):
+# Default intervention grid: -3..+3 hours in 0.5 steps
+DEFAULT_GRID = {
+    'sleep_hours': np.arange(-3, 3.5, 0.5),
+    'screen_time': np.arange(-3, 3.5, 0.5),
+    'study_hours': np.arange(-3, 3.5, 0.5),
+}
+
+# Upper bound on score cells held at once when scores are not returned
+GRID_CHUNK_CELLS = 2 ** 24
+
+def simulate(row, sleep_delta=0, screen_delta=0, weights=None):
     """
     Simulate impact of lifestyle changes on burnout score
     """
@@ -14,13 +27,13 @@ def simulate(row, sleep_delta=0, screen_delta=0):
         row_copy = row.copy()
         row_copy.sleep_hours = max(0, min(24, row_copy.sleep_hours + sleep_delta))
         row_copy.screen_time = max(0, min(24, row_copy.screen_time + screen_delta))
-    return burnout_score(row_copy)
+    return burnout_score(row_copy, weights)
 
-def batch_simulate(row):
+def batch_simulate(row, weights=None):
     """
     Run multiple what-if scenarios and return results
     """
-    current_score = burnout_score(row)
+    current_score = burnout_score(row, weights)
     
     scenarios = [
         {"scenario": "Current State", "sleep_delta": 0, "screen_delta": 0},
@@ -34,7 +47,7 @@ def batch_simulate(row):
     
     results = []
     for s in scenarios:
-        new_score = simulate(row, s["sleep_delta"], s["screen_delta"])
+        new_score = simulate(row, s["sleep_delta"], s["screen_delta"], weights)
         results.append({
             "scenario": s["scenario"],
             "new_score": round(new_score, 2),
@@ -42,3 +55,166 @@ def batch_simulate(row):
         })
     
     return pd.DataFrame(results)
+
+def simulate_grid(df, deltas=None, return_scores=False, weights=None):
+    """
+    Evaluate a grid of input deltas against the whole cohort at once
+    deltas maps input columns to 1-D arrays of changes; the score tensor has
+    shape (students, *grid) and matches simulate() cell for cell (inputs are
+    clamped to the validation ranges). Returns a dict with the grid axes,
+    per-cell mean score and the number of students changing risk band
+    """
+    deltas = {col: np.asarray(values, dtype=np.float64) for col, values in (deltas or DEFAULT_GRID).items()}
+    unknown = set(deltas) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown grid columns: {sorted(unknown)}")
+    
+    axes = list(deltas)
+    grid_shape = tuple(len(deltas[col]) for col in axes)
+    grid_cells = int(np.prod(grid_shape))
+    n = len(df)
+    base_codes = risk_codes(burnout_scores(df, weights))
+    # Converted once; compact float32/uint8 columns would otherwise be
+    # copied in full for every chunk
+    inputs = {col: np.asarray(df[col], dtype=np.float64) for col in FEATURES}
+    
+    changed = np.zeros(grid_shape, dtype=np.int64)
+    improved = np.zeros(grid_shape, dtype=np.int64)
+    worsened = np.zeros(grid_shape, dtype=np.int64)
+    score_sum = np.zeros(grid_shape)
+    scores = np.empty((n,) + grid_shape) if return_scores else None
+    
+    chunk = max(1, GRID_CHUNK_CELLS // grid_cells)
+    for start in range(0, n, chunk):
+        stop = min(start + chunk, n)
+        
+        # Broadcast each factor along its own grid axis, summed in FEATURES order
+        raw = 0.0
+        for col in FEATURES:
+            values = inputs[col][start:stop]
+            if col in deltas:
+                low, high = CLAMP_RANGES[col]
+                shape = [stop - start] + [1] * len(axes)
+                shape[1 + axes.index(col)] = len(deltas[col])
+                values = np.clip(values[:, None] + deltas[col][None, :], low, high).reshape(shape)
+            else:
+                values = values.reshape([stop - start] + [1] * len(axes))
+            raw = raw + factor_term(col, values, weights)
+        
+        chunk_scores = finalize_scores(np.broadcast_to(raw, (stop - start,) + grid_shape))
+        codes = risk_codes(chunk_scores)
+        base = base_codes[start:stop].reshape([stop - start] + [1] * len(axes))
+        
+        changed += (codes != base).sum(axis=0)
+        improved += (codes < base).sum(axis=0)
+        worsened += (codes > base).sum(axis=0)
+        score_sum += chunk_scores.sum(axis=0)
+        if return_scores:
+            scores[start:stop] = chunk_scores
+    
+    return {
+        'axes': {col: deltas[col] for col in axes},
+        'scores': scores,
+        'mean_score': score_sum / n if n else np.full(grid_shape, np.nan),
+        'changed': changed,
+        'improved': improved,
+        'worsened': worsened,
+    }
+
+def grid_summary(result):
+    """Flatten a simulate_grid result into one row per grid cell"""
+    axes = result['axes']
+    mesh = np.meshgrid(*axes.values(), indexing='ij')
+    summary = pd.DataFrame({f"{col}_delta": m.ravel() for col, m in zip(axes, mesh)})
+    summary['mean_score'] = result['mean_score'].ravel().round(3)
+    for key in ('changed', 'improved', 'worsened'):
+        summary[key] = result[key].ravel()
+    return summary
+
+def optimal_intervention(df, target=0.6, weights=None):
+    """
+    Smallest total change in hours that brings each student's score below target
+    burnout_score is piecewise linear in the hour inputs, so the optimum is a
+    fractional knapsack over five moves, taken in order of score drop per hour:
+    extra sleep into free time, sleep paired with less screen or study time,
+    and less screen or study time alone. Sleep only helps up to 7 hours,
+    changes stay inside the validation clamp ranges and the 24-hour budget.
+    Students that cannot reach the target get the largest possible drop and
+    feasible=False.
+    """
+    sleep = np.asarray(df['sleep_hours'], dtype=np.float64)
+    screen = np.asarray(df['screen_time'], dtype=np.float64)
+    study = np.asarray(df['study_hours'], dtype=np.float64)
+    weights = WEIGHTS if weights is None else weights
+    current = burnout_scores(df, weights)
+    
+    # Score drop per hour of each input change
+    sleep_rate = weights["sleep"] / 7
+    screen_rate = weights["screen"] / 10
+    study_rate = weights["study"] / 10
+    
+    # Unrounded score must end below target - 0.005 for the rounded score to be below target
+    raw = np.zeros(len(sleep))
+    for col in FEATURES:
+        raw = raw + factor_term(col, df[col], weights)
+    need = np.maximum(raw - (target - 0.005 - 1e-9), 0.0)
+    
+    # Hours each input can still move
+    sleep_room = np.maximum(np.minimum(7, CLAMP_RANGES['sleep_hours'][1]) - sleep, 0.0)
+    screen_room = np.maximum(screen - CLAMP_RANGES['screen_time'][0], 0.0)
+    study_room = np.maximum(study - CLAMP_RANGES['study_hours'][0], 0.0)
+    free_time = np.maximum(SAFE_LIMITS['hours_max'] - (sleep + screen + study), 0.0)
+    
+    # (sleep, screen, study) hours per unit of each move and its score drop per unit
+    moves = [
+        ((1, 0, 0), sleep_rate),
+        ((1, 1, 0), sleep_rate + screen_rate),
+        ((1, 0, 1), sleep_rate + study_rate),
+        ((0, 1, 0), screen_rate),
+        ((0, 0, 1), study_rate),
+    ]
+    moves.sort(key=lambda move: move[1] / sum(move[0]), reverse=True)
+    
+    sleep_up = np.zeros(len(sleep))
+    screen_down = np.zeros(len(sleep))
+    study_down = np.zeros(len(sleep))
+    for (use_sleep, use_screen, use_study), drop in moves:
+        if drop <= 0:
+            continue
+        units = np.full(len(sleep), np.inf)
+        if use_sleep:
+            units = np.minimum(units, sleep_room)
+            if not (use_screen or use_study):
+                # Sleep on its own has to fit into free time
+                units = np.minimum(units, free_time)
+        if use_screen:
+            units = np.minimum(units, screen_room)
+        if use_study:
+            units = np.minimum(units, study_room)
+        units = np.minimum(units, need / drop)
+        
+        sleep_up += units * use_sleep
+        screen_down += units * use_screen
+        study_down += units * use_study
+        sleep_room -= units * use_sleep
+        screen_room -= units * use_screen
+        study_room -= units * use_study
+        free_time += units * (use_screen + use_study - use_sleep)
+        need = np.maximum(need - units * drop, 0.0)
+    
+    new_inputs = {col: np.asarray(df[col], dtype=np.float64) for col in FEATURES}
+    new_inputs['sleep_hours'] = sleep + sleep_up
+    new_inputs['screen_time'] = screen - screen_down
+    new_inputs['study_hours'] = study - study_down
+    new_score = burnout_scores(new_inputs, weights)
+    
+    index = df.index if hasattr(df, 'index') else None
+    return pd.DataFrame({
+        'current_score': current,
+        'sleep_delta': sleep_up.round(2),
+        'screen_delta': -screen_down.round(2),
+        'study_delta': -study_down.round(2),
+        'total_hours_changed': (sleep_up + screen_down + study_down).round(2),
+        'new_score': new_score,
+        'feasible': new_score < target,
+    }, index=index)
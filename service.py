@@ -0,0 +1,317 @@
+"""
+Scoring Service
+Async HTTP API over the core scoring, validation, contribution and what-if
+functions. Concurrent single-student requests are coalesced into
+micro-batches for the vectorized scorer; bulk requests stream NDJSON.
+Scores use the active weight set of models.json, picked up without a restart
+when the file changes.
+
+Run with: uvicorn service:app --port 8000
+"""
+import asyncio
+import itertools
+import json
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+from core.validation import validate_frame, REJECT_REASONS, REASON_OK
+from core.scoring_model import ModelRegistry
+from explainability.contribution import contribution_matrix, FACTORS
+from explainability.what_if import batch_simulate, simulate, optimal_intervention
+
+# Micro-batching: a batch is scored once it holds BATCH_MAX_SIZE requests or
+# the first request has waited BATCH_MAX_WAIT_MS
+BATCH_MAX_SIZE = 256
+BATCH_MAX_WAIT_MS = 2.0
+# Rows scored per NDJSON chunk for bulk requests
+BULK_CHUNK_ROWS = 10_000
+# Upper bounds (ms) of the latency histogram buckets
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf')]
+BATCH_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, float('inf')]
+
+class Student(BaseModel):
+    name: Optional[str] = None
+    sleep_hours: float
+    study_hours: float
+    screen_time: float
+    stress_level: float
+    attendance: float
+
+class WhatIfRequest(BaseModel):
+    student: Student
+    sleep_delta: float = 0.0
+    screen_delta: float = 0.0
+    target: float = 0.6
+
+class Histogram:
+    """Cumulative bucket counts, count and sum, safe to observe from any thread"""
+
+    def __init__(self, buckets):
+        self.buckets = list(buckets)
+        self.counts = np.zeros(len(self.buckets), dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.counts[np.searchsorted(self.buckets, value, side='left')] += 1
+            self.count += 1
+            self.total += value
+
+    def to_dict(self):
+        with self._lock:
+            cumulative = np.cumsum(self.counts)
+            return {
+                'buckets': {("+Inf" if np.isinf(le) else str(le)): int(c) for le, c in zip(self.buckets, cumulative)},
+                'count': self.count,
+                'sum': round(self.total, 3),
+            }
+
+def score_records(records, model=None):
+    """
+    Validate, score and explain a list of student dicts in one vectorized pass
+    (with the registry's active weight set by default)
+    Returns one result dict per record, in order
+    """
+    model = registry.get() if model is None else model
+    df = pd.DataFrame.from_records(records, columns=['name', 'sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance'])
+    df, reasons = validate_frame(df)
+
+    valid = reasons == REASON_OK
+    scored = df[valid]
+    scores, labels = model.score_batch(scored)
+    shares = contribution_matrix(scored, as_frame=False, weights=model.weights)
+
+    results = [{'name': name, 'valid': False, 'reason': REJECT_REASONS[int(reason)]}
+               for name, reason in zip(df['name'], reasons)]
+    for position, score, label, share in zip(np.flatnonzero(valid), scores.tolist(), labels, shares.tolist()):
+        results[position] = {
+            'name': results[position]['name'],
+            'valid': True,
+            'burnout_score': score,
+            'risk': label,
+            'contribution': dict(zip(FACTORS, share)),
+            'model': model.version,
+        }
+    return results
+
+class MicroBatcher:
+    """
+    Queue of pending single-student requests scored together
+    Each submit() waits for its slot in the next batch; the batch runs when
+    it is full or the oldest request has waited max_wait_ms
+    """
+
+    def __init__(self, max_size=BATCH_MAX_SIZE, max_wait_ms=BATCH_MAX_WAIT_MS):
+        self.max_size = max_size
+        self.max_wait = max_wait_ms / 1000
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, record):
+        """(result dict, ScoringModel it was scored with) for one record"""
+        if self._task is None or self._task.done():
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, future))
+        return await future
+
+    @staticmethod
+    def _score(records):
+        model = registry.get()
+        return model, score_records(records, model)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            self.batch_sizes.observe(len(batch))
+            # Scored on a worker thread so the event loop keeps accepting requests
+            try:
+                model, results = await asyncio.to_thread(self._score, [record for record, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result((result, model))
+
+registry = ModelRegistry()
+batcher = MicroBatcher()
+latency = {}
+
+@asynccontextmanager
+async def lifespan(app):
+    batcher.start()
+    yield
+    await batcher.stop()
+
+app = FastAPI(title="STAYWELL Scoring Service", lifespan=lifespan)
+
+@app.middleware("http")
+async def record_latency(request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get('route')
+    path = route.path if route is not None else request.url.path
+    latency.setdefault(path, Histogram(LATENCY_BUCKETS_MS)).observe((time.perf_counter() - start) * 1000)
+    return response
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+@app.post("/score")
+async def score(student: Student):
+    """Score one student; concurrent calls share a vectorized batch"""
+    result, _ = await batcher.submit(student.model_dump())
+    if not result['valid']:
+        raise HTTPException(status_code=422, detail=result['reason'])
+    return result
+
+def _bulk_records(items):
+    """
+    Student dicts from parsed bulk items; a malformed item yields its error
+    message instead. Unnamed students are numbered across the whole request,
+    like CSV uploads
+    """
+    for i, item in enumerate(items):
+        if isinstance(item, Exception):
+            yield {'name': f"Student {i+1}"}, f"Invalid record: {item}"
+            continue
+        try:
+            record = Student.model_validate(item).model_dump()
+        except ValidationError as e:
+            error = e.errors()[0]
+            name = item.get('name') if isinstance(item, dict) and isinstance(item.get('name'), str) else None
+            yield {'name': name or f"Student {i+1}"}, f"Invalid record: {'.'.join(map(str, error['loc'])) or 'student'}: {error['msg']}"
+            continue
+        if record['name'] is None:
+            record['name'] = f"Student {i+1}"
+        yield record, None
+
+def _ndjson_items(body):
+    """Parsed NDJSON lines, one at a time; a line that is not JSON yields its error"""
+    for line in body.splitlines():
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield e
+
+def _ndjson_chunks(items):
+    # Runs in Starlette's threadpool, so parsing and scoring stay off the
+    # event loop; one weight set for the whole request, even if the file
+    # changes mid-stream
+    model = registry.get()
+    records = _bulk_records(items)
+    while True:
+        chunk = list(itertools.islice(records, BULK_CHUNK_ROWS))
+        if not chunk:
+            return
+        valid = [record for record, error in chunk if error is None]
+        scored = iter(score_records(valid, model))
+        results = [next(scored) if error is None else {'name': record['name'], 'valid': False, 'reason': error}
+                   for record, error in chunk]
+        yield "".join(json.dumps(result, ensure_ascii=False) + "\n" for result in results)
+
+@app.post("/score/bulk")
+async def score_bulk(request: Request):
+    """
+    Score many students, streamed back as NDJSON in input order
+    The body is a JSON array of students or NDJSON, one student per line.
+    Malformed students come back as invalid rows with the reason; a body
+    that is not a JSON array (or NDJSON) is rejected with 422
+    """
+    body = await request.body()
+    if request.headers.get('content-type', '').startswith('application/x-ndjson'):
+        items = _ndjson_items(body)
+    else:
+        try:
+            items = await asyncio.to_thread(json.loads, body)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid bulk body: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=422, detail="Invalid bulk body: expected a JSON array of students")
+    return StreamingResponse(_ndjson_chunks(items), media_type="application/x-ndjson")
+
+@app.post("/what-if")
+async def what_if(request: WhatIfRequest):
+    """Scenario table, a custom scenario and the smallest change to reach target"""
+    result, model = await batcher.submit(request.student.model_dump())
+    if not result['valid']:
+        raise HTTPException(status_code=422, detail=result['reason'])
+    # Same weights as current_score even if the weight-set file changed since
+    return await asyncio.to_thread(_what_if, request, result, model.weights)
+
+def _what_if(request, result, weights):
+    # Scenarios start from the same clamped answers the score was computed from
+    df, _ = validate_frame(pd.DataFrame([request.student.model_dump()]))
+    row = df.iloc[0]
+    plan = optimal_intervention(pd.DataFrame([row]), request.target, weights).iloc[0]
+    return {
+        'current_score': result['burnout_score'],
+        'custom_score': simulate(row, request.sleep_delta, request.screen_delta, weights),
+        'scenarios': batch_simulate(row, weights).to_dict('records'),
+        'optimal': {key: (bool(value) if key == 'feasible' else float(value)) for key, value in plan.items()},
+    }
+
+@app.get("/model")
+async def model():
+    """Active weight set, its compiled coefficients and the versions available"""
+    active = registry.get()
+    return {
+        'version': active.version,
+        'weights': active.weights,
+        'coefficients': active.coefficients.tolist(),
+        'intercept': active.intercept,
+        'versions': registry.versions(),
+        'error': registry.error,
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Latency histograms (ms) per route and the micro-batch size histogram"""
+    return {
+        'latency_ms': {path: histogram.to_dict() for path, histogram in latency.items()},
+        'batch_size': batcher.batch_sizes.to_dict(),
+    }
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -9,8 +9,8 @@ def test_imports():
     """Test all imports"""
     print("Testing imports...")
     try:
-        from core.validation import validate_row
-        from core.scoring_engine import burnout_score, risk_label, get_statistical_summary
+        from core.validation import validate_row, validate_frame
+        from core.scoring_engine import burnout_score, risk_label, score_batch, get_statistical_summary
         from core.peer_engine import peer_percentile, cohort_statistics
         from core.statistical_analysis import correlation_analysis, descriptive_statistics
         from explainability.contribution import contribution
@@ -38,8 +38,13 @@ def test_validation(df):
     """Test validation"""
     print("\nTesting validation...")
     try:
-        from core.validation import validate_row
-        df_validated = df.apply(validate_row, axis=1)
+        from core.validation import validate_row, validate_frame
+        df_validated, reasons = validate_frame(df)
+        
+        # Batch validation must match the per-row reference
+        df_reference = df.apply(validate_row, axis=1)
+        assert df_validated.equals(df_reference[df_validated.columns])
+        assert ((reasons == 0) == df_validated['valid']).all()
         print("✅ Validation successful")
         return True, df_validated
     except Exception as e:
@@ -50,9 +55,12 @@ def test_scoring(df):
     """Test scoring"""
     print("\nTesting scoring...")
     try:
-        from core.scoring_engine import burnout_score, risk_label
-        df["burnout_score"] = df.apply(burnout_score, axis=1)
-        df["risk"] = df["burnout_score"].apply(risk_label)
+        from core.scoring_engine import burnout_score, risk_label, score_batch
+        df["burnout_score"], df["risk"] = score_batch(df)
+        
+        # Batch scoring must match the per-row reference exactly
+        assert (df["burnout_score"] == df.apply(burnout_score, axis=1)).all()
+        assert (df["risk"] == df["burnout_score"].apply(risk_label)).all()
         print(f"✅ Scoring successful - Mean score: {df['burnout_score'].mean():.3f}")
         return True, df
     except Exception as e:
@@ -70,6 +78,51 @@ def test_statistics(df):
         desc = descriptive_statistics(df)
         cohort = cohort_statistics(df)
         
+        # Sorted index must agree with the O(n) percentile scan
+        from core.peer_engine import PeerIndex, peer_percentile
+        index = PeerIndex(df['burnout_score'])
+        expected = [peer_percentile(df['burnout_score'], v) for v in df['burnout_score']]
+        assert list(index.percentiles()) == expected
+        assert list(index.top_k(3)) == list(df['burnout_score'].nlargest(3).index)
+        
+        # Fused single-pass profile must match every per-consumer function
+        import numpy as np
+        from core.statistical_analysis import statistics_profile, distribution_analysis
+        profile = statistics_profile(df)
+        assert profile['descriptive'].equals(desc)
+        assert profile['cohort'] == cohort
+        for var in ['sleep_hours', 'stress_level', 'burnout_score']:
+            assert profile['distribution'][var] == distribution_analysis(df, var)
+            counts, edges = np.histogram(df[var], bins=15)
+            assert np.array_equal(profile['histograms'][var][0], counts)
+            assert profile['medians'][var] == df[var].median()
+        
+        # Missing values drop out per column (and per pair), as in pandas
+        gappy = df[['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance', 'burnout_score']].astype(float)
+        for i, col in enumerate(gappy.columns):
+            gappy.iloc[i:i + 2, i] = np.nan
+        expected = gappy.describe().T
+        expected['variance'] = gappy.var()
+        gappy_desc = descriptive_statistics(gappy)
+        assert (gappy_desc['count'] == gappy.count()).all()
+        for col in ['mean', 'std', 'variance', 'min', 'max']:
+            assert np.allclose(gappy_desc[col], expected[col].round(2))
+        assert np.allclose(correlation_analysis(gappy), gappy.corr())
+        gappy_profile = statistics_profile(gappy)
+        assert gappy_profile['descriptive'].equals(gappy_desc)
+        assert gappy_profile['correlation'].equals(correlation_analysis(gappy))
+        assert gappy_profile['cohort'] == cohort_statistics(gappy)
+        
+        # Batch outlier bitmask agrees with the per-variable IQR counts
+        from core.statistical_analysis import distribution_summary, outlier_flags, OUTLIER_VARIABLES
+        summary = distribution_summary(df)
+        bits = outlier_flags(df).to_numpy()
+        for i, var in enumerate(OUTLIER_VARIABLES):
+            assert summary[var] == distribution_analysis(df, var)
+            assert (bits >> i & 1).sum() == summary[var]['Outliers']
+        for method in ['mad', 'zscore']:
+            assert len(outlier_flags(df, method=method)) == len(df)
+        
         print(f"✅ Statistics successful")
         print(f"   - Correlation matrix: {corr.shape}")
         print(f"   - Descriptive stats: {desc.shape}")
@@ -79,6 +132,195 @@ def test_statistics(df):
         print(f"❌ Statistics error: {e}")
         return False
 
+def test_pipeline():
+    """Test the cached app pipeline steps"""
+    print("\nTesting processing pipeline...")
+    try:
+        from core.pipeline import content_key, load_cohort, process_cohort, cohort_summary
+        
+        with open("data/test_invalid.csv", "rb") as f:
+            data = f.read()
+        assert content_key(data) == content_key(data)
+        assert content_key(data) != content_key(data, {"sleep": 1.0})
+        
+        cohort = process_cohort(load_cohort(data))
+        summary = cohort_summary(cohort['df'])
+        assert len(cohort['df']) + cohort['invalid_count'] + cohort['missing_count'] == 4
+        
+        # Compact schema keeps every statistic and count unchanged
+        from core.schema import apply_schema, value_counts, widen
+        df = cohort['df']
+        assert str(df['stress_level'].dtype) == 'uint8' and str(df['risk'].dtype) == 'category'
+        plain = widen(df)
+        plain['risk'] = plain['risk'].astype(str)
+        assert value_counts(df['risk']).equals(plain['risk'].value_counts())
+        assert summary['descriptive'].equals(cohort_summary(plain)['descriptive'])
+        assert cohort['memory'].loc['Total', 'after'] > 0
+        
+        print(f"✅ Pipeline successful")
+        print(f"   - Valid rows: {len(cohort['df'])}, removed: {cohort['invalid_count']}")
+        print(f"   - Summary keys: {list(summary.keys())}")
+        print(f"   - Memory per student: {cohort['memory'].loc['Total', 'before']:.0f} -> {cohort['memory'].loc['Total', 'after']:.0f} bytes")
+        return True
+    except Exception as e:
+        print(f"❌ Pipeline error: {e!r}")
+        return False
+
+def test_figure_cache():
+    """Test figure cache keys and LRU eviction"""
+    print("\nTesting figure cache...")
+    try:
+        import pandas as pd
+        from ui.dashboard import FigureCache, data_key
+        
+        # Keys cover values, labels and names
+        counts = pd.Series([5, 3, 2], index=['Low', 'Moderate', 'Elevated'], name='risk')
+        assert data_key('risk_pie', counts) == data_key('risk_pie', counts.copy())
+        assert data_key('risk_pie', counts) != data_key('risk_pie', pd.Series([5, 3, 2], index=['Elevated', 'Low', 'Moderate'], name='risk'))
+        assert data_key('risk_pie', counts) != data_key('risk_pie', counts.rename('other'))
+        assert data_key('risk_pie', counts) != data_key('risk_bar', counts)
+        
+        cache = FigureCache(max_entries=2)
+        assert cache.get('a') is None and cache.misses == 1
+        cache.put('a', b'A')
+        cache.put('b', b'B')
+        assert cache.get('a') == b'A' and cache.hits == 1
+        # 'b' is now the least recently used entry and goes first
+        cache.put('c', b'C')
+        assert list(cache.entries) == ['a', 'c'] and cache.get('b') is None
+        cache.put('a', b'A2')
+        assert cache.get('a') == b'A2' and len(cache.entries) == 2
+        assert (cache.hits, cache.misses) == (2, 2)
+        
+        print(f"✅ Figure cache successful")
+        return True
+    except Exception as e:
+        print(f"❌ Figure cache error: {e!r}")
+        return False
+
+def test_streaming(df):
+    """Test chunked accumulators against the in-memory statistics"""
+    print("\nTesting streaming accumulators...")
+    try:
+        from core.peer_engine import cohort_statistics
+        from core.streaming import CohortAccumulator
+        
+        acc = CohortAccumulator(top_n=5)
+        for start in range(0, len(df), 7):
+            acc.update(df.iloc[start:start + 7])
+        
+        # Chunked sums can differ in the last bit, so allow one display unit
+        expected = cohort_statistics(df)
+        for key, value in acc.cohort_statistics().items():
+            assert abs(value - expected[key]) <= 0.001 + 1e-9, key
+        top = [r['name'] for r in acc.top.records()]
+        assert top == df.nlargest(5, 'burnout_score')['name'].tolist()
+        for var in ['sleep_hours', 'stress_level', 'attendance']:
+            assert acc.quantile(var, 0.75) == df[var].quantile(0.75), var
+        
+        # Sharded files scored in worker processes merge to the same report
+        import os
+        import tempfile
+        from concurrent.futures import ProcessPoolExecutor
+        from analysis_script import _score_shard
+        with tempfile.TemporaryDirectory() as tmp:
+            shards = []
+            for i, start in enumerate(range(0, len(df), 8)):
+                path = os.path.join(tmp, f"shard{i}.csv")
+                df.iloc[start:start + 8].to_csv(path, index=False)
+                shards.append((path, 5))
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                partials = list(pool.map(_score_shard, shards))
+        sharded = CohortAccumulator(top_n=5)
+        for partial, _, _ in partials:
+            sharded.merge(partial)
+        assert sharded.cohort_statistics() == acc.cohort_statistics()
+        assert [r['name'] for r in sharded.top.records()] == top
+        
+        # Removing students matches recomputing the moments without them
+        import numpy as np
+        from core.statistical_analysis import correlation_analysis
+        from core.streaming import RunningMoments
+        moments = RunningMoments().update(df).remove(df.iloc[:5])
+        assert moments.n == len(df) - 5
+        assert np.allclose(correlation_analysis(moments), correlation_analysis(df.iloc[5:]))
+        assert np.allclose(moments.variance(), RunningMoments().update(df.iloc[5:]).variance())
+        
+        # Quantile sketch: merged halves, JSON round trip, exact at this size
+        import json
+        from core.peer_engine import peer_percentile
+        from core.sketch import QuantileSketch
+        half = len(df) // 2
+        sketch = QuantileSketch().update(df['burnout_score'][:half])
+        sketch.merge(QuantileSketch().update(df['burnout_score'][half:]))
+        sketch = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+        for key, value in cohort_statistics(sketch).items():
+            assert abs(value - expected[key]) <= 0.001 + 1e-9, key
+        value = df['burnout_score'].iloc[0]
+        assert peer_percentile(sketch, value) == peer_percentile(df['burnout_score'], value)
+        
+        # An empty sketch answers like an empty cohort instead of failing
+        assert QuantileSketch().quantile([0.25, 0.5]).shape == (2,) and np.isnan(QuantileSketch().quantile(0.5))
+        empty = cohort_statistics(QuantileSketch())
+        assert empty.keys() == expected.keys() and all(np.isnan(value) for value in empty.values())
+        state = json.dumps(QuantileSketch().to_dict(), allow_nan=False)
+        restored = QuantileSketch.from_dict(json.loads(state)).update(df['burnout_score'])
+        assert (restored.min, restored.max) == (df['burnout_score'].min(), df['burnout_score'].max())
+        
+        print(f"✅ Streaming successful")
+        print(f"   - Chunks merged: {acc.rows} rows, shards merged: {len(partials)}")
+        return True
+    except Exception as e:
+        print(f"❌ Streaming error: {e!r}")
+        return False
+
+def test_cohort_store(df):
+    """Test the binary cohort store round trip"""
+    print("\nTesting cohort store...")
+    try:
+        import os
+        import tempfile
+        import numpy as np
+        from core.cohort_store import encode_cohort, read_cohort, write_cohort
+        from core.pipeline import load_cohort, process_cohort
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cohort.cohort")
+            write_cohort(df, path)
+            loaded = read_cohort(path)
+            assert str(loaded['sleep_hours'].dtype) == 'float32'
+            assert str(loaded['stress_level'].dtype) == 'uint8'
+            assert not loaded['attendance'].to_numpy().flags.owndata
+            assert loaded['burnout_score'].tolist() == df['burnout_score'].tolist()
+            assert loaded['risk'].astype(str).tolist() == df['risk'].tolist()
+            assert loaded['name'].tolist() == df['name'].tolist()
+            size = os.path.getsize(path)
+            del loaded
+        
+        # Same scores whether the cohort arrives as CSV or .cohort bytes
+        raw = df[['name', 'sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance']]
+        from_csv = process_cohort(load_cohort(raw.to_csv(index=False).encode()))['df']
+        from_store = process_cohort(load_cohort(encode_cohort(raw)))['df']
+        assert np.array_equal(from_csv['burnout_score'], from_store['burnout_score'])
+        
+        # Inputs with more decimals than float32 restores are kept as float64
+        from core.cohort_store import decode_cohort, widen_float32
+        precise = raw.astype({'sleep_hours': float, 'stress_level': float}).copy()
+        precise.loc[precise.index[0], 'sleep_hours'] = 6.123456
+        precise.loc[precise.index[1], 'stress_level'] = 2.345678
+        restored = decode_cohort(encode_cohort(precise))
+        assert str(restored['sleep_hours'].dtype) == 'float64' and str(restored['study_hours'].dtype) == 'float32'
+        restored = widen_float32(restored)
+        for col in ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance']:
+            assert np.array_equal(restored[col].to_numpy(dtype=float), precise[col].to_numpy(dtype=float), equal_nan=True)
+        
+        print(f"✅ Cohort store successful")
+        print(f"   - File size: {size} bytes for {len(df)} students")
+        return True
+    except Exception as e:
+        print(f"❌ Cohort store error: {e!r}")
+        return False
+
 def test_explainability(df):
     """Test explainability features"""
     print("\nTesting explainability...")
@@ -88,17 +330,498 @@ def test_explainability(df):
         
         row = df.iloc[0]
         contrib = contribution(row)
+        
+        # Cohort matrix must match the per-row contribution
+        from explainability.contribution import contribution_matrix, contribution_by_risk
+        matrix = contribution_matrix(df)
+        assert all(matrix.loc[i].to_dict() == contribution(r) for i, r in df.iterrows())
+        drivers = contribution_by_risk(df)
         sim_score = simulate(row, sleep_delta=1)
         batch = batch_simulate(row)
         
+        # Grid engine must agree with simulate() for the same deltas
+        from explainability.what_if import simulate_grid
+        grid = simulate_grid(df, {'sleep_hours': [0, 1, 2], 'screen_time': [0, -1, -2]}, return_scores=True)
+        assert grid['scores'][0, 1, 1] == simulate(row, sleep_delta=1, screen_delta=-1)
+        assert grid['scores'][0, 0, 0] == row['burnout_score']
+        
+        # Optimal plans must land below target wherever they claim feasibility
+        from explainability.what_if import optimal_intervention
+        plans = optimal_intervention(df, target=0.3)
+        assert (plans.loc[plans['feasible'], 'new_score'] < 0.3).all()
+        assert (plans.loc[df['burnout_score'] < 0.3, 'total_hours_changed'] == 0).all()
+        
         print(f"✅ Explainability successful")
         print(f"   - Top contributor: {max(contrib, key=contrib.get)}")
+        print(f"   - Cohort driver: {drivers.drop(columns='Students').loc['All Students'].idxmax()}")
         print(f"   - Simulation scenarios: {len(batch)}")
+        print(f"   - Grid cells: {grid['changed'].size}, max improved: {grid['improved'].max()}")
+        print(f"   - Optimal plans reaching < 0.30: {plans['feasible'].sum()}/{len(plans)}")
         return True
     except Exception as e:
         print(f"❌ Explainability error: {e}")
         return False
 
+def test_service(df):
+    """Test the scoring service through a local test client"""
+    print("\nTesting scoring service...")
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError:
+        print("⚠️  Skipped: fastapi/httpx not installed")
+        return True
+    try:
+        import json
+        import service
+        
+        df = df[df['valid']]
+        records = df[['name', 'sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance']].to_dict('records')
+        with TestClient(service.app) as client:
+            response = client.post("/score", json=records[0])
+            assert response.status_code == 200
+            assert response.json()['burnout_score'] == df['burnout_score'].iloc[0]
+            
+            over = dict(records[0], study_hours=20)
+            assert client.post("/score", json=over).status_code == 422
+            
+            response = client.post("/score/bulk", json=records)
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            assert [line['burnout_score'] for line in lines] == df['burnout_score'].tolist()
+            
+            response = client.post("/what-if", json={"student": records[0], "sleep_delta": 1})
+            assert response.status_code == 200 and len(response.json()['scenarios']) == 7
+            
+            # Out-of-range answers are clamped before scoring and before the scenarios
+            clamped = dict(records[0], sleep_hours=-3, stress_level=9, attendance=130)
+            body = client.post("/what-if", json={"student": clamped}).json()
+            assert body['current_score'] == body['custom_score'] == body['scenarios'][0]['new_score']
+            assert body['scenarios'][0]['change'] == 0
+            
+            # Malformed bulk rows come back as invalid lines, in order
+            bad = "\n".join([json.dumps(records[0]), "{not json", json.dumps({"name": "X"})])
+            response = client.post("/score/bulk", content=bad, headers={"content-type": "application/x-ndjson"})
+            rows = [json.loads(line) for line in response.text.splitlines()]
+            assert [row['valid'] for row in rows] == [True, False, False] and rows[2]['name'] == "X"
+            assert client.post("/score/bulk", json={"not": "a list"}).status_code == 422
+            
+            metrics = client.get("/metrics").json()
+            assert metrics['latency_ms']['/score']['count'] == 2
+        
+        # Scoring and what-if work run on worker threads, off the event loop,
+        # and what-if keeps the weights of its score when the file changes
+        import asyncio
+        import os
+        import tempfile
+        from core.scoring_model import ModelRegistry
+        on_loop = []
+        def record_thread(func):
+            def wrapper(*args, **kwargs):
+                try:
+                    asyncio.get_running_loop()
+                    on_loop.append(func.__name__)
+                except RuntimeError:
+                    pass
+                return func(*args, **kwargs)
+            return wrapper
+        
+        weights = {"sleep": 0.1, "stress": 0.6, "screen": 0.1, "study": 0.1, "attendance": 0.1}
+        registry, score_batch, intervention = service.registry, service.MicroBatcher._score, service.optimal_intervention
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "models.json")
+            with open(path, "w") as f:
+                json.dump({"active": "temporary", "versions": {"temporary": weights}}, f)
+            def score_then_swap(records):
+                result = score_batch(records)
+                # The version used for this batch disappears before the lookup
+                with open(path, "w") as f:
+                    json.dump({"versions": {"other": dict(weights, stress=0.2, sleep=0.5)}}, f)
+                return result
+            try:
+                service.registry = ModelRegistry(path)
+                service.MicroBatcher._score = staticmethod(record_thread(score_then_swap))
+                service.optimal_intervention = record_thread(intervention)
+                with TestClient(service.app) as client:
+                    body = client.post("/what-if", json={"student": records[0]}).json()
+            finally:
+                service.registry, service.MicroBatcher._score = registry, staticmethod(score_batch)
+                service.optimal_intervention = intervention
+        assert body['current_score'] == body['scenarios'][0]['new_score'] and not on_loop
+        
+        print(f"✅ Service successful")
+        print(f"   - Bulk NDJSON lines: {len(lines)}")
+        return True
+    except Exception as e:
+        print(f"❌ Service error: {e!r}")
+        return False
+
+def test_scores_only():
+    """Test the pandas-free --scores-only CLI path"""
+    print("\nTesting scores-only CLI path...")
+    try:
+        import os
+        import shutil
+        import subprocess
+        import tempfile
+        
+        # Importing the CLI and the scoring path must not load pandas
+        check = "import sys, analysis_script; assert 'pandas' not in sys.modules"
+        subprocess.run([sys.executable, "-c", check], check=True)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            # Missing-value markers are read as missing by both paths
+            with open("data/sample_students.csv") as f:
+                lines = f.read().splitlines()
+            header = lines[0].split(",")
+            row = lines[1].split(",")
+            row[header.index("stress_level")] = "NA"
+            with open(os.path.join(tmp, "markers.csv"), "w") as f:
+                f.write("\n".join([lines[0], ",".join(row)] + lines[2:4]) + "\n")
+            
+            for source in ["data/sample_students.csv", "data/test_invalid.csv", os.path.join(tmp, "markers.csv")]:
+                path = os.path.join(tmp, os.path.basename(source))
+                if source != path:
+                    shutil.copy(source, path)
+                results = path.replace(".csv", "_results.csv")
+                
+                subprocess.run([sys.executable, "analysis_script.py", path], check=True, stdout=subprocess.DEVNULL)
+                with open(results, "rb") as f:
+                    full = f.read()
+                subprocess.run([sys.executable, "analysis_script.py", path, "--scores-only"], check=True, stdout=subprocess.DEVNULL)
+                with open(results, "rb") as f:
+                    assert f.read() == full
+        
+        print(f"✅ Scores-only path successful")
+        print(f"   - Results files identical to the full report's")
+        return True
+    except Exception as e:
+        print(f"❌ Scores-only path error: {e!r}")
+        return False
+
+def test_profiling(df):
+    """Test per-stage profiling and the Chrome trace"""
+    print("\nTesting profiling...")
+    try:
+        import json
+        from core.profiling import Profiler, stage, profiled
+        from core.pipeline import process_cohort
+        
+        # Without a running profiler stages record nothing
+        with stage("ignored"):
+            pass
+        
+        @profiled(rows=lambda data: len(data))
+        def summarize(data):
+            return data['burnout_score'].mean()
+        
+        with Profiler() as profiler:
+            with stage("outer", len(df)):
+                process_cohort(df[['name', 'sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance']])
+                summarize(df)
+        
+        trace = json.loads(json.dumps(profiler.trace()))
+        events = {event['name']: event for event in trace['traceEvents']}
+        assert set(events) == {'outer', 'validate', 'score', 'schema', 'summarize'}
+        assert all(event['ph'] == 'X' and event['args']['rows'] > 0 for event in events.values())
+        
+        # Inner stages nest inside the outer one and its peak covers theirs
+        outer = events['outer']
+        for name in ('validate', 'score', 'schema', 'summarize'):
+            inner = events[name]
+            assert outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+            assert inner['args']['peak_bytes'] <= outer['args']['peak_bytes']
+        
+        # One profiler per process traces memory; a concurrent one (another
+        # app session) times stages only and cannot end the first one's tracing
+        import contextvars
+        import tracemalloc
+        first, second = Profiler(), Profiler()
+        contextvars.copy_context().run(first.start)
+        contextvars.copy_context().run(second.start)
+        assert first.memory and not second.memory
+        second.stop()
+        assert tracemalloc.is_tracing()
+        with stage("untracked"):
+            pass
+        assert not first.events and not second.events
+        first.stop()
+        assert not tracemalloc.is_tracing()
+        with Profiler() as third:
+            with stage("after"):
+                pass
+        assert third.memory and 'peak_bytes' in third.events[0]['args']
+        
+        print(f"✅ Profiling successful")
+        print(f"   - Stages: {', '.join(entry['stage'] for entry in profiler.summary())}")
+        return True
+    except Exception as e:
+        print(f"❌ Profiling error: {e!r}")
+        return False
+
+def test_wave_store(df):
+    """Test the longitudinal wave store"""
+    print("\nTesting wave store...")
+    try:
+        import tempfile
+        import numpy as np
+        import pandas as pd
+        from core.wave_store import WaveStore
+        from core.scoring_engine import score_batch
+        
+        inputs = ['name', 'sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance']
+        week1 = df[df['valid']][inputs].reset_index(drop=True)
+        week2 = week1.copy()
+        week2.loc[:2, 'sleep_hours'] = 3.0
+        week2.loc[:2, 'stress_level'] = 5
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            store = WaveStore(tmp)
+            first = store.append_wave(week1, "2026-03-02")
+            assert first['new'] == first['scored'] == len(week1)
+            
+            # Only the edited students are scored again; the rest carry their score forward
+            second = store.append_wave(week2, "2026-03-09")
+            assert second['new'] == len(week2) and second['scored'] == 3
+            
+            # Re-sending a wave that is already stored writes nothing
+            assert store.append_wave(week2, "2026-03-09")['segment'] is None
+            
+            # A reopened store reads the same history back from disk
+            store = WaveStore(tmp)
+            snapshot = store.snapshot("2026-03-09").set_index('name').loc[week2['name']]
+            scores, labels = score_batch(week2)
+            assert (snapshot['burnout_score'].to_numpy() == scores).all()
+            assert (snapshot['risk'].astype(str).to_numpy() == labels).all()
+            
+            trajectory = store.trajectory(week2['name'].iloc[0])
+            assert len(trajectory) == 2 and trajectory['wave'].is_monotonic_increasing
+            
+            rising = store.rising(threshold=0.2, weeks=4)
+            change = scores[:3] - store.snapshot("2026-03-02").set_index('name').loc[week2['name'][:3], 'burnout_score'].to_numpy()
+            assert set(rising['name']) == set(week2['name'][:3][change.round(2) > 0.2])
+        
+        # Reads on the instance that appended see every new segment
+        with tempfile.TemporaryDirectory() as tmp:
+            store = WaveStore(tmp)
+            b, a = week1.iloc[[0]].assign(name='B'), week1.iloc[[1]].assign(name='A')
+            store.append_wave(b, "2026-03-02")
+            assert store.students() == ['B'] and len(store.trajectory('B')) == 1
+            store.append_wave(a, "2026-03-02")
+            assert store.students() == ['A', 'B']
+            assert (store.trajectory('B')['name'] == 'B').all() and len(store.trajectory('B')) == 1
+            assert (store.trajectory('A')['name'] == 'A').all() and len(store.trajectory('A')) == 1
+            
+            # A student invalid in a later wave has no score there, not the old one
+            store.append_wave(b.assign(sleep_hours=20.0, study_hours=10.0), "2026-03-09")
+            latest = store.trajectory('B').iloc[-1]
+            assert not latest['valid'] and np.isnan(latest['burnout_score']) and pd.isna(latest['risk'])
+            
+            # After a weight swap nothing is carried over from the old weight set
+            from core.scoring_model import ScoringModel
+            swapped = ScoringModel({"sleep": 0.1, "stress": 0.6, "screen": 0.1, "study": 0.1, "attendance": 0.1}, "swapped")
+            counts = store.append_wave(a, "2026-03-09", swapped)
+            assert counts['scored'] == 1
+            assert store.append_wave(a, "2026-03-02", swapped)['changed'] == 1
+            assert store.append_wave(a, "2026-03-02", swapped)['segment'] is None
+            history = store.trajectory('A')
+            assert history['model'].tolist() == ["swapped", "swapped"]
+            assert (history['burnout_score'] == swapped.scores(a)[0]).all()
+        
+        print(f"✅ Wave store successful")
+        print(f"   - Rising students: {len(rising)}")
+        return True
+    except Exception as e:
+        print(f"❌ Wave store error: {e!r}")
+        return False
+
+def test_trend_engine(df):
+    """Test rolling trend signals and CUSUM alerts"""
+    print("\nTesting trend engine...")
+    try:
+        import numpy as np
+        from core.trend_engine import TrendState, CUSUM_BASELINE
+        
+        # Eight weekly waves: everyone is stable except two students whose score climbs
+        scored = df[df['valid']]
+        names = scored['name'].tolist()
+        matrix = np.repeat(scored['burnout_score'].to_numpy()[:, None], 8, axis=1)
+        matrix[:2] = np.minimum(matrix[:2] + 0.05 * np.arange(8), 1.0)
+        matrix[2, 3] = np.nan
+        
+        state = TrendState.from_matrix(names, range(8), matrix)
+        flagged = state.deteriorating()
+        assert set(flagged.index) == set(names[:2])
+        
+        # Folding the last wave in incrementally gives the same signals
+        partial = TrendState.from_matrix(names, range(7), matrix[:, :7])
+        partial.update(pd.Series(matrix[:, 7], index=names), 7)
+        assert partial.signals().equals(state.signals())
+        
+        # Reference values for the first student, computed directly
+        scores = matrix[0]
+        ewma = scores[0]
+        for value in scores[1:]:
+            ewma = 0.3 * value + 0.7 * ewma
+        baseline = scores[:CUSUM_BASELINE].mean()
+        cusum = 0.0
+        for value in scores[CUSUM_BASELINE:]:
+            cusum = max(0.0, cusum + value - baseline - state.k)
+        signals = state.signals().iloc[0]
+        assert np.isclose(signals['ewma'], ewma) and np.isclose(signals['cusum'], cusum)
+        assert np.isclose(signals['slope'], np.polyfit(range(4), scores[-4:], 1)[0])
+        assert np.isclose(signals['rolling_mean'], scores[-4:].mean())
+        
+        # Invalid waves in a store table count as missing, like NaN in the matrix
+        table = pd.DataFrame({
+            'name': np.repeat(names, 8), 'wave': np.tile(np.arange(8), len(names)),
+            'valid': True, 'burnout_score': matrix.ravel(),
+        })
+        invalid = (table['name'] == names[3]) & (table['wave'] == 5)
+        table.loc[invalid, 'valid'] = False
+        table.loc[invalid, 'burnout_score'] = 1.0
+        masked = matrix.copy()
+        masked[3, 5] = np.nan
+        assert TrendState.from_table(table).signals().equals(TrendState.from_matrix(names, range(8), masked).signals())
+        
+        print(f"✅ Trend engine successful")
+        print(f"   - Flagged: {', '.join(flagged.index)}")
+        return True
+    except Exception as e:
+        print(f"❌ Trend engine error: {e!r}")
+        return False
+
+def test_scoring_model(df):
+    """Test compiled weight sets, re-scoring and hot reload"""
+    print("\nTesting scoring model...")
+    try:
+        import json
+        import os
+        import tempfile
+        import time
+        from core.scoring_engine import burnout_score
+        from core.scoring_model import ScoringModel, ModelRegistry
+        from core.pipeline import content_key, load_cohort, process_cohort, rescore_cohort
+        
+        # The default model reproduces burnout_score exactly
+        scored = df[df['valid']]
+        model = ScoringModel()
+        assert model.scores(scored).tolist() == scored['burnout_score'].tolist()
+        
+        # Any weight set matches the per-row reference with those weights
+        weights = {"sleep": 0.25, "stress": 0.3, "screen": 0.15, "study": 0.15, "attendance": 0.15}
+        experiment = ScoringModel(weights, "experiment")
+        assert experiment.scores(scored).tolist() == [burnout_score(row, weights) for _, row in scored.iterrows()]
+        
+        # Re-scoring a cached cohort equals running the pipeline with the new weights
+        with open("data/sample_students.csv", "rb") as f:
+            data = f.read()
+        cohort = process_cohort(load_cohort(data))
+        assert rescore_cohort(cohort, experiment)['df'].equals(process_cohort(load_cohort(data), experiment)['df'])
+        assert content_key(data, experiment.weights) != content_key(data)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "models.json")
+            registry = ModelRegistry(path)
+            assert registry.versions() == ["baseline"]
+            
+            # Edits to the file are picked up on the next lookup
+            with open(path, "w") as f:
+                json.dump({"active": "baseline", "versions": {"baseline": model.weights, "experiment": weights}}, f)
+            assert registry.versions() == ["baseline", "experiment"]
+            registry.activate("experiment")
+            assert registry.get().weights == weights
+            assert ModelRegistry(path).active_version == "experiment"
+            
+            # A broken file keeps the last good weight sets
+            time.sleep(0.01)
+            with open(path, "w") as f:
+                f.write('{"versions": {"bad": {"sleep": -1}}}')
+            assert registry.get().version == "experiment" and registry.error
+        
+        print(f"✅ Scoring model successful")
+        print(f"   - Coefficients: {model.coefficients.round(4).tolist()}, intercept {model.intercept:.2f}")
+        return True
+    except Exception as e:
+        print(f"❌ Scoring model error: {e!r}")
+        return False
+
+def test_sensitivity(df):
+    """Test scoring a cohort under many weight sets at once"""
+    print("\nTesting weight sensitivity...")
+    try:
+        import numpy as np
+        from core.scoring_engine import burnout_scores, risk_codes
+        from core.scoring_model import ScoringModel, WEIGHT_KEYS
+        from core.sensitivity import weight_sensitivity, sample_weights, sensitivity_summary
+        
+        scored = df[df['valid']]
+        weights = sample_weights(40, seed=1)
+        assert weights.shape == (40, 5) and np.allclose(weights.sum(axis=1), 1.0)
+        
+        # Small chunks exercise the chunk loop; results match scoring each set separately
+        result = weight_sensitivity(scored, weights, chunk_cells=200)
+        students = result['students']
+        codes = np.column_stack([risk_codes(burnout_scores(scored, dict(zip(WEIGHT_KEYS, w)))) for w in weights])
+        base = risk_codes(scored['burnout_score'])
+        assert np.array_equal(students['label_agreement'].to_numpy(), (codes == base[:, None]).mean(axis=1))
+        assert np.array_equal(result['band_shares'].to_numpy(),
+                              np.stack([(codes == band).mean(axis=0) for band in range(3)], axis=1))
+        
+        # Repeating the model's own weights changes nothing
+        model = ScoringModel(dict(zip(WEIGHT_KEYS, weights[0])))
+        same = weight_sensitivity(scored, [model.weights] * 3, model=model, chunk_cells=200)['students']
+        assert (same['label_agreement'] == 1).all() and (same['decile_agreement'] == 1).all()
+        assert np.allclose(same['rank_std'], 0) and np.allclose(same['rank_mean'], same['percentile'])
+        
+        summary = sensitivity_summary(result)
+        print(f"✅ Weight sensitivity successful")
+        print(f"   - Stable labels: {summary['stable_share']:.0%} of students over {summary['sets']} weight sets")
+        return True
+    except Exception as e:
+        print(f"❌ Weight sensitivity error: {e!r}")
+        return False
+
+def test_bootstrap(df):
+    """Test bootstrap confidence intervals from index-matrix resampling"""
+    print("\nTesting bootstrap intervals...")
+    try:
+        import numpy as np
+        import pandas as pd
+        from core.bootstrap import bootstrap_statistics, _prepare, _chunk_statistics, QUANTILES, FACTORS
+        from core.peer_engine import cohort_statistics
+        
+        scored = df[df['valid']]
+        scores = scored['burnout_score'].to_numpy()
+        factors = scored[FACTORS].to_numpy(dtype=np.float64)
+        
+        # One chunk matches resampling the students one resample at a time
+        seed = np.random.SeedSequence(3)
+        samples = _chunk_statistics(_prepare(scores, factors, QUANTILES), seed, 20)
+        order = np.argsort(scores, kind='stable')
+        for row, index in zip(samples, np.random.default_rng(seed).integers(0, len(scores), size=(20, len(scores)))):
+            y, x = scores[order][index], factors[order][index]
+            expected = [y.mean(), y.std(ddof=1)] + [pd.Series(y).quantile(q) for q in QUANTILES.values()]
+            expected += [np.corrcoef(x[:, j], y)[0, 1] for j in range(len(FACTORS))]
+            assert np.allclose(row, expected, equal_nan=True)
+        
+        # Fixed seed: same intervals in-process, in smaller chunks or over a pool
+        result = bootstrap_statistics(scored, 500)
+        assert bootstrap_statistics(scored, 500, chunk_cells=len(scored) * 7, workers=2)['cohort'].equals(
+            bootstrap_statistics(scored, 500, chunk_cells=len(scored) * 7)['cohort'])
+        assert result['cohort'].equals(bootstrap_statistics(scored, 500)['cohort'])
+        
+        cohort = result['cohort']
+        stats = cohort_statistics(scored)
+        assert all(cohort.loc[key, 'estimate'] == stats[key] for key in ('mean', 'median', 'std'))
+        for table in (cohort, result['correlations']):
+            assert (table['lower'] <= table['estimate']).all() and (table['estimate'] <= table['upper']).all()
+        
+        print(f"✅ Bootstrap intervals successful")
+        print(f"   - Mean: {cohort.loc['mean', 'estimate']} [{cohort.loc['mean', 'lower']}, {cohort.loc['mean', 'upper']}]")
+        return True
+    except Exception as e:
+        print(f"❌ Bootstrap intervals error: {e!r}")
+        return False
+
 def test_model_config():
     """Test model configuration"""
     print("\nTesting model configuration...")
@@ -149,9 +872,43 @@ def main():
     # Test statistics
     results.append(test_statistics(df))
     
+    # Test processing pipeline
+    results.append(test_pipeline())
+    
+    # Test figure cache
+    results.append(test_figure_cache())
+    
+    # Test streaming accumulators
+    results.append(test_streaming(df))
+    
+    # Test binary cohort store
+    results.append(test_cohort_store(df))
+    
     # Test explainability
     results.append(test_explainability(df))
     
+    # Test scoring service
+    results.append(test_service(df))
+    
+    # Test pandas-free scoring CLI path
+    results.append(test_scores_only())
+    
+    # Test profiling
+    results.append(test_profiling(df))
+    
+    # Test longitudinal wave store
+    results.append(test_wave_store(df))
+    
+    # Test trend engine
+    results.append(test_trend_engine(df))
+    
+    # Test scoring model
+    results.append(test_scoring_model(df))
+    
+    # Test weight sensitivity
+    results.append(test_sensitivity(df))
+    results.append(test_bootstrap(df))
+    
     # Test model config
     results.append(test_model_config())
     
@@ -3,9 +3,77 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
+import hashlib
+import io
+import threading
+from collections import OrderedDict
 
+from core.profiling import stage, profiled
+from core.schema import value_counts
+from core.statistical_analysis import statistics_profile
+
+FIGURE_CACHE_SIZE = 64
+
+class FigureCache:
+    """LRU cache of rendered figures stored as PNG bytes, shared across reruns"""
+    
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        with self._lock:
+            png = self.entries.get(key)
+            if png is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return png
+    
+    def put(self, key, png):
+        with self._lock:
+            self.entries[key] = png
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+figure_cache = FigureCache()
+
+def data_key(*parts):
+    """Hash of the data a figure is drawn from"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            # The index holds the labels of counts like value_counts()
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+            digest.update(repr(list(part.columns) if isinstance(part, pd.DataFrame) else part.name).encode())
+        else:
+            digest.update(repr(part).encode())
+    return digest.hexdigest()
+
+def show_figure(key, draw):
+    """Display the figure built by draw(), rendering it only on a cache miss"""
+    png = figure_cache.get(key)
+    if png is None:
+        with stage("draw figure"):
+            fig = draw()
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format='png', dpi=200, bbox_inches='tight')
+            plt.close(fig)
+            png = buffer.getvalue()
+        figure_cache.put(key, png)
+    st.image(png, width='stretch')
+
+@profiled()
 def render_contribution(contrib):
     """Render factor contribution bar chart"""
+    show_figure(data_key('contribution', contrib), lambda: _draw_contribution(contrib))
+
+def _draw_contribution(contrib):
     fig, ax = plt.subplots(figsize=(8, 5))
     colors = ['#0F9D58', '#F4B400', '#DB4437', '#4285F4', '#AB47BC']
     bars = ax.bar(contrib.keys(), contrib.values(), color=colors)
@@ -23,11 +91,34 @@ def render_contribution(contrib):
     
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    st.pyplot(fig)
-    plt.close()
+    return fig
 
-def render_correlation_matrix(df):
-    """Render correlation heatmap"""
+@profiled()
+def render_contribution_by_risk(drivers):
+    """Render mean factor contribution per risk band as grouped bars"""
+    show_figure(data_key('contribution_by_risk', drivers), lambda: _draw_contribution_by_risk(drivers))
+
+def _draw_contribution_by_risk(drivers):
+    factors = [col for col in drivers.columns if col != 'Students']
+    colors = ['#0F9D58', '#F4B400', '#DB4437', '#4285F4', '#AB47BC']
+    x = np.arange(len(drivers.index))
+    width = 0.8 / len(factors)
+    
+    fig, ax = plt.subplots(figsize=(10, 5))
+    for i, factor in enumerate(factors):
+        ax.bar(x + i * width - 0.4 + width / 2, drivers[factor], width, label=factor, color=colors[i % len(colors)])
+    ax.set_xticks(x)
+    ax.set_xticklabels(drivers.index)
+    ax.set_ylabel("Mean Contribution (%)", fontsize=12)
+    ax.set_title("Risk Drivers by Risk Band", fontsize=14, fontweight='bold')
+    ax.legend(ncol=len(factors), fontsize=9)
+    ax.grid(axis='y', alpha=0.3)
+    plt.tight_layout()
+    return fig
+
+@profiled(rows=lambda df, profile=None: len(df))
+def render_correlation_matrix(df, profile=None):
+    """Render correlation heatmap, from a statistics_profile when given"""
     variables = ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance', 'burnout_score']
     available_vars = [v for v in variables if v in df.columns]
     
@@ -35,18 +126,22 @@ def render_correlation_matrix(df):
         st.info("Not enough variables for correlation analysis")
         return
     
-    corr = df[available_vars].corr()
-    
+    if profile is None:
+        profile = statistics_profile(df[available_vars])
+    corr = profile['correlation'].loc[available_vars, available_vars]
+    show_figure(data_key('correlation', corr), lambda: _draw_correlation_matrix(corr))
+
+def _draw_correlation_matrix(corr):
     fig, ax = plt.subplots(figsize=(8, 6))
     sns.heatmap(corr, annot=True, fmt='.2f', cmap='RdYlGn_r', center=0,
                 square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
     ax.set_title("Correlation Matrix", fontsize=14, fontweight='bold')
     plt.tight_layout()
-    st.pyplot(fig)
-    plt.close()
+    return fig
 
-def render_distribution(df):
-    """Render distribution plots for key variables"""
+@profiled(rows=lambda df, profile=None: len(df))
+def render_distribution(df, profile=None):
+    """Render distribution plots for key variables, from a statistics_profile when given"""
     variables = ['sleep_hours', 'study_hours', 'screen_time', 'stress_level', 'attendance']
     available_vars = [v for v in variables if v in df.columns]
     
@@ -54,14 +149,23 @@ def render_distribution(df):
         st.info("No variables available for distribution analysis")
         return
     
+    if profile is None:
+        profile = statistics_profile(df[available_vars])
+    parts = [(var, profile['histograms'][var], profile['means'][var], profile['medians'][var]) for var in available_vars]
+    show_figure(data_key('distribution', parts), lambda: _draw_distribution(profile, available_vars))
+
+def _draw_distribution(profile, available_vars):
     fig, axes = plt.subplots(2, 3, figsize=(15, 8))
     axes = axes.flatten()
     
     for idx, var in enumerate(available_vars):
         if idx < len(axes):
-            axes[idx].hist(df[var], bins=15, color='#0F9D58', alpha=0.7, edgecolor='black')
-            axes[idx].axvline(df[var].mean(), color='red', linestyle='--', linewidth=2, label=f'Mean: {df[var].mean():.1f}')
-            axes[idx].axvline(df[var].median(), color='blue', linestyle='--', linewidth=2, label=f'Median: {df[var].median():.1f}')
+            # Pre-binned counts drawn as one weighted sample per bin
+            counts, edges = profile['histograms'][var]
+            mean, median = profile['means'][var], profile['medians'][var]
+            axes[idx].hist(edges[:-1], bins=edges, weights=counts, color='#0F9D58', alpha=0.7, edgecolor='black')
+            axes[idx].axvline(mean, color='red', linestyle='--', linewidth=2, label=f'Mean: {mean:.1f}')
+            axes[idx].axvline(median, color='blue', linestyle='--', linewidth=2, label=f'Median: {median:.1f}')
             axes[idx].set_title(var.replace('_', ' ').title(), fontweight='bold')
             axes[idx].set_xlabel('Value')
             axes[idx].set_ylabel('Frequency')
@@ -73,13 +177,15 @@ def render_distribution(df):
         axes[idx].axis('off')
     
     plt.tight_layout()
-    st.pyplot(fig)
-    plt.close()
+    return fig
 
+@profiled(rows=lambda df: len(df))
 def render_risk_distribution(df):
     """Render pie chart of risk distribution"""
-    risk_counts = df['risk'].value_counts()
-    
+    risk_counts = value_counts(df['risk'])
+    show_figure(data_key('risk_pie', risk_counts), lambda: _draw_risk_distribution(risk_counts))
+
+def _draw_risk_distribution(risk_counts):
     colors = {'🟢 Low Risk': '#0F9D58', '🟡 Moderate Risk': '#F4B400', '🔴 Elevated Risk': '#DB4437'}
     plot_colors = [colors.get(risk, '#999999') for risk in risk_counts.index]
     
@@ -93,5 +199,4 @@ def render_risk_distribution(df):
     
     ax.set_title("Risk Level Distribution", fontsize=14, fontweight='bold')
     plt.tight_layout()
-    st.pyplot(fig)
-    plt.close()
+    return fig